@@ -1,9 +1,18 @@
+import contextlib
+import enum
+import io
 import logging
+import tempfile
 import unittest
-from typing import Optional
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal, Optional
 
 from tools import foreach, sys_args
-from with_argparse import with_argparse
+from with_argparse import with_argparse, with_dataclass
+from with_argparse.configure_argparse import WithArgparse
+from with_argparse.main import _get_with_argparse
+from with_argparse.setup import config
 
 logging.basicConfig(level="DEBUG")
 
@@ -115,9 +124,188 @@ class ArgparseTestCase(unittest.TestCase):
 
     def test_duplicate_inputs(self):
         @with_argparse(strict=False)
-        def func(arg: str) -> str:
+        def func(arg: str, other: str = "") -> str:
             return arg
 
         with sys_args(arg="456"), self.assertRaises(SystemExit):
             self.assertEqual(func(arg="123"), "456")
             self.assertEqual(func("123"), "456")
+
+    def test_fully_supplied_arguments_skip_argv(self):
+        @with_argparse(strict=False)
+        def func(arg: str, other: str = "") -> str:
+            return arg + other
+
+        with sys_args(arg="456", unknown="1"):
+            self.assertEqual("123", func(arg="123", other=""))
+            self.assertEqual("12", func("1", other="2"))
+
+    def test_without_argv(self):
+        @with_argparse(strict=False)
+        def func(arg: str, other: int = 2) -> str:
+            return arg * other
+
+        with sys_args(other="3", unknown="1"):
+            self.assertEqual("aa", func.without_argv("a"))
+            self.assertEqual("a", func.without_argv(arg="a", other=1))
+            with self.assertRaises(SystemExit):
+                func.without_argv()
+
+    def test_enum(self):
+        class Color(enum.Enum):
+            RED = "r"
+            GREEN = "g"
+
+        @with_argparse
+        def func(color: Color, fallback: Color = Color.GREEN):
+            return color, fallback
+
+        with sys_args(color="RED"):
+            self.assertEqual((Color.RED, Color.GREEN), func())
+        with sys_args(color="r", fallback="RED"):
+            self.assertEqual((Color.RED, Color.RED), func())
+        with sys_args(color="BLUE"), self.assertRaises(SystemExit):
+            func()
+
+    def test_large_literal_choices(self):
+        names = tuple(f"dataset{i}" for i in range(5000))
+
+        @with_argparse
+        def func(datasets: list[Literal[names]]):  # type: ignore[valid-type]
+            return datasets
+
+        with sys_args(datasets=names[::-1]):
+            self.assertEqual(list(names[::-1]), func())
+        with (
+            sys_args(datasets=["dataset1", "dataset5000"]),
+            self.assertRaises(SystemExit),
+        ):
+            func()
+
+    def test_simple_command_lines(self):
+        class Mode(enum.Enum):
+            A = "a"
+            B = "b"
+
+        @with_argparse
+        def func(
+            count: int,
+            mode: Mode = Mode.A,
+            offset: int = 0,
+            verbose: bool = False,
+            tags: set[str] | None = None,
+        ):
+            return count, mode, offset, verbose, tags
+
+        wa = _get_with_argparse(func)
+        cases = [
+            (["--count", "1"], (1, Mode.A, 0, False, None)),
+            (["--count=1", "--mode=b", "--verbose"], (1, Mode.B, 0, True, None)),
+            (["--offset=-3", "--count", "2"], (2, Mode.A, -3, False, None)),
+            # left to argparse: values starting with '-', nargs and abbreviations
+            (["--count", "1", "--offset", "-3"], (1, Mode.A, -3, False, None)),
+            (["--count", "1", "--tags", "x", "x"], (1, Mode.A, 0, False, {"x"})),
+            (["--cou", "1", "--verb"], (1, Mode.A, 0, True, None)),
+        ]
+        for argv, expected in cases:
+            with self.subTest(argv=argv):
+                self.assertEqual(expected, wa.call((), {}, argv))
+
+        for argv in ([], ["--count", "x"], ["--count=1", "--mode=c"], ["--unknown"]):
+            with self.subTest(argv=argv), self.assertRaises(SystemExit):
+                wa.call((), {}, argv)
+
+    def test_string_defaults_are_converted(self):
+        @dataclass
+        class Config:
+            output: Path = "out"  # type: ignore[assignment]
+            size: int = "3"  # type: ignore[assignment]
+
+        @with_dataclass
+        def func(config: Config):
+            return config.output, config.size
+
+        wa = _get_with_argparse(func)
+        self.assertEqual((Path("out"), 3), wa.call((), {}, []))
+        self.assertEqual((Path("out"), 5), wa.call((), {}, ["--size", "5"]))
+        self.assertEqual((Path("x"), 3), wa.call((), {}, ["--output=x"]))
+
+    def test_defaults_are_not_shared(self):
+        loads = []
+
+        def load(name: str) -> str:
+            loads.append(name)
+            return name
+
+        def func(tags: set[str] = frozenset({"a"}), model: str = "base"):
+            tags.add(str(len(tags)))
+            return sorted(tags), model
+
+        wa = WithArgparse(func, allow_custom={"model": load})
+        self.assertEqual((["1", "a"], "base"), wa.call((), {}, []))
+        self.assertEqual((["1", "a"], "base"), wa.call((), {}, ["--model=base"]))
+        self.assertEqual((["1", "a"], "base"), wa.call((), {}, []))
+        # custom conversions of defaults run on every call, like after parsing with argparse
+        self.assertEqual(["base", "base", "base"], loads)
+
+    def test_dict(self):
+        class Split(enum.Enum):
+            TRAIN = "train"
+            TEST = "test"
+
+        @with_argparse
+        def func(weights: dict[Split, float], paths: dict[str, Path] | None = None):
+            return weights, paths
+
+        wa = _get_with_argparse(func)
+        self.assertEqual(
+            ({Split.TRAIN: 0.5, Split.TEST: 1.0}, {"a": Path("x=y")}),
+            wa.call((), {}, ["--weights", "TRAIN=0.5", "test=1", "--paths", "a=x=y"]),
+        )
+        for argv in (
+            ["--weights", "TRAIN"],
+            ["--weights", "VALID=1"],
+            ["--weights", "TRAIN=x"],
+        ):
+            with self.subTest(argv=argv), self.assertRaises(SystemExit):
+                wa.call((), {}, argv)
+
+    def test_dict_response_file(self):
+        @with_argparse
+        def func(shards: dict[int, str]):
+            return shards
+
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as file:
+            file.write("# shard paths\n")
+            file.writelines(f"{i}=shard{i}.bin\n" for i in range(5000))
+            file.flush()
+
+            shards = _get_with_argparse(func).call(
+                (), {}, ["--shards", "@" + file.name, "5000=last.bin"]
+            )
+        self.assertEqual(5001, len(shards))
+        self.assertEqual("shard42.bin", shards[42])
+        self.assertEqual("last.bin", shards[5000])
+
+    def test_dict_duplicate_keys(self):
+        @with_argparse
+        def func(weights: dict[str, int]):
+            return weights
+
+        wa = _get_with_argparse(func)
+        argv = ["--weights", "a=1", "b=2", "a=3"]
+        for invalid, message in (
+            (argv, "argument --weights: duplicate key 'a'"),
+            (["--weights", "@/nonexistent"], "cannot read '/nonexistent'"),
+        ):
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit) as exit_cm:
+                    wa.call((), {}, invalid)
+            self.assertEqual(2, exit_cm.exception.code)
+            self.assertIn(message, stderr.getvalue())
+        for policy, expected in (("first", 1), ("last", 3)):
+            config["duplicate_keys"] = policy
+            try:
+                self.assertEqual({"a": expected, "b": 2}, wa.call((), {}, argv))
+            finally:
+                config["duplicate_keys"] = "error"
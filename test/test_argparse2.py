@@ -46,3 +46,91 @@ class ArgParseTestCase(unittest.TestCase):
 
         with sys_args(), no_argparse():
             self.assertEqual(42, func(A(42)))
+
+    def test_attrs_converter(self):
+        received = []
+
+        def to_ids(tokens: list[str]) -> frozenset[int]:
+            received.append(tokens)
+            return frozenset(map(int, tokens))
+
+        @attrs.define
+        class A:
+            ids: set[int] = attrs.field(converter=to_ids)
+            scale: float = attrs.field(default=1.0, converter=float)
+
+        @with_attrs
+        def func(args: A):
+            return args
+
+        with sys_args(ids=["1", "2", "2"], scale="0.5"):
+            args = func()
+        # the converter receives the raw tokens, once
+        self.assertEqual([["1", "2", "2"]], received)
+        self.assertEqual(frozenset({1, 2}), args.ids)
+        self.assertEqual(0.5, args.scale)
+
+    def test_attrs_factory(self):
+        @attrs.define
+        class A:
+            names: set[str] = attrs.field(factory=lambda: {"default"})
+            first: str = attrs.field(
+                default=attrs.Factory(lambda self: min(self.names), takes_self=True)
+            )
+
+        @with_attrs
+        def func(args: A):
+            return args
+
+        with sys_args():
+            self.assertEqual(A({"default"}, "default"), func())
+
+        with sys_args(names=["b", "a"]):
+            self.assertEqual(A({"a", "b"}, "a"), func())
+
+    def test_partial_stages(self):
+        @attrs.define
+        class Launcher:
+            nodes: int = 1
+            tags: list[str] = attrs.Factory(list)
+
+        @attrs.define
+        class Model:
+            layers: int
+            dropout: float = 0.0
+            verbose: bool = False
+
+            def __attrs_post_init__(self):
+                built.append(self)
+
+        built = []
+
+        @with_attrs
+        def launch(launcher: Launcher, model: Model):
+            return launcher, model
+
+        @with_attrs
+        def build(model: Model):
+            return model
+
+        with (
+            sys_args(nodes="2", tags=["a", "b"], layers="3", other="x"),
+            partial_argparse() as partial,
+        ):
+            launcher, model = launch()
+            self.assertEqual(Launcher(2, ["a", "b"]), launcher)
+            self.assertEqual(
+                (3, 0.0, False), (model.layers, model.dropout, model.verbose)
+            )
+            # a view of the tokens no stage has claimed so far
+            self.assertEqual(["--other", "x"], partial.remainder)
+
+            # later stages reuse configs of the same type parsed from the same command line
+            self.assertIs(model, build())
+            self.assertEqual(1, len(built))
+
+        # abbreviated options are left to argparse, which parses the whole command line
+        with sys_args(nod="4", layers="1", other="x"), partial_argparse() as partial:
+            launcher, _ = launch()
+            self.assertEqual(4, launcher.nodes)
+            self.assertEqual(["--other", "x"], partial.remainder)
@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from dataclasses import dataclass
+from pathlib import Path
+from unittest import mock
+
+from with_argparse import with_dataclass
+from with_argparse.broadcast import Broadcast, BROADCAST_DIR_ENV, LAUNCH_ID_ENV
+from with_argparse.main import _get_with_argparse
+
+_conversions = Path(tempfile.gettempdir()) / f"with_argparse_conversions_{os.getpid()}"
+
+
+class Expensive:
+    def __init__(self, value: str):
+        with open(_conversions, "a") as file:
+            file.write(value + "\n")
+        self.value = value.upper()
+
+    def __str__(self):
+        return self.value
+
+
+@dataclass
+class Config:
+    source: Expensive
+    ranks: int = 1
+
+
+@with_dataclass
+def rank_main(config: Config):
+    return config
+
+
+def _run_rank(argv: list[str], out: Path):
+    try:
+        # only command lines of the process are broadcast
+        with mock.patch("sys.argv", ["rank", *argv]):
+            result = rank_main()
+        out.write_text(f"{result.source} {result.ranks}")
+    except SystemExit as exc:
+        out.write_text(f"exit {exc.code}")
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "the test launches ranks via os.fork")
+class BroadcastTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        _conversions.unlink(missing_ok=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        _conversions.unlink(missing_ok=True)
+
+    def _launch(self, launch_id: str, argv: list[str], num_ranks: int = 4):
+        env = {BROADCAST_DIR_ENV: self.tmp.name, LAUNCH_ID_ENV: launch_id}
+        context = multiprocessing.get_context("fork")
+        outputs = [
+            Path(self.tmp.name, f"{launch_id}-{rank}") for rank in range(num_ranks)
+        ]
+        with mock.patch.dict(os.environ, env):
+            ranks = [
+                context.Process(target=_run_rank, args=(argv, out)) for out in outputs
+            ]
+            for rank in ranks:
+                rank.start()
+            for rank in ranks:
+                rank.join()
+        return [out.read_text() for out in outputs]
+
+    def test_leader_parses_once(self):
+        outputs = self._launch("a", ["--source", "data", "--ranks", "4"])
+        self.assertEqual(["DATA 4"] * 4, outputs)
+        self.assertEqual(["data"], _conversions.read_text().splitlines())
+
+        # a new launch parses again
+        self.assertEqual(["DATA 1"] * 2, self._launch("b", ["--source", "data"], 2))
+        self.assertEqual(2, len(_conversions.read_text().splitlines()))
+
+    def test_usage_error_reaches_followers(self):
+        self.assertEqual(["exit 2"] * 3, self._launch("c", ["--ranks", "x"], 3))
+
+    def test_explicit_argv_is_not_broadcast(self):
+        env = {BROADCAST_DIR_ENV: self.tmp.name, LAUNCH_ID_ENV: "d"}
+        with mock.patch.dict(os.environ, env):
+            for _ in range(2):
+                result = _get_with_argparse(rank_main).call((), {}, ["--source", "x"])
+                self.assertEqual("X", str(result.source))
+        self.assertEqual(["x", "x"], _conversions.read_text().splitlines())
+        self.assertEqual([], os.listdir(self.tmp.name))
+
+    def test_crashed_leader(self):
+        broadcast = Broadcast(self.tmp.name, "e", timeout=60)
+        # written by a leader that died before publishing, its lock is released
+        Path(self.tmp.name, "key.lock").write_text("host 1234")
+        start = time.monotonic()
+        with self.assertRaisesRegex(RuntimeError, r"leader process \(host 1234\)"):
+            broadcast.exchange("key", lambda: self.fail("not the leader"))
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_expired_files_removed(self):
+        expired = Path(self.tmp.name, "old.pkl")
+        expired.write_bytes(b"")
+        unrelated = Path(self.tmp.name, "notes.txt")
+        unrelated.write_text("")
+        day_ago = time.time() - 2 * 86400
+        for path in (expired, unrelated):
+            os.utime(path, (day_ago, day_ago))
+
+        self.assertEqual(["DATA 1"], self._launch("f", ["--source", "data"], 1))
+        self.assertFalse(expired.exists())
+        self.assertTrue(unrelated.exists())
@@ -0,0 +1,149 @@
+import enum
+import os
+import tempfile
+import time
+import unittest
+from dataclasses import dataclass
+from pathlib import Path
+
+from tools import sys_args
+from with_argparse import JsonSerializer, ResultCache, with_dataclass
+
+
+@dataclass
+class Preprocess:
+    source: str
+    scale: int = 1
+    output: Path = Path("out")
+
+
+class Color(enum.Enum):
+    RED = 1
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _func(self, cache: ResultCache):
+        @with_dataclass(cache=cache)
+        def func(args: Preprocess):
+            self.calls.append(args)
+            return {"result": args.source * args.scale}
+
+        return func
+
+    def test_identical_configuration_is_cached(self):
+        func = self._func(ResultCache(self.tmp.name, exclude={"output"}))
+
+        with sys_args(source="ab", scale=2, output="a"):
+            self.assertEqual({"result": "abab"}, func())
+        with sys_args(source="ab", scale=2, output="b"):
+            self.assertEqual({"result": "abab"}, func())
+        with sys_args(source="ab", scale=3):
+            self.assertEqual({"result": "ababab"}, func())
+        self.assertEqual(2, len(self.calls))
+
+    def test_direct_calls_are_cached(self):
+        @with_dataclass(strict=False, cache=ResultCache(self.tmp.name))
+        def func(args: Preprocess):
+            self.calls.append(args)
+            return args.source * args.scale
+
+        self.assertEqual("aa", func(Preprocess("a", 2)))
+        self.assertEqual("aa", func(args=Preprocess("a", 2)))
+        self.assertEqual("aa", func.without_argv(Preprocess("a", 2)))
+        # calls parsing the command line share the cached results
+        with sys_args(source="a", scale=2):
+            self.assertEqual("aa", func())
+        self.assertEqual(1, len(self.calls))
+
+    def test_cache_survives_decoration(self):
+        cache = ResultCache(self.tmp.name, serializer=JsonSerializer())
+        with sys_args(source="x"):
+            self._func(cache)()
+            self._func(cache)()
+        self.assertEqual(1, len(self.calls))
+        self.assertEqual(1, len(list(Path(self.tmp.name).glob("*.json"))))
+
+    def test_eviction(self):
+        cache = ResultCache(self.tmp.name, max_size=1)
+        func = self._func(cache)
+        for source in ("a", "b", "c"):
+            with sys_args(source=source):
+                func()
+        self.assertEqual(0, len(list(Path(self.tmp.name).glob("*.pkl"))))
+
+        cache.max_size = None
+        for source in ("a", "b", "c"):
+            with sys_args(source=source):
+                func()
+        cache.evict(
+            max_size=sum(p.stat().st_size for p in Path(self.tmp.name).glob("*.pkl"))
+            - 1
+        )
+        self.assertEqual(2, len(list(Path(self.tmp.name).glob("*.pkl"))))
+
+    def test_new_result_is_not_evicted(self):
+        cache = ResultCache(self.tmp.name)
+        func = self._func(cache)
+        with sys_args(source="a"):
+            func()
+        (path,) = Path(self.tmp.name).glob("*.pkl")
+        # e.g. a coarse or skewed clock, the older result looks more recently used
+        future = time.time() + 3600
+        os.utime(path, (future, future))
+
+        cache.max_size = path.stat().st_size
+        with sys_args(source="b"):
+            func()
+            func()
+        self.assertEqual(2, len(self.calls))
+        self.assertFalse(path.exists())
+
+    def test_key_is_canonical(self):
+        cache = ResultCache(self.tmp.name)
+        self.assertEqual(
+            cache.key(print, {"a": {3, 1, 2}, "b": Path("x")}),
+            cache.key(print, {"b": Path("x"), "a": {2, 3, 1}}),
+        )
+        self.assertNotEqual(
+            cache.key(print, {"a": [1, 2]}), cache.key(print, {"a": [2, 1]})
+        )
+        with self.assertRaises(TypeError):
+            cache.key(print, {"a": object()})
+
+    def test_key_collisions(self):
+        cache = ResultCache(self.tmp.name)
+        self.assertNotEqual(
+            cache.key(print, {"a": [1, 2]}), cache.key(print, {"a": (1, 2)})
+        )
+        self.assertNotEqual(
+            cache.key(print, {"a": {1: "x"}}), cache.key(print, {"a": {"1": "x"}})
+        )
+        self.assertEqual(
+            cache.key(print, {"a": {1: "x", (2, 3): "y"}}),
+            cache.key(print, {"a": {(2, 3): "y", 1: "x"}}),
+        )
+
+        # same qualified names in different modules
+        other_color = enum.Enum("Color", "RED", module="other")
+
+        @dataclass
+        class OtherPreprocess(Preprocess):
+            pass
+
+        OtherPreprocess.__module__ = "other"
+        OtherPreprocess.__qualname__ = "Preprocess"
+        self.assertNotEqual(
+            cache.key(print, {"a": Color.RED}),
+            cache.key(print, {"a": other_color.RED}),
+        )
+        self.assertNotEqual(
+            cache.key(print, {"a": Preprocess("x")}),
+            cache.key(print, {"a": OtherPreprocess("x")}),
+        )
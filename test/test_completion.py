@@ -0,0 +1,95 @@
+import enum
+import shutil
+import subprocess
+import tempfile
+import unittest
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+from with_argparse import with_dataclass
+from with_argparse.completion import completion_script, is_stale, main
+
+
+class Color(enum.Enum):
+    RED = "r"
+    BLUE = "b"
+
+
+@dataclass
+class Config:
+    mode: Literal["train", "eval"] = "train"
+    color: Color = Color.RED
+    output: Path = Path("out")
+    tags: list[str] = field(default_factory=list, metadata={"aliases": ["-t"]})
+    verbose: bool = False
+
+
+@with_dataclass
+def train(config: Config):
+    return config
+
+
+class CompletionTest(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = Path(tmp_dir.name)
+
+    @unittest.skipIf(shutil.which("bash") is None, "bash is not installed")
+    def test_bash(self):
+        script = self.root / "train.bash"
+        script.write_text(completion_script(train, "bash", "train"))
+        (self.root / "output.txt").touch()
+
+        def complete(*words: str) -> list[str]:
+            command = (
+                f"source {script}; COMP_WORDS=(train {' '.join(words)}); "
+                f"COMP_CWORD={len(words)}; _with_argparse_train; "
+                'printf "%s\\n" "${COMPREPLY[@]}"'
+            )
+            completed = subprocess.run(
+                ["bash", "-c", command],
+                cwd=self.root,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            return completed.stdout.split()
+
+        self.assertEqual(["--mode"], complete("--mo"))
+        self.assertEqual(["train", "eval"], complete("--mode", "''"))
+        self.assertEqual(["RED", "BLUE"], complete("--color", "''"))
+        self.assertEqual(["output.txt"], complete("--output", "out"))
+        self.assertEqual(["--tags"], complete("--mode", "eval", "--t"))
+        self.assertIn("--verbose", complete("--mode", "eval", "''"))
+
+    def test_zsh_and_fish(self):
+        zsh = completion_script(train, "zsh", "train")
+        self.assertTrue(zsh.startswith("#compdef train\n"))
+        self.assertIn("'(--mode)--mode[]:mode:(train eval)'", zsh)
+        self.assertIn("'(--tags -t)-t[]:*:tags: '", zsh)
+
+        fish = completion_script(train, "fish", "train")
+        self.assertIn("complete -c train -l color -x -a 'RED BLUE'", fish)
+        self.assertIn("complete -c train -l output -r -F", fish)
+        self.assertIn("complete -c train -l verbose\n", fish)
+
+    def test_stale_scripts(self):
+        script = self.root / "train.bash"
+        self.assertTrue(is_stale(train, script))
+        self.assertEqual(1, main(["test_completion:train", "--check", str(script)]))
+
+        main(["test_completion:train", "--prog", "train", "-o", str(script)])
+        self.assertFalse(is_stale(train, script))
+        self.assertEqual(0, main(["test_completion:train", "--check", str(script)]))
+
+        @dataclass
+        class Extended(Config):
+            seed: int = 0
+
+        @with_dataclass
+        def extended(config: Extended):
+            return config
+
+        self.assertTrue(is_stale(extended, script))
@@ -1,10 +1,15 @@
+import dataclasses
 import logging
+import tracemalloc
 import unittest
-from dataclasses import dataclass
+import unittest.mock
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Literal
 
 from tools import sys_args
 from with_argparse import with_dataclass
+from with_argparse.main import _get_with_argparse
 
 logging.basicConfig(level="DEBUG")
 
@@ -38,3 +43,95 @@ class DataclassTest(unittest.TestCase):
 
         with sys_args(param="a", number=1):
             self.assertEqual(2, func())
+
+    def test_default_factory(self):
+        calls = []
+
+        def default_items() -> list[str]:
+            calls.append(1)
+            return ["default"]
+
+        @dataclass
+        class Test:
+            items: list[str] = field(default_factory=default_items)
+
+        @with_dataclass
+        def func(args: Test):
+            return args.items
+
+        with sys_args(items=["a", "b"]):
+            self.assertEqual(["a", "b"], func())
+        self.assertEqual([], calls)
+
+        with sys_args():
+            self.assertEqual(["default"], func())
+        self.assertEqual([1], calls)
+
+        @dataclass
+        class Flags:
+            flag: bool = field(default_factory=lambda: False)
+
+        @with_dataclass
+        def flags(args: Flags):
+            return args.flag
+
+        with sys_args():
+            self.assertFalse(flags())
+        with unittest.mock.patch("sys.argv", ["prog", "--flag"]):
+            self.assertTrue(flags())
+
+    def test_allocations_per_call(self):
+        num_fields = 500
+        Config = dataclasses.make_dataclass(
+            "Config", [(f"field{i}", int, field(default=i)) for i in range(num_fields)]
+        )
+
+        @with_dataclass
+        def func(config: Config):
+            return config
+
+        wa = _get_with_argparse(func)
+        # the first call compiles the parser
+        wa.call((), {}, ["--field3", "4"])
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            config = wa.call((), {}, ["--field3", "4"])
+            peak = tracemalloc.get_traced_memory()[1] - before
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(4, config.field3)
+        self.assertLess(peak, 160 * num_fields)
+
+    def test_frozen_template(self):
+        @dataclass(frozen=True)
+        class Test:
+            output: Path = "out"  # type: ignore[assignment]
+            steps: int = 1
+
+        @with_dataclass
+        def func(args: Test):
+            return args
+
+        with sys_args():
+            first, second = func(), func()
+        self.assertIs(first, second)
+        self.assertEqual(Test(Path("out"), 1), first)
+
+        with sys_args(steps=2):
+            self.assertEqual(Test(Path("out"), 2), func())
+
+        @dataclass(frozen=True)
+        class Mutable:
+            tags: set[str] = frozenset({"a"})  # type: ignore[assignment]
+
+        @with_dataclass
+        def mutable(args: Mutable):
+            return args
+
+        # configs holding mutable values are built anew by every call
+        with sys_args():
+            first, second = mutable(), mutable()
+        self.assertIsNot(first.tags, second.tags)
+        self.assertEqual({"a"}, first.tags)
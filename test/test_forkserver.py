@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from dataclasses import dataclass
+from pathlib import Path
+
+from with_argparse import with_dataclass
+from with_argparse.forkserver import launch, main
+
+
+@dataclass
+class Run:
+    output: Path
+    value: int
+
+
+@with_dataclass
+def write_value(run: Run):
+    run.output.write_text(str(run.value * 2))
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "the fork server requires os.fork")
+class ForkServerTest(unittest.TestCase):
+    def test_launch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            argvs = [
+                ["--output", os.path.join(tmp, str(i)), "--value", str(i)]
+                for i in range(8)
+            ]
+            argvs.insert(3, ["--output", os.path.join(tmp, "invalid")])
+
+            exit_codes = launch(write_value, argvs, jobs=3)
+
+            self.assertEqual([0, 0, 0, 2, 0, 0, 0, 0, 0], exit_codes)
+            for i in range(8):
+                self.assertEqual(str(2 * i), Path(tmp, str(i)).read_text())
+            self.assertFalse(Path(tmp, "invalid").exists())
+
+    def test_other_children(self):
+        other = os.fork()
+        if other == 0:
+            os._exit(3)
+        with tempfile.TemporaryDirectory() as tmp:
+            argvs = [["--output", os.path.join(tmp, "a"), "--value", "1"]] * 2
+            self.assertEqual([0, 0], launch(write_value, argvs, jobs=1))
+        # the exit status of the unrelated child is left to its parent
+        _, status = os.waitpid(other, 0)
+        self.assertEqual(3, os.waitstatus_to_exitcode(status))
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sweep = Path(tmp, "sweep.txt")
+            sweep.write_text(
+                f"--output '{tmp}/a b' --value 1\n\n--output {tmp}/c --value 2\n"
+            )
+            self.assertEqual(0, main([f"{__name__}:write_value", str(sweep)]))
+            self.assertEqual("2", Path(tmp, "a b").read_text())
+            self.assertEqual("4", Path(tmp, "c").read_text())
@@ -0,0 +1,164 @@
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import unittest
+import unittest.mock
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+from with_argparse import (
+    partial_argparse,
+    register_type,
+    TypeSpec,
+    with_argparse,
+    with_dataclass,
+)
+from with_argparse.jsonl import run_jsonl
+
+
+class Tokenizer:
+    loads: list[str] = []
+
+    def __init__(self, name: str):
+        Tokenizer.loads.append(name)
+        self.name = name
+
+
+@register_type(Tokenizer)
+def _tokenizer(annotation, compile_type):
+    return TypeSpec(Tokenizer)
+
+
+@dataclass
+class Config:
+    epochs: int
+    tokenizer: Tokenizer = field(default_factory=lambda: Tokenizer("default"))
+    mode: Literal["train", "eval"] = "train"
+    layers: list[int] = field(default_factory=lambda: [64])
+    verbose: bool = False
+
+
+@with_dataclass
+def train(config: Config):
+    if config.epochs < 0:
+        raise ValueError("epochs must not be negative")
+    return {
+        "epochs": config.epochs,
+        "tokenizer": config.tokenizer.name,
+        "mode": config.mode,
+        "layers": config.layers,
+        "verbose": config.verbose,
+    }
+
+
+def _run(records, argv=(), **kwargs) -> tuple[int, list[dict]]:
+    source = io.StringIO("".join(json.dumps(record) + "\n" for record in records))
+    output = io.StringIO()
+    exit_code = run_jsonl(train, source, argv, output, **kwargs)
+    return exit_code, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+class JsonlTest(unittest.TestCase):
+    def setUp(self):
+        Tokenizer.loads.clear()
+
+    def test_records(self):
+        exit_code, results = _run(
+            [
+                {"epochs": 1, "tokenizer": "bpe"},
+                {"epochs": 2, "tokenizer": "bpe", "layers": [32, 16]},
+                {"epochs": 3, "mode": "eval", "verbose": True},
+            ],
+            argv=["--epochs", "9", "--tokenizer", "bpe"],
+        )
+        self.assertEqual(0, exit_code)
+        self.assertEqual([1, 2, 3], [result["line"] for result in results])
+        self.assertEqual(
+            [
+                {"epochs": 1, "tokenizer": "bpe", "mode": "train", "layers": [64]},
+                {"epochs": 2, "tokenizer": "bpe", "mode": "train", "layers": [32, 16]},
+                {"epochs": 3, "tokenizer": "bpe", "mode": "eval", "layers": [64]},
+            ],
+            [
+                {k: v for k, v in result["result"].items() if k != "verbose"}
+                for result in results
+            ],
+        )
+        self.assertEqual(
+            [False, False, True], [r["result"]["verbose"] for r in results]
+        )
+        # unchanged values are converted once
+        self.assertEqual(["bpe"], Tokenizer.loads)
+
+    def test_errors(self):
+        exit_code, results = _run(
+            [
+                {"epochs": "many"},
+                {"epochs": 1, "mode": "test"},
+                {"epochs": 1, "unknown": 1},
+                {"epochs": -1},
+                [1],
+                {"epochs": 1},
+            ]
+        )
+        self.assertEqual(1, exit_code)
+        self.assertIn("invalid int value: 'many'", results[0]["error"])
+        self.assertIn("invalid choice", results[1]["error"])
+        self.assertIn("unrecognized argument: 'unknown'", results[2]["error"])
+        self.assertEqual("ValueError: epochs must not be negative", results[3]["error"])
+        self.assertIn("Expected a JSON object", results[4]["error"])
+        self.assertEqual(1, results[5]["result"]["epochs"])
+
+    def test_concurrent(self):
+        records = [{"epochs": epochs} for epochs in range(20)]
+        for executor in ("thread", "process"):
+            for ordered in (True, False):
+                with self.subTest(executor=executor, ordered=ordered):
+                    exit_code, results = _run(
+                        records, jobs=4, executor=executor, ordered=ordered
+                    )
+                    self.assertEqual(0, exit_code)
+                    if not ordered:
+                        results.sort(key=lambda result: result["line"])
+                    self.assertEqual(
+                        list(range(20)), [r["result"]["epochs"] for r in results]
+                    )
+
+    def test_driver(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "records.jsonl"
+            path.write_text('{"epochs": 1}\n\n{"epochs": 2}\n')
+            output = io.StringIO()
+            argv = [sys.argv[0], "--epochs", "5", "--with-argparse-jsonl", str(path)]
+            with unittest.mock.patch("sys.argv", argv):
+                with contextlib.redirect_stdout(output):
+                    train()
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([1, 3], [result["line"] for result in results])
+        self.assertEqual([1, 2], [result["result"]["epochs"] for result in results])
+
+    def test_nested_entry_points(self):
+        @with_argparse
+        def evaluate(epochs: int = 0):
+            return epochs
+
+        @with_dataclass
+        def pipeline(config: Config):
+            # functions called by the entry point do not start the driver again
+            with partial_argparse():
+                return config.epochs, evaluate()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "records.jsonl"
+            path.write_text('{"epochs": 1}\n')
+            output = io.StringIO()
+            argv = [sys.argv[0], "--epochs", "5", "--with-argparse-jsonl", str(path)]
+            with unittest.mock.patch("sys.argv", argv):
+                with contextlib.redirect_stdout(output):
+                    pipeline()
+                self.assertEqual(argv, sys.argv)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([{"line": 1, "result": [1, 5]}], results)
@@ -0,0 +1,49 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from tools import sys_args
+from with_argparse import MappedFile, with_argparse
+
+
+class MappedTest(unittest.TestCase):
+    def test_mapped_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            corpus = Path(tmp_dir) / "corpus.txt"
+            corpus.write_bytes(b"a\nb\nc\n")
+            empty = Path(tmp_dir) / "empty.txt"
+            empty.touch()
+
+            @with_argparse
+            def func(corpus: MappedFile, shards: list[MappedFile], header: bytes):
+                # mapped on first access
+                self.assertTrue(shards[1].closed)
+                view = corpus.view()
+                lines = bytes(view).count(b"\n")
+                view.release()
+                return corpus, shards, lines, len(shards[1]), header
+
+            argv = {"corpus": corpus, "shards": [corpus, empty], "header": corpus}
+            with sys_args(**argv):
+                mapped, shards, lines, empty_size, header = func()
+            self.assertEqual((3, 0, b"a\nb\nc\n"), (lines, empty_size, header))
+            # unmapped when the function returns, and mapped again on access
+            self.assertTrue(mapped.closed and shards[1].closed)
+            self.assertEqual(b"b", mapped[2:3])
+            mapped.close()
+
+            @with_argparse
+            def view(data: memoryview):
+                return data.readonly, data[:1].tobytes()
+
+            with sys_args(data=corpus):
+                self.assertEqual((True, b"a"), view())
+
+            with sys_args(corpus=Path(tmp_dir) / "missing.txt", shards=[corpus]):
+                with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        with self.assertRaises(SystemExit):
+                            func()
+            self.assertIn("invalid MappedFile value", stderr.getvalue())
@@ -0,0 +1,126 @@
+import argparse
+import contextlib
+import io
+import multiprocessing
+import threading
+import time
+import unittest
+from dataclasses import dataclass, field
+from typing import Annotated
+
+from tools import sys_args
+from with_argparse import ParseSession, with_argparse, with_dataclass
+from with_argparse.configure_argparse import WithArgparse
+from with_argparse.parallel import _process_context, Parallel
+
+
+class RemoteObject:
+    threads: set[str] = set()
+
+    def __init__(self, ref: str):
+        if not ref.startswith("s3://"):
+            raise ValueError(ref)
+        # waits on I/O
+        time.sleep(0.01)
+        RemoteObject.threads.add(threading.current_thread().name)
+        self.ref = ref
+
+    def __eq__(self, other):
+        return isinstance(other, RemoteObject) and self.ref == other.ref
+
+    def __hash__(self):
+        return hash(self.ref)
+
+
+def refs(count: int) -> list[str]:
+    return [f"s3://bucket/{i}" for i in range(count)]
+
+
+@dataclass
+class Config:
+    objects: Annotated[list[RemoteObject], Parallel(max_workers=8)]
+    unique: Annotated[set[RemoteObject], Parallel()] = field(
+        default_factory=lambda: {RemoteObject("s3://bucket/default")}
+    )
+
+
+@with_dataclass
+def func(config: Config):
+    return config
+
+
+class ParallelTest(unittest.TestCase):
+    def setUp(self):
+        RemoteObject.threads.clear()
+
+    def test_order_preserved(self):
+        with sys_args(objects=refs(32), unique=refs(2) * 2):
+            config = func()
+        self.assertLessEqual(2, len(RemoteObject.threads))
+        self.assertNotIn(threading.current_thread().name, RemoteObject.threads)
+        self.assertEqual(refs(32), [obj.ref for obj in config.objects])
+        self.assertEqual(set(map(RemoteObject, refs(2))), config.unique)
+
+        with sys_args(objects=refs(1)):
+            self.assertEqual({RemoteObject("s3://bucket/default")}, func().unique)
+
+    def test_invalid_tokens(self):
+        with sys_args(objects=[*refs(3), "local/a", "b"]):
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    with self.assertRaises(SystemExit) as exit_cm:
+                        func()
+        self.assertEqual(2, exit_cm.exception.code)
+        self.assertIn(
+            "argument --objects: invalid RemoteObject values: 'local/a', 'b'",
+            stderr.getvalue(),
+        )
+
+        with self.assertRaises(argparse.ArgumentError):
+            ParseSession(func).call(["--objects", "s3://bucket/0", "c"])
+
+    def test_processes(self):
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            # forking a process with threads can deadlock the workers
+            self.assertEqual("forkserver", _process_context().get_start_method())
+
+        @with_argparse
+        def lengths(values: Annotated[list[int], Parallel(2, "process")]):
+            return values
+
+        with sys_args(values=list(range(10))):
+            self.assertEqual(list(range(10)), lengths())
+
+        @with_argparse
+        def numbers(values: Annotated[list[int | float], Parallel(2, "process")]):
+            return values
+
+        with sys_args(values=["1", "2.5", "3"]):
+            values = numbers()
+        self.assertEqual([1, 2.5, 3], values)
+        self.assertEqual([int, float, int], list(map(type, values)))
+
+        class Local:
+            def __init__(self, value: str):
+                self.value = value
+
+        @with_argparse
+        def local(values: Annotated[list[Local], Parallel(executor="process")]):
+            return values
+
+        with sys_args(values=["a", "b"]):
+            with self.assertRaisesRegex(ValueError, "cannot be pickled"):
+                local()
+
+    def test_custom_functions_are_not_parallel(self):
+        def load(refs: list[str]) -> list[RemoteObject]:
+            return [RemoteObject(ref) for ref in refs]
+
+        def func(objects: Annotated[list[RemoteObject], Parallel()]):
+            return objects
+
+        wa = WithArgparse(func, allow_custom={"objects": load})
+        with self.assertWarnsRegex(UserWarning, "registered type"):
+            objects = wa.call((), {}, ["--objects", *refs(2)])
+        self.assertEqual(refs(2), [obj.ref for obj in objects])
+        self.assertEqual({threading.current_thread().name}, RemoteObject.threads)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import unittest
+from dataclasses import dataclass
+from typing import ClassVar, Literal, Optional, TYPE_CHECKING
+
+from tools import sys_args
+from with_argparse import with_argparse, with_dataclass
+
+if TYPE_CHECKING:
+    from heavy_module_that_is_never_imported import Tokenizer  # type: ignore
+
+
+@dataclass
+class Base:
+    mode: Literal["a", "b"]
+
+
+@dataclass
+class Config(Base):
+    # annotations of non-fields are never evaluated
+    tokenizer: ClassVar[Optional[Tokenizer]] = None
+
+    count: int = 1
+    child: Optional[Child] = None
+
+
+@dataclass
+class Child:
+    name: str
+
+
+class PostponedAnnotationsTest(unittest.TestCase):
+    def test_dataclass(self):
+        @with_dataclass
+        def func(config: Config):
+            return config
+
+        with sys_args(mode="b", count=3):
+            self.assertEqual(Config("b", 3), func())
+
+    def test_plain(self):
+        @with_argparse
+        def func(first: int, second: list[str], third: Optional[float] = None):
+            return first, second, third
+
+        with sys_args(first=1, second=["a", "b"], third=0.5):
+            self.assertEqual((1, ["a", "b"], 0.5), func())
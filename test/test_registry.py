@@ -0,0 +1,90 @@
+import unittest
+from dataclasses import dataclass, make_dataclass
+from datetime import date
+from typing import Union
+
+from tools import sys_args
+from with_argparse import register_type, TypeSpec, with_argparse, with_dataclass
+from with_argparse.registry import compile_type
+
+
+class Celsius(float):
+    pass
+
+
+class Kelvin(Celsius):
+    pass
+
+
+class RegistryTest(unittest.TestCase):
+    def test_custom_type(self):
+        @register_type(date)
+        def _date(annotation, compile_type):
+            return TypeSpec(date.fromisoformat)
+
+        @dataclass
+        class Schedule:
+            start: date
+            holidays: list[date]
+
+        @with_dataclass
+        def func(schedule: Schedule):
+            return schedule
+
+        with sys_args(start="2024-01-02", holidays=["2024-12-24", "2024-12-25"]):
+            self.assertEqual(
+                Schedule(date(2024, 1, 2), [date(2024, 12, 24), date(2024, 12, 25)]),
+                func(),
+            )
+
+    def test_base_class_handler(self):
+        @register_type(Celsius)
+        def _celsius(annotation, compile_type):
+            return TypeSpec(lambda value: annotation(value.removesuffix("C")))
+
+        self.assertEqual(Kelvin(3.0), compile_type(Kelvin).type("3C"))
+        self.assertIsInstance(compile_type(Kelvin).type("3C"), Kelvin)
+
+    def test_memoized(self):
+        calls = []
+
+        class Token(str):
+            pass
+
+        @register_type(Token)
+        def _token(annotation, compile_type):
+            calls.append(annotation)
+            return TypeSpec(annotation)
+
+        config = make_dataclass(
+            "Config", [(f"field{i}", list[Token], None) for i in range(300)]
+        )
+
+        @with_dataclass
+        def func(config: config):  # type: ignore[valid-type]
+            return config
+
+        with sys_args(field3=["a"]):
+            self.assertEqual(["a"], func().field3)
+        self.assertEqual([Token], calls)
+        self.assertIs(compile_type(list[Token]), compile_type(list[Token]))
+
+    def test_union_order(self):
+        @with_argparse
+        def int_first(x: Union[int, str]):
+            return x
+
+        @with_argparse
+        def str_first(x: Union[str, int]):
+            return x
+
+        @with_argparse
+        def str_list(x: list[Union[str, int]]):
+            return x
+
+        # equal annotations, whose members are tried in their own order
+        with sys_args(x="5"):
+            self.assertEqual(5, int_first())
+            self.assertEqual("5", str_first())
+        with sys_args(x=["5"]):
+            self.assertEqual(["5"], str_list())
@@ -0,0 +1,196 @@
+import contextlib
+import enum
+import io
+import json
+import unittest
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+from with_argparse import with_argparse, with_dataclass
+from with_argparse.main import _get_with_argparse
+from with_argparse.schema import json_schema, main
+
+
+class Color(enum.Enum):
+    RED = "r"
+    BLUE = "b"
+
+
+@dataclass
+class Config:
+    epochs: int = field(metadata={"help": "number of epochs", "aliases": ["-e"]})
+    lr: float = 0.1
+    mode: Literal["train", "eval"] = "train"
+    color: Color = Color.RED
+    output: Path = Path("out")
+    seed: Optional[int] = None
+    layers: list[int] = field(default_factory=lambda: [64])
+    tags: set[str] = field(default_factory=set)
+    weights: dict[str, float] = field(default_factory=dict)
+    verbose: bool = False
+
+
+@with_dataclass
+def train(config: Config):
+    """
+    Trains a model
+    """
+    return config
+
+
+@with_argparse
+def evaluate(checkpoint: Path, batch_size: int = 32):
+    return checkpoint, batch_size
+
+
+_TYPES = {
+    "null": lambda value: value is None,
+    "boolean": lambda value: isinstance(value, bool),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float))
+    and not isinstance(value, bool),
+    "string": lambda value: isinstance(value, str),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+}
+
+
+def _is_valid(schema: dict[str, Any], value: Any) -> bool:
+    # the subset of JSON Schema used by with_argparse.schema
+    if "type" in schema and not _TYPES[schema["type"]](value):
+        return False
+    if "enum" in schema and value not in schema["enum"]:
+        return False
+    if "anyOf" in schema and not any(_is_valid(s, value) for s in schema["anyOf"]):
+        return False
+    if isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            return False
+        if not all(_is_valid(schema.get("items", {}), item) for item in value):
+            return False
+    if isinstance(value, dict):
+        if any(key not in value for key in schema.get("required", ())):
+            return False
+        properties = schema.get("properties", {})
+        additional = schema.get("additionalProperties", True)
+        for key, item in value.items():
+            if key in properties:
+                if not _is_valid(properties[key], item):
+                    return False
+            elif additional is False or (
+                isinstance(additional, dict) and not _is_valid(additional, item)
+            ):
+                return False
+    return True
+
+
+def _to_argv(func, record: dict[str, Any]) -> list[str]:
+    arguments = _get_with_argparse(func).arguments
+    argv = []
+    for key, value in record.items():
+        if value is None:
+            continue
+        action = arguments.get(key)
+        if action is not None and action.nargs == 0 and isinstance(value, bool):
+            if value != action.default:
+                argv.append("--" + key)
+            continue
+        argv.append("--" + key)
+        if isinstance(value, dict):
+            argv.extend(f"{k}={v}" for k, v in value.items())
+        elif isinstance(value, list):
+            argv.extend(map(str, value))
+        else:
+            argv.append(str(value))
+    return argv
+
+
+def _parses(func, argv: list[str]) -> bool:
+    with contextlib.redirect_stdout(io.StringIO()):
+        with contextlib.redirect_stderr(io.StringIO()):
+            try:
+                _get_with_argparse(func).call((), {}, argv)
+            except SystemExit:
+                return False
+    return True
+
+
+class SchemaTest(unittest.TestCase):
+    def test_schema(self):
+        schema = json_schema(train)
+        self.assertEqual("train", schema["title"])
+        self.assertEqual("Trains a model", schema["description"])
+        self.assertEqual(["epochs"], schema["required"])
+        properties = schema["properties"]
+        self.assertEqual(
+            {
+                "type": "integer",
+                "description": "number of epochs",
+                "x-aliases": ["-e"],
+            },
+            properties["epochs"],
+        )
+        self.assertEqual(
+            {"enum": ["train", "eval"], "default": "train"}, properties["mode"]
+        )
+        self.assertEqual(["RED", "BLUE", "r", "b"], properties["color"]["enum"])
+        self.assertEqual(
+            {"anyOf": [{"type": "integer"}, {"type": "null"}], "default": None},
+            properties["seed"],
+        )
+        self.assertEqual(
+            {"type": "array", "items": {"type": "integer"}, "minItems": 1},
+            properties["layers"],
+        )
+        self.assertEqual(
+            {"type": "object", "additionalProperties": {"type": "number"}},
+            properties["weights"],
+        )
+        self.assertEqual({"type": "string", "default": "out"}, properties["output"])
+
+    def test_validation_agrees_with_parsing(self):
+        cases = [
+            ({"epochs": 1}, True),
+            ({}, False),
+            ({"epochs": "many"}, False),
+            ({"epochs": 1, "lr": 1}, True),
+            ({"epochs": 1, "lr": "fast"}, False),
+            ({"epochs": 1, "mode": "eval"}, True),
+            ({"epochs": 1, "mode": "test"}, False),
+            ({"epochs": 1, "color": "BLUE"}, True),
+            ({"epochs": 1, "color": "r"}, True),
+            ({"epochs": 1, "color": "GREEN"}, False),
+            ({"epochs": 1, "output": "model"}, True),
+            ({"epochs": 1, "seed": None}, True),
+            ({"epochs": 1, "seed": 3}, True),
+            ({"epochs": 1, "layers": [32, 16]}, True),
+            ({"epochs": 1, "layers": []}, False),
+            ({"epochs": 1, "layers": [32, "wide"]}, False),
+            ({"epochs": 1, "tags": ["a", "b", "a"]}, True),
+            ({"epochs": 1, "weights": {"a": 0.5, "b": 2}}, True),
+            ({"epochs": 1, "weights": {"a": "heavy"}}, False),
+            ({"epochs": 1, "verbose": True}, True),
+            ({"epochs": 1, "verbose": "yes"}, False),
+            ({"epochs": 1, "unknown": 1}, False),
+        ]
+        schema = json_schema(train)
+        for record, valid in cases:
+            with self.subTest(record=record):
+                self.assertEqual(valid, _is_valid(schema, record))
+                self.assertEqual(valid, _parses(train, _to_argv(train, record)))
+
+    def test_main(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            main(["test_schema:train", "test_schema:evaluate"])
+        schemas = json.loads(stdout.getvalue())
+        self.assertEqual(["test_schema:train", "test_schema:evaluate"], list(schemas))
+        self.assertEqual(
+            {
+                "checkpoint": {"type": "string"},
+                "batch_size": {"type": "integer", "default": 32},
+            },
+            schemas["test_schema:evaluate"]["properties"],
+        )
+        self.assertEqual(["checkpoint"], schemas["test_schema:evaluate"]["required"])
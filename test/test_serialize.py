@@ -0,0 +1,107 @@
+import unittest
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal, Optional
+
+import attrs
+
+from with_argparse import with_argparse, with_attrs, with_dataclass
+from with_argparse.main import _get_with_argparse
+from with_argparse.serialize import to_argv
+
+
+@dataclass
+class Job:
+    name: str
+    mode: Literal["train", "eval"] = "train"
+    layers: Optional[list[int]] = None
+    tags: Optional[set[str]] = None
+    offset: int = 0
+    output: Optional[Path] = None
+    verbose: bool = False
+    shuffle: bool = True
+
+
+@dataclass
+class Cluster:
+    nodes: int = 1
+
+
+@with_dataclass
+def submit(job: Job, cluster: Cluster):
+    return job, cluster
+
+
+def _parse(func, argv):
+    return _get_with_argparse(func).call((), {}, argv)
+
+
+class SerializeTest(unittest.TestCase):
+    def test_defaults_are_omitted(self):
+        self.assertEqual(["--name=a"], to_argv(submit, Job("a"), Cluster()))
+
+    def test_round_trip(self):
+        jobs = [
+            Job("a"),
+            Job("-b", mode="eval", offset=-3, verbose=True, shuffle=False, layers=[1]),
+            Job("c", layers=[1, 2, 3], tags={"x", "y"}, output=Path("/tmp/out")),
+        ]
+        for job in jobs:
+            for cluster in (Cluster(), Cluster(nodes=4)):
+                with self.subTest(job=job, cluster=cluster):
+                    argv = to_argv(submit, job, cluster=cluster)
+                    self.assertEqual((job, cluster), _parse(submit, argv))
+
+    def test_unrepresentable_values(self):
+        with self.assertRaises(ValueError):
+            to_argv(submit, Job("a", mode="test"), Cluster())  # type: ignore[arg-type]
+        with self.assertRaises(ValueError):
+            to_argv(submit, Job("a", layers=[]), Cluster())
+        with self.assertRaises(TypeError):
+            to_argv(submit, cluster=Cluster())
+
+    def test_default_factory(self):
+        @dataclass
+        class Config:
+            names: list[str] = field(default_factory=lambda: ["a"])
+
+        @with_dataclass
+        def func(config: Config):
+            return config
+
+        self.assertEqual([], to_argv(func, Config()))
+        self.assertEqual([], to_argv(func))
+        argv = to_argv(func, Config(["b", "c"]))
+        self.assertEqual(["--names", "b", "c"], argv)
+        self.assertEqual(Config(["b", "c"]), _parse(func, argv))
+
+    def test_dict(self):
+        @with_argparse
+        def func(weights: dict[str, float], steps: int = 1):
+            return weights, steps
+
+        argv = to_argv(func, {"a": 0.5, "b": 1.0})
+        self.assertEqual(["--weights", "a=0.5", "b=1.0"], argv)
+        with self.assertRaises(ValueError):
+            to_argv(func, {"a=b": 1.0})
+        self.assertEqual(({"a": 0.5}, 1), _parse(func, to_argv(func, {"a": 0.5})))
+
+    def test_plain_and_attrs(self):
+        @with_argparse
+        def plain(count: int, ratio: float = 0.5, names: list[str] | None = None):
+            return count, ratio, names
+
+        argv = to_argv(plain, 3, names=["a", "b"])
+        self.assertEqual(["--count=3", "--names", "a", "b"], argv)
+        self.assertEqual((3, 0.5, ["a", "b"]), _parse(plain, argv))
+
+        @attrs.define
+        class Config:
+            value: float = 1.0
+
+        @with_attrs
+        def func(config: Config):
+            return config
+
+        config = Config(1 / 3)
+        self.assertEqual(config, _parse(func, to_argv(func, config)))
@@ -0,0 +1,79 @@
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from dataclasses import dataclass
+
+from tools import sys_args
+from with_argparse import with_dataclass
+from with_argparse.client import run
+from with_argparse.server import serve
+
+
+@dataclass
+class Config:
+    name: str
+    repeat: int = 1
+
+
+@with_dataclass
+def greet(config: Config):
+    print(" ".join([f"hello {config.name}"] * config.repeat))
+    print(os.getcwd())
+    print(os.environ.get("GREETING_SUFFIX", ""))
+    os.environ["GREETING_SUFFIX"] = "leaked"
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "server mode requires os.fork")
+class ServerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmp.name, "server.sock")
+        context = multiprocessing.get_context("fork")
+        self.server = context.Process(target=serve, args=(greet, self.socket_path))
+        with sys_args():
+            self.server.start()
+        for _ in range(500):
+            if os.path.exists(self.socket_path):
+                break
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.join()
+        self.tmp.cleanup()
+
+    def _run(self, *argv: str, env=None) -> tuple[int, str, str]:
+        with tempfile.TemporaryFile("w+") as out, tempfile.TemporaryFile("w+") as err:
+            exit_code = run(
+                self.socket_path,
+                ["greet", *argv],
+                env=env,
+                cwd=self.tmp.name,
+                stdout=out,
+                stderr=err,
+            )
+            out.seek(0)
+            err.seek(0)
+            return exit_code, out.read(), err.read()
+
+    def test_forwards_argv_cwd_and_env(self):
+        exit_code, out, _ = self._run(
+            "--name", "world", "--repeat", "2", env={"GREETING_SUFFIX": "!"}
+        )
+        self.assertEqual(0, exit_code)
+        self.assertEqual(
+            ["hello world hello world", os.path.realpath(self.tmp.name), "!"],
+            out.splitlines(),
+        )
+
+    def test_requests_are_isolated(self):
+        self.assertEqual(0, self._run("--name", "a", env={})[0])
+        _, out, _ = self._run("--name", "b", env={})
+        self.assertEqual("", out.splitlines()[-1])
+
+    def test_usage_error_exit_code(self):
+        exit_code, _, err = self._run("--repeat", "2")
+        self.assertEqual(2, exit_code)
+        self.assertIn("--name", err)
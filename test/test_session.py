@@ -0,0 +1,74 @@
+import argparse
+import unittest
+from dataclasses import dataclass
+from typing import Optional
+
+from with_argparse import ParseSession, register_type, TypeSpec, with_dataclass
+
+
+class Tokenizer:
+    loads: list[str] = []
+
+    def __init__(self, name: str):
+        Tokenizer.loads.append(name)
+        self.name = name
+
+
+@register_type(Tokenizer)
+def _tokenizer(annotation, compile_type):
+    return TypeSpec(Tokenizer)
+
+
+@dataclass
+class Config:
+    tokenizer: Tokenizer
+    lr: float = 0.1
+    layers: Optional[list[int]] = None
+    verbose: bool = False
+
+
+@with_dataclass
+def train(config: Config):
+    return config
+
+
+class ParseSessionTest(unittest.TestCase):
+    def setUp(self):
+        Tokenizer.loads.clear()
+
+    def test_only_changed_arguments_are_converted(self):
+        session = ParseSession(train)
+
+        config = session.call("--tokenizer 'bpe 32k' --lr 0.2")
+        self.assertEqual(("bpe 32k", 0.2), (config.tokenizer.name, config.lr))
+        self.assertEqual(["bpe 32k"], Tokenizer.loads)
+
+        config = session.call(["--tokenizer", "bpe 32k", "--lr", "0.3", "--verbose"])
+        self.assertEqual((0.3, True), (config.lr, config.verbose))
+        self.assertEqual(["bpe 32k"], Tokenizer.loads)
+        self.assertEqual({"lr", "verbose"}, session.converted)
+
+        values = session.parse("--tokenizer 'bpe 32k' --layers 1 2")
+        self.assertEqual([1, 2], values["layers"])
+        self.assertEqual(0.1, values["lr"])
+        self.assertEqual({"lr", "layers", "verbose"}, session.converted)
+
+        session.invalidate("tokenizer")
+        session.parse("--tokenizer 'bpe 32k' --layers 1 2")
+        self.assertEqual({"tokenizer"}, session.converted)
+        self.assertEqual(["bpe 32k", "bpe 32k"], Tokenizer.loads)
+
+    def test_invalid_command_lines(self):
+        session = ParseSession(train)
+        for command_line in (
+            "",
+            "--tokenizer a --lr x",
+            "--tokenizer a --unknown",
+            "--tokenizer a --layers",
+        ):
+            with self.subTest(command_line=command_line):
+                with self.assertRaises(argparse.ArgumentError):
+                    session.parse(command_line)
+
+        # a failed parse does not leave stale values behind
+        self.assertEqual(0.1, session.parse("--tokenizer a")["lr"])
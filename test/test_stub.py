@@ -0,0 +1,128 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from with_argparse import with_argparse
+from with_argparse.stub import handoff, main
+
+_APP = """\
+import enum
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+from with_argparse import with_dataclass
+
+Path("imported").touch()
+
+
+class Color(enum.Enum):
+    RED = "r"
+    BLUE = "b"
+
+
+@dataclass
+class Config:
+    lr: float
+    mode: Literal["train", "eval"] = "train"
+    color: Color = Color.RED
+    output: Path = Path("out")
+    epochs: list[int] = field(default_factory=lambda: [1])
+    verbose: bool = False
+
+
+@with_dataclass
+def train(config: Config):
+    print(config)
+"""
+
+
+@with_argparse
+def example(lr: float = 0.1):
+    return lr
+
+
+class StubTest(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = Path(tmp_dir.name)
+        (self.root / "heavy_app.py").write_text(_APP)
+        self.env = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join([str(self.root), str(Path.cwd().parent)]),
+        )
+        subprocess.run(
+            [sys.executable, "-m", "with_argparse.stub", "heavy_app:train"]
+            + ["-o", "train.py"],
+            cwd=self.root,
+            env=self.env,
+            check=True,
+        )
+        (self.root / "imported").unlink()
+
+    def _run(self, *argv: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, "train.py", *argv],
+            cwd=self.root,
+            env=self.env,
+            capture_output=True,
+            text=True,
+        )
+
+    def test_validates_before_import(self):
+        for argv in [
+            ("--lr", "fast"),
+            ("--lr", "1", "--mode", "test"),
+            ("--lr", "1", "--color", "GREEN"),
+            ("--lr", "1", "--unknown"),
+            ("--mode", "eval"),
+            ("--help",),
+        ]:
+            with self.subTest(argv=argv):
+                completed = self._run(*argv)
+                self.assertEqual(2, completed.returncode)
+                self.assertIn("--lr float", completed.stdout + completed.stderr)
+                self.assertFalse((self.root / "imported").exists())
+
+        completed = self._run("--lr", "fast")
+        self.assertIn("invalid float value: 'fast'", completed.stderr)
+        completed = self._run("--lr", "1", "--color", "GREEN")
+        self.assertIn("invalid Color value: 'GREEN'", completed.stderr)
+
+    def test_hands_over_values(self):
+        completed = self._run(
+            "--lr", "0.5", "--color", "b", "--epochs", "2", "3", "--verbose"
+        )
+        self.assertEqual("", completed.stderr)
+        self.assertIn(
+            "Config(lr=0.5, mode='train', color=<Color.BLUE: 'b'>, ", completed.stdout
+        )
+        self.assertIn("epochs=[2, 3], verbose=True)", completed.stdout)
+        self.assertTrue((self.root / "imported").exists())
+
+    def test_outdated_stub(self):
+        sys.path.insert(0, str(self.root))
+        self.addCleanup(sys.path.remove, str(self.root))
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        self.addCleanup(os.chdir, cwd)
+        import heavy_app
+
+        # values of an outdated stub are discarded and the command line is parsed again
+        with self.assertLogs("with_argparse", "WARNING"):
+            with unittest.mock.patch("builtins.print") as print_mock:
+                handoff(heavy_app.train, {"lr": "stale"}, ["--lr", "2"], "0" * 16)
+        config = print_mock.call_args.args[0]
+        self.assertEqual(2.0, config.lr)
+
+    def test_stdout(self):
+        with unittest.mock.patch("sys.stdout.write") as write:
+            self.assertEqual(0, main(["test_stub:example"]))
+        source = "".join(call.args[0] for call in write.call_args_list)
+        self.assertIn("TARGET = 'test_stub:example'", source)
+        compile(source, "stub.py", "exec")
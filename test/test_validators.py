@@ -0,0 +1,84 @@
+import argparse
+import contextlib
+import io
+import tempfile
+import unittest
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Annotated, Optional
+
+from tools import sys_args
+from with_argparse import ParseSession, with_dataclass
+from with_argparse.configure_argparse import WithArgparse
+from with_argparse.validators import Exists, IsDir, IsFile, MaxSize, Readable, Validator
+
+
+class ValidatorsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for name, size in [("a.bin", 2), ("b.bin", 2), ("large.bin", 64)]:
+            (self.root / name).write_bytes(b"x" * size)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_checks(self):
+        @dataclass
+        class Config:
+            vocab: Annotated[Path, IsFile(), Readable()]
+            inputs: Annotated[list[Path], Exists(), MaxSize(8)]
+            output: Annotated[Optional[Path], IsDir()] = None
+
+        @with_dataclass
+        def func(config: Config):
+            return config
+
+        with sys_args(vocab=self.root / "a.bin", inputs=[self.root / "b.bin"]):
+            self.assertEqual([self.root / "b.bin"], func().inputs)
+
+        argv = {
+            "vocab": self.root,
+            "inputs": [self.root / "missing.bin", self.root / "large.bin"],
+            "output": self.root / "a.bin",
+        }
+        with sys_args(**argv):
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                    with self.assertRaises(SystemExit) as exit_cm:
+                        func()
+        self.assertEqual(2, exit_cm.exception.code)
+        self.assertIn("--vocab Path", stdout.getvalue())
+        # all failures are reported together
+        errors = stderr.getvalue().splitlines()
+        self.assertEqual(4, len(errors))
+        self.assertIn("argument --vocab:", errors[0])
+        self.assertIn("is not a file", errors[0])
+        self.assertIn("missing.bin' does not exist", errors[1])
+        self.assertIn("has 64 bytes, more than 8", errors[2])
+        self.assertIn("argument --output:", errors[3])
+
+        with self.assertRaises(argparse.ArgumentError):
+            ParseSession(func).call(["--vocab", str(self.root), "--inputs", "x"])
+
+    def test_glob_expansions(self):
+        def func(inputs: Annotated[list[Path], MaxSize(8)]):
+            return sorted(path.name for path in inputs)
+
+        wa = WithArgparse(func, allow_glob={"inputs"})
+        self.assertEqual(
+            ["a.bin", "b.bin"], wa.call((), {}, ["--inputs", str(self.root / "?.bin")])
+        )
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            with contextlib.redirect_stdout(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    wa.call((), {}, ["--inputs", str(self.root / "*.bin")])
+        self.assertIn("large.bin", stderr.getvalue())
+        self.assertNotIn("a.bin", stderr.getvalue())
+
+    def test_incomplete_validator(self):
+        class NoCheck(Validator):
+            pass
+
+        with self.assertRaises(TypeError):
+            NoCheck()
@@ -0,0 +1,93 @@
+import argparse
+import unittest
+from dataclasses import dataclass, field
+
+import attrs
+
+from with_argparse import with_attrs, with_dataclass
+from with_argparse.variants import ConfigVariant, parse_variants
+
+
+@dataclass(frozen=True)
+class Config:
+    data: list[str]
+    lr: float = 0.1
+    tags: list[str] = field(default_factory=list)
+    verbose: bool = False
+
+    @property
+    def steps(self) -> int:
+        return int(len(self.data) / self.lr)
+
+    def describe(self) -> str:
+        return f"lr={self.lr}"
+
+
+@with_dataclass
+def train(config: Config):
+    return config
+
+
+class VariantsTest(unittest.TestCase):
+    def test_shared_values(self):
+        overrides = ["--lr 0.2", ["--lr", "0.2", "--verbose"], "--data c", ""]
+        variants = [
+            variant["config"]
+            for variant in parse_variants(train, overrides, base="--data a b")
+        ]
+        first, second, third, unchanged = variants
+
+        self.assertIsInstance(first, ConfigVariant)
+        self.assertEqual({"lr": 0.2}, dict(first.changes))
+        self.assertEqual(
+            (0.2, False, ["a", "b"]), (first.lr, first.verbose, first.data)
+        )
+        # unchanged values are shared with the base, equal changes with each other
+        self.assertIs(first.base, second.base)
+        self.assertIs(first.data, second.data)
+        self.assertIs(first.changes["lr"], second.changes["lr"])
+        self.assertEqual(["c"], third.data)
+        self.assertEqual({}, dict(unchanged.changes))
+        self.assertEqual(Config(["a", "b"]), unchanged.base)
+
+        # properties and methods see the changed values
+        self.assertEqual((10, "lr=0.2"), (first.steps, first.describe()))
+        self.assertEqual((20, "lr=0.1"), (unchanged.steps, unchanged.describe()))
+        with self.assertRaises(AttributeError):
+            first.missing
+
+        config = second.materialize()
+        self.assertEqual(Config(["a", "b"], 0.2, verbose=True), config)
+        self.assertEqual([], config.tags)
+        self.assertEqual(first.replace(verbose=True), second)
+        self.assertEqual(["x"], first.replace(tags=["x"]).materialize().tags)
+        with self.assertRaises(TypeError):
+            first.replace(epochs=2)
+        with self.assertRaises(AttributeError):
+            first.lr = 0.3
+
+        with self.assertRaises(argparse.ArgumentError):
+            list(parse_variants(train, ["--lr x"], base="--data a"))
+
+    def test_converters(self):
+        conversions = []
+
+        def to_layers(tokens):
+            conversions.append(tokens)
+            return tuple(map(int, tokens))
+
+        @attrs.define
+        class AttrsConfig:
+            layers: list[int] = attrs.field(default=(1,), converter=to_layers)
+
+        @with_attrs
+        def func(config: AttrsConfig):
+            return config
+
+        (variant,) = parse_variants(func, ["--layers 2 3"])
+        self.assertEqual((1,), variant["config"].base.layers)
+        conversions.clear()
+        # converted once per variant
+        self.assertEqual((2, 3), variant["config"].layers)
+        self.assertEqual((2, 3), variant["config"].layers)
+        self.assertEqual(1, len(conversions))
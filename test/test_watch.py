@@ -0,0 +1,87 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from with_argparse import register_type, TypeSpec, with_argparse
+from with_argparse.watch import _InotifyWatcher, _PollingWatcher, watch
+
+
+class Vocabulary:
+    loads: list[str] = []
+
+    def __init__(self, path: str):
+        Vocabulary.loads.append(os.path.basename(path))
+        self.words = Path(path).read_text().split()
+
+
+@register_type(Vocabulary)
+def _vocabulary(annotation, compile_type):
+    return TypeSpec(Vocabulary)
+
+
+class WatchTest(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.root = Path(tmp_dir.name)
+        Vocabulary.loads.clear()
+
+    def _assert_detects_changes(self, make_watcher):
+        path = self.root / "config.txt"
+        path.write_text("a")
+        watcher = make_watcher([str(path)])
+        try:
+            self.assertEqual(set(), watcher.wait(0.01))
+            path.write_text("ab")
+            self.assertEqual({str(path)}, watcher.wait(5))
+
+            # editors often replace files by renaming a new file over them
+            replacement = self.root / "config.txt.tmp"
+            replacement.write_text("abc")
+            os.replace(replacement, path)
+            self.assertEqual({str(path)}, watcher.wait(5))
+        finally:
+            watcher.close()
+
+    def test_polling_watcher(self):
+        self._assert_detects_changes(lambda paths: _PollingWatcher(paths, 0.01))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify_watcher(self):
+        self._assert_detects_changes(_InotifyWatcher)
+
+    def test_watch_reconverts_changed_files(self):
+        source_path = self.root / "source.txt"
+        target_path = self.root / "target.txt"
+        source_path.write_text("a b")
+        target_path.write_text("c")
+        runs = []
+
+        @with_argparse
+        def translate(source: Vocabulary, target: Vocabulary):
+            runs.append((source.words, target.words))
+            if len(runs) == 1:
+                # changes while the entry point runs cause another run
+                source_path.write_text("a b d")
+
+        argv = ["--source", str(source_path), "--target", str(target_path)]
+        watch(translate, argv, poll_interval=0.01, max_runs=2)
+
+        self.assertEqual([(["a", "b"], ["c"]), (["a", "b", "d"], ["c"])], runs)
+        self.assertEqual(["source.txt", "target.txt", "source.txt"], Vocabulary.loads)
+
+    def test_interrupt_stops_watching(self):
+        source_path = self.root / "source.txt"
+        source_path.write_text("a")
+        runs = []
+
+        @with_argparse
+        def interrupted(source: Vocabulary):
+            runs.append(source.words)
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            watch(interrupted, ["--source", str(source_path)], max_runs=1)
+        self.assertEqual([["a"]], runs)
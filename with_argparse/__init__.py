@@ -1,3 +1,4 @@
+from .cache import JsonSerializer, PickleSerializer, ResultCache
 from .main import (
     no_argparse,
     ParseArgs,
@@ -7,6 +8,9 @@ from .main import (
     with_attrs,
     with_dataclass,
 )
+from .mapped import MappedFile
+from .registry import register_type, TypeSpec
+from .session import ParseSession
 
 __all__ = [
     "with_argparse",
@@ -16,4 +20,11 @@ __all__ = [
     "with_attrs",
     "partial_argparse",
     "ParseArgs",
+    "ResultCache",
+    "PickleSerializer",
+    "JsonSerializer",
+    "register_type",
+    "TypeSpec",
+    "ParseSession",
+    "MappedFile",
 ]
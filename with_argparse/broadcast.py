@@ -0,0 +1,196 @@
+"""
+Parse once, broadcast to every process of a launch.
+
+When all processes of a multi-process launch run the same entry point, only the first one
+parses the command line (including glob expansion and custom conversions), the others load
+its converted arguments from a shared directory. The mode is enabled by setting both
+
+- `WITH_ARGPARSE_BROADCAST_DIR`: a directory all processes can access
+- `WITH_ARGPARSE_LAUNCH_ID`: an identifier shared by all processes of one launch, unique across launches
+
+and optionally `WITH_ARGPARSE_BROADCAST_TIMEOUT`, the number of seconds followers wait for the leader.
+
+The leader holds a lock on its lock file until it published the arguments, such that followers
+fail right away when the leader dies before publishing, instead of waiting for the timeout.
+Leaders remove the files of launches older than a day from the directory.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence, TypeVar
+
+import attrs
+
+try:
+    import fcntl
+except (
+    ImportError
+):  # e.g. on Windows, where followers of crashed leaders time out instead
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger("with_argparse")
+
+BROADCAST_DIR_ENV = "WITH_ARGPARSE_BROADCAST_DIR"
+LAUNCH_ID_ENV = "WITH_ARGPARSE_LAUNCH_ID"
+TIMEOUT_ENV = "WITH_ARGPARSE_BROADCAST_TIMEOUT"
+
+_T = TypeVar("_T")
+
+
+@attrs.define
+class Broadcast:
+    directory: Path = attrs.field(converter=Path)
+    launch_id: str
+    timeout: float = 600.0
+    poll_interval: float = 0.05
+    # files of earlier launches are removed after this many seconds
+    retention: float = 86400.0
+
+    @classmethod
+    def from_env(cls) -> Optional["Broadcast"]:
+        directory = os.environ.get(BROADCAST_DIR_ENV)
+        launch_id = os.environ.get(LAUNCH_ID_ENV)
+        if not directory or not launch_id:
+            return None
+        return cls(directory, launch_id, float(os.environ.get(TIMEOUT_ENV, 600.0)))
+
+    def key(
+        self,
+        func: Callable,
+        compile_key: Optional[Sequence[str]],
+        argv: Sequence[str],
+    ) -> str:
+        encoded = json.dumps(
+            [
+                self.launch_id,
+                f"{func.__module__}.{func.__qualname__}",
+                list(compile_key or ()),
+                list(argv),
+            ]
+        )
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def exchange(self, key: str, produce: Callable[[], _T]) -> tuple[bool, _T]:
+        """
+        Elects the first process to arrive as the leader, which runs `produce` and publishes its result.
+        All other processes wait for and return the published result.
+
+        Returns:
+            Whether this process is the leader, and the result of `produce`
+
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        result_path = self.directory / f"{key}.pkl"
+        lock_path = self.directory / f"{key}.lock"
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False, self._receive(result_path, lock_path)
+        try:
+            if fcntl is not None:
+                # released by the OS when the leader dies, see `_leader_died`
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            # written once locked, followers treat empty lock files as leaders still starting up
+            os.write(fd, f"{socket.gethostname()} {os.getpid()}".encode())
+            self._remove_expired()
+            return True, self._publish(result_path, produce)
+        finally:
+            os.close(fd)
+
+    def _publish(self, path: Path, produce: Callable[[], _T]) -> _T:
+        try:
+            value = produce()
+        except SystemExit as exc:
+            # usage errors and --help must end the followers with the same exit code
+            self._write(path, pickle.dumps(("exit", exc.code)))
+            raise
+        except BaseException as exc:
+            self._write(path, pickle.dumps(("error", f"{type(exc).__name__}: {exc}")))
+            raise
+
+        try:
+            payload = pickle.dumps(("ok", value), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as exc:
+            self._write(path, pickle.dumps(("error", f"{type(exc).__name__}: {exc}")))
+            raise TypeError(
+                f"Parsed arguments cannot be broadcast to other processes: {exc}"
+            ) from exc
+        self._write(path, payload)
+        logger.debug(f"Published parsed arguments to {path}")
+        return value
+
+    def _write(self, path: Path, payload: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(payload)
+        os.replace(tmp_path, path)
+
+    def _receive(self, path: Path, lock_path: Path) -> Any:
+        deadline = time.monotonic() + self.timeout
+        interval = self.poll_interval / 8
+        while True:
+            try:
+                with open(path, "rb") as file:
+                    status, value = pickle.load(file)
+                break
+            except FileNotFoundError:
+                leader = self._leader_died(lock_path)
+                # the leader might have published right before it exited
+                if leader is not None and not path.exists():
+                    raise RuntimeError(
+                        f"The leader process ({leader}) exited without publishing the parsed arguments "
+                        f"to {path}"
+                    ) from None
+                if time.monotonic() > deadline:
+                    raise TimeoutError(
+                        f"Timed out after {self.timeout}s waiting for the parsed arguments at {path}"
+                    ) from None
+                time.sleep(interval)
+                interval = min(interval * 2, self.poll_interval)
+
+        logger.debug(f"Received parsed arguments from {path}")
+        if status == "exit":
+            sys.exit(value)
+        if status == "error":
+            raise RuntimeError(f"The leader process failed to parse arguments: {value}")
+        return value
+
+    def _leader_died(self, lock_path: Path) -> Optional[str]:
+        """
+        Returns the host and pid of the leader if it no longer holds its lock, None while it is alive
+        """
+        if fcntl is None:
+            return None
+        try:
+            fd = os.open(lock_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return "unknown"
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+            leader = os.read(fd, 1024).decode(errors="replace")
+            return leader or None
+        finally:
+            os.close(fd)
+
+    def _remove_expired(self):
+        expired = time.time() - self.retention
+        for path in self.directory.iterdir():
+            if path.suffix not in (".lock", ".pkl", ".tmp"):
+                continue
+            try:
+                if path.stat().st_mtime < expired:
+                    path.unlink()
+            except FileNotFoundError:
+                # removed by another leader
+                pass
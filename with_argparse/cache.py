@@ -0,0 +1,208 @@
+import dataclasses
+import enum
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path, PurePath
+from typing import Any, BinaryIO, Callable, Iterator, Mapping, Optional, Protocol
+
+import attrs
+
+logger = logging.getLogger("with_argparse")
+
+
+class Serializer(Protocol):
+    suffix: str
+
+    def dump(self, value: Any, file: BinaryIO) -> None: ...
+
+    def load(self, file: BinaryIO) -> Any: ...
+
+
+class PickleSerializer:
+    suffix = ".pkl"
+
+    def dump(self, value: Any, file: BinaryIO) -> None:
+        pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, file: BinaryIO) -> Any:
+        return pickle.load(file)
+
+
+class JsonSerializer:
+    suffix = ".json"
+
+    def dump(self, value: Any, file: BinaryIO) -> None:
+        file.write(json.dumps(value).encode())
+
+    def load(self, file: BinaryIO) -> Any:
+        return json.loads(file.read())
+
+
+def _qualified_name(typ: type) -> str:
+    return f"{typ.__module__}.{typ.__qualname__}"
+
+
+def _sort_key(canonical: Any) -> str:
+    return json.dumps(canonical, sort_keys=True)
+
+
+def _canonical(value: Any, path: str, exclude: set[str]) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, PurePath):
+        return {"path": str(value)}
+    if isinstance(value, enum.Enum):
+        return {"enum": _qualified_name(type(value)), "name": value.name}
+    if isinstance(value, bytes):
+        return {"bytes": value.hex()}
+
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        names = [field.name for field in dataclasses.fields(value)]
+    elif attrs.has(type(value)):
+        names = [field.name for field in attrs.fields(type(value))]
+    else:
+        names = None
+    if names is not None:
+        return {
+            "type": _qualified_name(type(value)),
+            "fields": _canonical_mapping(
+                {name: getattr(value, name) for name in names}, path, exclude
+            ),
+        }
+
+    if isinstance(value, Mapping):
+        # keys are encoded like values, e.g. such that `1` and `"1"` differ
+        items = [
+            [_canonical(key, elem_path, exclude), _canonical(elem, elem_path, exclude)]
+            for key, elem_path, elem in _included_items(value, path, exclude)
+        ]
+        return {"mapping": sorted(items, key=lambda item: _sort_key(item[0]))}
+    if isinstance(value, (list, tuple)):
+        elements = [_canonical(elem, path, exclude) for elem in value]
+        return {"tuple" if isinstance(value, tuple) else "list": elements}
+    if isinstance(value, (set, frozenset)):
+        elements = [_canonical(elem, path, exclude) for elem in value]
+        return {"set": sorted(elements, key=_sort_key)}
+
+    raise TypeError(
+        f"Cannot compute a stable cache key for {path!r} of type {type(value)!r}, "
+        f"exclude it from the key or convert it to a supported type"
+    )
+
+
+def _included_items(
+    value: Mapping[Any, Any], path: str, exclude: set[str]
+) -> Iterator[tuple[Any, str, Any]]:
+    for key, elem in value.items():
+        elem_path = f"{path}.{key}" if path else str(key)
+        if key in exclude or elem_path in exclude:
+            continue
+        yield key, elem_path, elem
+
+
+def _canonical_mapping(value: Mapping[str, Any], path: str, exclude: set[str]) -> Any:
+    """
+    Encodes arguments or fields by their names
+    """
+    return {
+        key: _canonical(elem, elem_path, exclude)
+        for key, elem_path, elem in _included_items(value, path, exclude)
+    }
+
+
+@attrs.define
+class ResultCache:
+    """
+    Stores the results of a decorated function keyed by the fully converted arguments it is called with.
+
+    Args:
+        cache_dir: Directory to store results in, created on first use
+        serializer: How results are stored, defaults to pickle
+        max_size: Maximum total size of stored results in bytes, the least recently used results
+            are evicted first. Unlimited if None
+        exclude: Argument or field names (either plain, e.g. `output`, or dotted, e.g. `args.output`)
+            that do not influence the result and are ignored in the cache key
+
+    """
+
+    cache_dir: Path = attrs.field(converter=Path)
+    serializer: Serializer = attrs.field(factory=PickleSerializer)
+    max_size: Optional[int] = None
+    exclude: set[str] = attrs.field(factory=set, converter=set)
+
+    def key(self, func: Callable, call_args: Mapping[str, Any]) -> str:
+        canonical = {
+            "func": f"{func.__module__}.{func.__qualname__}",
+            "args": _canonical_mapping(call_args, "", self.exclude),
+        }
+        encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / (key + self.serializer.suffix)
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                value = self.serializer.load(file)
+        except FileNotFoundError:
+            return False, None
+        # the modification time doubles as the last access time for eviction
+        os.utime(path)
+        return True, value
+
+    def put(self, key: str, value: Any):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                self.serializer.dump(value, file)
+            if self.max_size is not None:
+                size = os.path.getsize(tmp_path)
+                if size > self.max_size:
+                    logger.debug(
+                        f"Not caching result {key} of {size} bytes, more than max_size"
+                    )
+                    os.unlink(tmp_path)
+                    return
+                # evicting before inserting never evicts the new result itself
+                self.evict(self.max_size - size)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def evict(self, max_size: int):
+        entries = []
+        for path in self.cache_dir.glob("*" + self.serializer.suffix):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total_size <= max_size:
+                break
+            logger.debug(f"Evicting cached result {path}")
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+    def call(
+        self, func: Callable, call_args: Mapping[str, Any], call: Callable[[], Any]
+    ):
+        key = self.key(func, call_args)
+        hit, value = self.get(key)
+        if hit:
+            logger.debug(f"Loaded cached result of {func.__qualname__} for {key}")
+            return value
+
+        value = call()
+        self.put(key, value)
+        return value
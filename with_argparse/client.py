@@ -0,0 +1,94 @@
+"""
+Minimal client for entry points served via `--with-argparse-serve PATH`.
+
+This module only depends on the standard library, such that it can be run
+without importing `with_argparse` or the served application:
+
+    python -S path/to/with_argparse/client.py PATH [ARGS ...]
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+from typing import IO, Mapping, Optional, Sequence
+
+_HEADER = struct.Struct("!I")
+_EXIT_CODE = struct.Struct("!i")
+# exit code reported when the server closed the connection without one
+CONNECTION_LOST_EXIT_CODE = 255
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError(
+                f"Connection closed after {len(buffer)} of {size} bytes"
+            )
+        buffer += chunk
+    return bytes(buffer)
+
+
+def run(
+    socket_path: str | os.PathLike,
+    argv: Sequence[str],
+    env: Optional[Mapping[str, str]] = None,
+    cwd: Optional[str | os.PathLike] = None,
+    stdin: Optional[IO] = None,
+    stdout: Optional[IO] = None,
+    stderr: Optional[IO] = None,
+) -> int:
+    """
+    Forwards a single invocation to a server listening on `socket_path` and returns its exit code.
+
+    Args:
+        socket_path: Path of the unix socket the server listens on
+        argv: Full command line of the invocation, including the program name at index 0
+        env: Environment of the invocation, defaults to `os.environ`
+        cwd: Working directory of the invocation, defaults to `os.getcwd()`
+        stdin: Standard input of the invocation, defaults to `sys.stdin`
+        stdout: Standard output of the invocation, defaults to `sys.stdout`
+        stderr: Standard error of the invocation, defaults to `sys.stderr`
+
+    """
+    streams = [stdin or sys.stdin, stdout or sys.stdout, stderr or sys.stderr]
+    for stream in streams[1:]:
+        stream.flush()
+
+    payload = json.dumps(
+        {
+            "argv": list(argv),
+            "env": dict(os.environ if env is None else env),
+            "cwd": os.fspath(os.getcwd() if cwd is None else cwd),
+        }
+    ).encode()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(os.fspath(socket_path))
+        # the standard streams are passed as file descriptors, the server writes to them directly
+        socket.send_fds(
+            sock,
+            [_HEADER.pack(len(payload))],
+            [stream.fileno() for stream in streams],
+        )
+        sock.sendall(payload)
+        try:
+            (exit_code,) = _EXIT_CODE.unpack(_recv_exact(sock, _EXIT_CODE.size))
+        except ConnectionError:
+            return CONNECTION_LOST_EXIT_CODE
+    return exit_code
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    argv = list(sys.argv if argv is None else argv)
+    if len(argv) < 2:
+        print(f"usage: {argv[0]} SOCKET [ARGS ...]", file=sys.stderr)
+        return 2
+    return run(argv[1], [argv[0]] + argv[2:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
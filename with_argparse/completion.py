@@ -0,0 +1,261 @@
+"""
+Static shell completion scripts for decorated entry points.
+
+Scripts are generated once from the compiled parser and complete options, choices and paths
+without ever starting Python. Each script records a hash of the parser it was generated from,
+such that outdated scripts can be detected, e.g. in a build step:
+
+    python -m with_argparse.completion package.module:main --shell bash --prog train > train.bash
+    python -m with_argparse.completion package.module:main --check train.bash
+"""
+
+import argparse
+import enum
+import hashlib
+import json
+import os
+import re
+import shlex
+import sys
+from pathlib import PurePath
+from typing import Callable, Optional, Sequence
+
+import attrs
+
+from with_argparse.configure_argparse import WithArgparse
+from with_argparse.main import _get_with_argparse, preload
+
+SHELLS = ("bash", "zsh", "fish")
+# part of the spec hash, such that changes to the generated scripts also mark them as outdated
+_FORMAT_VERSION = 1
+_HASH_PATTERN = re.compile(r"^# with_argparse completion spec ([0-9a-f]+)$", re.M)
+
+
+@attrs.define(frozen=True)
+class _CompletionOption:
+    options: tuple[str, ...]
+    help: Optional[str]
+    # number of values, 0 for flags, 1 for single values and -1 for one or more values
+    arity: int
+    choices: Optional[tuple[str, ...]]
+    files: bool
+    glob: bool
+
+
+def _choice_name(value: object) -> str:
+    return value.name if isinstance(value, enum.Enum) else str(value)
+
+
+def _completion_options(wa: WithArgparse) -> list[_CompletionOption]:
+    wa.compile()
+    options = [_CompletionOption(("--help", "-h"), "show help", 0, None, False, False)]
+    for dest, action in wa.arguments.items():
+        if action.nargs == 0:
+            arity = 0
+        elif action.nargs is None:
+            arity = 1
+        else:
+            arity = -1
+        is_glob = dest in wa.allow_glob
+        options.append(
+            _CompletionOption(
+                tuple(action.option_strings),
+                action.help,
+                arity,
+                (
+                    tuple(_choice_name(choice) for choice in action.choices)
+                    if action.choices is not None
+                    else None
+                ),
+                is_glob
+                or (
+                    isinstance(action.type, type) and issubclass(action.type, PurePath)
+                ),
+                is_glob,
+            )
+        )
+    return options
+
+
+def spec_hash(func: Callable | WithArgparse) -> str:
+    """
+    Hashes everything the completion scripts of a decorated function are generated from
+    """
+    wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+    encoded = json.dumps(
+        [_FORMAT_VERSION, [attrs.asdict(opt) for opt in _completion_options(wa)]]
+    )
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+def completion_script(
+    func: Callable | WithArgparse, shell: str, prog: Optional[str] = None
+) -> str:
+    """
+    Generates a self-contained completion script for a decorated function.
+
+    Args:
+        func: A function decorated with `with_argparse`, `with_dataclass` or `with_attrs`
+        shell: One of `bash`, `zsh` or `fish`
+        prog: Name of the command to complete, defaults to the name of the function
+
+    """
+    if shell not in SHELLS:
+        raise ValueError(f"Unsupported shell {shell!r}, expected one of {SHELLS}")
+    wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+    prog = prog or wa.func.__name__
+    options = _completion_options(wa)
+    header = (
+        f"# with_argparse completion for {prog}, regenerate when the entry point changes\n"
+        f"# with_argparse completion spec {spec_hash(wa)}\n"
+    )
+    if shell == "bash":
+        return header + _bash_script(prog, options)
+    elif shell == "zsh":
+        return f"#compdef {prog}\n" + header + _zsh_script(options)
+    return header + _fish_script(prog, options)
+
+
+def is_stale(func: Callable | WithArgparse, script: str | os.PathLike) -> bool:
+    """
+    Whether a completion script is missing or was generated from a different parser than the current one
+    """
+    try:
+        with open(script) as file:
+            match = _HASH_PATTERN.search(file.read())
+    except FileNotFoundError:
+        return True
+    return match is None or match.group(1) != spec_hash(func)
+
+
+def _words(values: Sequence[str]) -> str:
+    return " ".join(shlex.quote(value) for value in values)
+
+
+def _bash_script(prog: str, options: list[_CompletionOption]) -> str:
+    cases = []
+    for opt in options:
+        if opt.arity == 0:
+            continue
+        if opt.choices is not None:
+            body = f'COMPREPLY=($(compgen -W {shlex.quote(_words(opt.choices))} -- "$cur"))'
+        elif opt.files:
+            body = (
+                'compopt -o filenames 2>/dev/null; COMPREPLY=($(compgen -f -- "$cur"))'
+            )
+            if opt.glob:
+                # patterns are left as they are for the entry point to expand
+                body = f'[[ "$cur" == *[*?[]* ]] || {{ {body}; }}'
+        else:
+            body = "COMPREPLY=()"
+        if opt.arity == 1:
+            # single values are only completed directly after their option
+            body = f"if (( i == COMP_CWORD - 1 )); then {body}; return; fi"
+        else:
+            body = f"{body}; return"
+        cases.append(f"            {'|'.join(opt.options)}) {body} ;;")
+
+    all_options = [option for opt in options for option in opt.options]
+    function = "_with_argparse_" + re.sub(r"\W", "_", prog)
+    return (
+        f"{function}() {{\n"
+        '    local cur="${COMP_WORDS[COMP_CWORD]}" i\n'
+        '    if [[ "$cur" != -* ]]; then\n'
+        "        for ((i = COMP_CWORD - 1; i > 0; i--)); do\n"
+        '            [[ "${COMP_WORDS[i]}" == -* ]] && break\n'
+        "        done\n"
+        '        case "${COMP_WORDS[i]}" in\n'
+        + "".join(case + "\n" for case in cases)
+        + "        esac\n"
+        "    fi\n"
+        f'    COMPREPLY=($(compgen -W {shlex.quote(_words(all_options))} -- "$cur"))\n'
+        "}\n"
+        f"complete -F {function} {shlex.quote(prog)}\n"
+    )
+
+
+def _zsh_quote(value: str) -> str:
+    return re.sub(r"([\[\]:\\'])", r"\\\1", value)
+
+
+def _zsh_script(options: list[_CompletionOption]) -> str:
+    specs = []
+    for opt in options:
+        description = _zsh_quote(opt.help or "")
+        if opt.choices is not None:
+            action = "(" + " ".join(_zsh_quote(choice) for choice in opt.choices) + ")"
+        elif opt.files:
+            action = "_files"
+        else:
+            action = " "
+        values = ""
+        if opt.arity == 1:
+            values = f":{_zsh_quote(opt.options[0].lstrip('-'))}:{action}"
+        elif opt.arity == -1:
+            values = f":*:{_zsh_quote(opt.options[0].lstrip('-'))}:{action}"
+        exclusive = "(" + " ".join(opt.options) + ")"
+        for option in opt.options:
+            specs.append(shlex.quote(f"{exclusive}{option}[{description}]{values}"))
+    return "_arguments -s \\\n" + " \\\n".join(f"    {spec}" for spec in specs) + "\n"
+
+
+def _fish_script(prog: str, options: list[_CompletionOption]) -> str:
+    command = f"complete -c {shlex.quote(prog)}"
+    lines = [f"{command} -f"]
+    for opt in options:
+        parts = [command]
+        for option in opt.options:
+            if option.startswith("--"):
+                parts.append(f"-l {shlex.quote(option[2:])}")
+            elif len(option) == 2:
+                parts.append(f"-s {shlex.quote(option[1:])}")
+            else:
+                parts.append(f"-o {shlex.quote(option[1:])}")
+        if opt.help:
+            parts.append(f"-d {shlex.quote(opt.help)}")
+        if opt.arity != 0:
+            if opt.choices is not None:
+                parts.append(f"-x -a {shlex.quote(_words(opt.choices))}")
+            elif opt.files:
+                parts.append("-r -F")
+            else:
+                parts.append("-x")
+        lines.append(" ".join(parts))
+    return "".join(line + "\n" for line in lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m with_argparse.completion",
+        description="Generate a static shell completion script for a decorated entry point",
+    )
+    parser.add_argument("target", help="entry point of the form 'module:function'")
+    parser.add_argument("--shell", choices=SHELLS, default="bash")
+    parser.add_argument("--prog", default=None, help="name of the command to complete")
+    parser.add_argument("--output", "-o", default=None, help="defaults to stdout")
+    parser.add_argument(
+        "--check",
+        default=None,
+        metavar="SCRIPT",
+        help="exit with 1 if SCRIPT is missing or outdated instead of generating a script",
+    )
+    args = parser.parse_args(argv)
+
+    wa = preload(args.target)
+    if args.check is not None:
+        if is_stale(wa, args.check):
+            print(f"{args.check} is outdated, regenerate it", file=sys.stderr)
+            return 1
+        return 0
+
+    script = completion_script(wa, args.shell, args.prog)
+    if args.output is None:
+        sys.stdout.write(script)
+    else:
+        with open(args.output, "w") as file:
+            file.write(script)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
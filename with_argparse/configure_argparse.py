@@ -1,29 +1,32 @@
 import argparse
 import dataclasses
+import enum
 import inspect
 import logging
+import os
 import sys
+import threading
 import typing
 import warnings
 from argparse import ArgumentParser
 from collections import defaultdict, OrderedDict
 from dataclasses import dataclass, is_dataclass
 from functools import partial
-from pathlib import Path
+from pathlib import Path, PurePath
 from types import GenericAlias, NoneType, UnionType
 from typing import (
+    Annotated,
     Any,
     Callable,
     get_args,
     get_origin,
     Iterable,
-    List,
     Literal,
     Mapping,
     MutableMapping,
+    NoReturn,
     Optional,
     Sequence,
-    Set,
     TypeVar,
     Union,
 )
@@ -31,13 +34,17 @@ from typing import (
 import attrs
 from typing_extensions import Self
 
+from with_argparse.broadcast import Broadcast
+from with_argparse.cache import ResultCache
 from with_argparse.main import _internal_global_state, ParseArgs
+from with_argparse.mapped import close_mapped, MappedFile
+from with_argparse.parallel import Parallel, ParallelConversion
+from with_argparse.registry import _EnumConverter, compile_type
 from with_argparse.setup import config
+from with_argparse.tokens import TokenStream
+from with_argparse.typing_utils import get_annotations, resolve_annotation
 from with_argparse.utils import flatten, glob_to_paths
-
-SET_TYPES = {set, Set}
-LIST_TYPES = {list, List}
-SEQUENCE_TYPES = SET_TYPES | LIST_TYPES
+from with_argparse.validators import run_checks, Validator
 
 _T = TypeVar("_T")
 
@@ -48,14 +55,18 @@ _NO_DEFAULT = None
 class MissingArgument:
     __slots__ = ()
 
+    def __reduce__(self):
+        # unpickles as the module-level singleton, e.g. for broadcast arguments
+        return "MISSING_ARG"
+
 
 MISSING_ARG = MissingArgument()
 
 
-def _help_called():
+def _help_called(argv: Optional[Sequence[str]] = None):
     parser = ArgumentParser(add_help=False)
     parser.add_argument("-h", "--help", action="store_true", default=False)
-    parsed = parser.parse_known_args()[0]
+    parsed = parser.parse_known_args(argv)[0]
     return parsed.help is True
 
 
@@ -68,7 +79,7 @@ def first(iterable: Iterable[_T], default: Optional[_T] = None) -> _T:
         raise
 
 
-@attrs.define
+@attrs.define(frozen=True)
 class _Argument:
     name: str
     type: type | Callable[[str], Any]
@@ -83,19 +94,18 @@ def _infer_func_type(
     func: Callable, parse_args: ParseArgs
 ) -> Literal["plain", "attrs", "dataclass"]:
     signature = inspect.getfullargspec(func)
+    annotations = get_annotations(func)
 
     for arg in signature.args + signature.kwonlyargs:
         if arg in parse_args.ignore:
             continue
 
-        if arg not in signature.annotations:
+        if arg not in annotations:
             raise TypeError(
                 f"Function {func!r} must be strongly typed, "
                 f"however has no no type annotation for field {arg!r}"
             )
-        arg_type = signature.annotations[arg]
-        if isinstance(arg_type, str):
-            arg_type = typing.get_type_hints(func)[arg]
+        arg_type = resolve_annotation(func, arg)
 
         if attrs.has(arg_type):
             return "attrs"
@@ -105,12 +115,87 @@ def _infer_func_type(
     return "plain"
 
 
+# converters of string defaults whose results only depend on the string and can be shared by calls
+_PURE_TYPES = frozenset({str, int, float, complex, Path, PurePath})
+_IMMUTABLE_TYPES = (
+    NoneType,
+    bool,
+    int,
+    float,
+    complex,
+    str,
+    bytes,
+    frozenset,
+    PurePath,
+    enum.Enum,
+)
+
+
+def _is_immutable(value: Any) -> bool:
+    if isinstance(value, tuple):
+        return all(map(_is_immutable, value))
+    return isinstance(value, _IMMUTABLE_TYPES)
+
+
+def _is_frozen(typ: type) -> bool:
+    if is_dataclass(typ):
+        return typ.__dataclass_params__.frozen  # type: ignore[attr-defined]
+    # attrs has no public flag for frozen classes, they replace __setattr__ with a function raising on assignment
+    return getattr(typ.__setattr__, "__name__", None) == "_frozen_setattrs"
+
+
 @dataclass
 class DataclassConfig:
     func: Callable
 
 
+def _warn_parallel_ignored(arg_name: str, converter: str):
+    warnings.warn(
+        f"Argument {arg_name} is declared Parallel, but its {converter} receives the whole list "
+        f"and is called once. Convert the elements with a registered type to convert them in parallel"
+    )
+
+
 class WithArgparse:
+    __slots__ = (
+        "ignore_rename_sequences",
+        "ignore_arg_keys",
+        "argument_mapping",
+        "argument_aliases",
+        "post_parse_type_conversions",
+        "allow_glob",
+        "allow_custom",
+        "allow_dispatch_custom",
+        "partial_parse",
+        "remaining_args",
+        "partial_parse_pass_remaining_args",
+        "on_help",
+        "add_help",
+        "arguments",
+        "argparse",
+        "func",
+        "func_type",
+        "signature",
+        "strict",
+        "cache",
+        "parse_args",
+        "_help_caught",
+        "_compile_lock",
+        "_compiled_key",
+        "_fields_by_type",
+        "_defaults",
+        "_deferred_defaults",
+        "_option_actions",
+        "_required_dests",
+        "_ambiguous_options",
+        "_mapped_dests",
+        "_validators",
+        "_template_types",
+        "_templates",
+        # serializers and other per-instance caches are keyed by weak references
+        "__weakref__",
+    )
+
     ignore_rename_sequences: set[str]
     ignore_arg_keys: set[str]
     argument_mapping: MutableMapping[str, str]
@@ -121,10 +206,13 @@ class WithArgparse:
     allow_dispatch_custom: bool
     partial_parse: bool
     remaining_args: list[str]
+    arguments: MutableMapping[str, argparse.Action]
 
     func: Callable
     func_type: Literal["attrs", "dataclass", "plain"]
+    signature: inspect.FullArgSpec
     strict: bool
+    cache: Optional[ResultCache]
 
     def __init__(
         self,
@@ -141,6 +229,7 @@ class WithArgparse:
         add_help: Optional[bool] = None,
         on_help: Optional[Callable[[Self], Any]] = None,
         parse_args: ParseArgs | None = None,
+        cache: ResultCache | str | os.PathLike | None = None,
     ):
         super().__init__()
 
@@ -170,10 +259,34 @@ class WithArgparse:
 
         self.func = func
         self.func_type = func_type
+        self.signature = inspect.getfullargspec(func)
         self.strict = strict
         self._help_caught = False
+        if cache is not None and not isinstance(cache, ResultCache):
+            cache = ResultCache(cache)
+        self.cache = cache
 
         self.parse_args = parse_args
+        self._compile_lock = threading.RLock()
+        self._compiled_key: Optional[tuple[str, ...]] = None
+        # names of the parsed fields of each dataclass/attrs type, in registration order
+        self._fields_by_type: Mapping[type, tuple[str, ...]] = {}
+        # default values of all arguments as argparse parses them, before post parse conversions,
+        # None if they cannot be computed ahead of parsing
+        self._defaults: Optional[Mapping[str, Any]] = None
+        # arguments with string defaults that are converted on every call, e.g. glob patterns
+        self._deferred_defaults: tuple[str, ...] = ()
+        self._option_actions: Mapping[str, argparse.Action] = {}
+        self._required_dests: tuple[str, ...] = ()
+        # options given on a shared token stream that are left to argparse, see `_parse_stream`
+        self._ambiguous_options: frozenset[str] = frozenset()
+        # arguments holding mapped files, which are closed when the function returns
+        self._mapped_dests: tuple[str, ...] = ()
+        # checks of the converted values by destination, declared via `Annotated`
+        self._validators: dict[str, tuple[Validator, ...]] = {}
+        # frozen configs without required or factory fields, a single instance is shared by calls without arguments
+        self._template_types: frozenset[type] = frozenset()
+        self._templates: dict[type, Any] = {}
         self._reset_argparse()
 
     def _register_mapping(self): ...
@@ -243,7 +356,12 @@ class WithArgparse:
                 )
             first(parser.values()).exit(2, usage)
 
-    def _call_any(self, args: Sequence[Any], kwargs: Mapping[str, Any]):
+    def _call_any(
+        self,
+        args: Sequence[Any],
+        kwargs: Mapping[str, Any],
+        argv: Optional[Sequence[str]] = None,
+    ):
         """
         This function identifies the attrs function arguments inside this function,
         parses these and calls the configured function with the parsed argument attrs instances
@@ -251,12 +369,10 @@ class WithArgparse:
         Args:
              args: Positional arguments to call the function with
              kwargs: Keyword-only arguments to call the function with
+             argv: Command line arguments to parse, defaults to ``sys.argv[1:]``
 
         """
-        orig_args = args
-        orig_kwargs = kwargs
-
-        signature = inspect.getfullargspec(self.func)
+        signature = self.signature
         if signature.varargs:
             raise TypeError("Variational positional arguments are not supported")
         if signature.varkw and self.strict:
@@ -275,31 +391,172 @@ class WithArgparse:
                 f"Received more positional arguments ({len(args)}) to call {self.func!r} than this function receives: {len(signature.args)}"
             )
 
+        call_args, args_to_parse = self._collect_args_to_parse(signature, args, kwargs)
+
+        state = _internal_global_state()
+        stream = state.stream if argv is None and state.partial else None
+        instances = stream.instances if stream is not None else None
+        if (
+            instances is not None
+            and self.func_type != "plain"
+            and all(typ in instances for typ in args_to_parse.values())
+        ):
+            # all configs were already parsed from the same command line by an earlier partial parse
+            return self._call_parsed(
+                call_args, args_to_parse, {}, {}, instances=instances
+            )
+
+        # explicit command lines, e.g. of servers and sessions, are not shared with other processes
+        broadcast = Broadcast.from_env() if argv is None else None
+        with self._compile_lock:
+            fields_by_type = self._compile(signature, args_to_parse)
+            if broadcast is not None:
+                args_dict = self._receive_broadcast(broadcast)
+            elif stream is not None:
+                args_dict = self._parse_stream(stream)
+            else:
+                args_dict, _ = self._parse_and_convert(argv)
+
+        self._exit_if_invalid(args_dict)
+        return self._call_parsed(
+            call_args,
+            args_to_parse,
+            fields_by_type,
+            args_dict,
+            defaults_only=not (sys.argv[1:] if argv is None else argv),
+            instances=instances,
+        )
+
+    def _call_parsed(
+        self,
+        call_args: dict[str, Any],
+        args_to_parse: Mapping[str, Any],
+        fields_by_type: Mapping[type, tuple[str, ...]],
+        args_dict: Mapping[str, Any],
+        defaults_only: bool = False,
+        instances: Optional[MutableMapping[type, Any]] = None,
+    ):
+        """
+        Calls the configured function with the converted command line arguments
+
+        Args:
+            call_args: Arguments that were supplied programmatically, completed in place
+            args_to_parse: Types of the function arguments that are taken from the command line
+            fields_by_type: Names of the parsed fields of each dataclass/attrs type
+            args_dict: Converted command line arguments by their destination
+            defaults_only: Whether no arguments were given on the command line
+            instances: Configs by type shared with other parses of the same command line, completed in place
+
+        """
+        signature = self.signature
+        if self.func_type in {"attrs", "dataclass"}:
+            for arg, typ in args_to_parse.items():
+                if instances is not None and typ in instances:
+                    call_args[arg] = instances[typ]
+                    continue
+                template = self._templates.get(typ) if defaults_only else None
+                if template is not None:
+                    call_args[arg] = template
+                    continue
+
+                # instantiate the attrs/dataclass type with its keyword arguments
+                call_args[arg] = typ(
+                    **{
+                        field_name: args_dict[field_name]
+                        for field_name in fields_by_type[typ]
+                        if args_dict.get(field_name, MISSING_ARG) is not MISSING_ARG
+                    }
+                )
+                if defaults_only and typ in self._template_types:
+                    self._templates[typ] = call_args[arg]
+                if instances is not None:
+                    instances[typ] = call_args[arg]
+        else:
+            for arg, value in args_dict.items():
+                if arg in call_args:
+                    raise ValueError(
+                        f"Illegal state, argument {arg!r} is already registered as a call arg: {call_args!r}"
+                    )
+
+                call_args[arg] = value
+
+        for val in call_args.values():
+            if val is MISSING_ARG:
+                raise TypeError("Invalid state")
+
+        positional_args = [call_args[arg] for arg in signature.args]
+        kwonly_args = {arg: call_args[arg] for arg in signature.kwonlyargs}
+
+        try:
+            if self.cache is not None:
+                return self.cache.call(
+                    self.func,
+                    call_args,
+                    lambda: self.func(*positional_args, **kwonly_args),
+                )
+            return self.func(*positional_args, **kwonly_args)
+        finally:
+            if self._mapped_dests:
+                close_mapped(args_dict.get(dest) for dest in self._mapped_dests)
+
+    def _validate(self, args_dict: Mapping[str, Any]) -> list[str]:
+        """
+        Runs the validators of the converted arguments concurrently, collections are checked element by element.
+        Returns the messages of all failed checks.
+        """
+        checks: list[tuple[str, Sequence[Validator], Any]] = []
+        for dest, validators in self._validators.items():
+            value = args_dict.get(dest)
+            if value is None or value is MISSING_ARG:
+                continue
+            if isinstance(value, (set, frozenset)):
+                items: Iterable[Any] = sorted(value, key=str)
+            elif isinstance(value, (list, tuple)):
+                items = value
+            else:
+                items = (value,)
+            option = self.arguments[dest].option_strings[0]
+            checks.extend((option, validators, item) for item in items)
+        return run_checks(checks)
+
+    def _exit_if_invalid(self, args_dict: Mapping[str, Any]):
+        errors = self._validate(args_dict)
+        if errors:
+            self._exit_with_errors(errors)
+
+    def _exit_with_errors(self, errors: Sequence[str]) -> NoReturn:
+        self._print_usage(self.argparse, short=False)
+        for message in errors:
+            print("error:", message, file=sys.stderr)
+        sys.exit(2)
+
+    def _collect_args_to_parse(
+        self,
+        signature: inspect.FullArgSpec,
+        args: Sequence[Any],
+        kwargs: Mapping[str, Any],
+    ) -> tuple[dict[str, Any], OrderedDict[str, Any]]:
         args_to_parse = OrderedDict()
 
         call_args = {}
-        registered_args: MutableMapping[str, tuple[Any, ...]] = {}
-        registering_fields: Mapping[str, set[type]] = defaultdict(set)
 
         for pos, name in enumerate(signature.args + signature.kwonlyargs):
-            if pos < len(orig_args):
+            if pos < len(args):
                 # this arg is provided as an argument already
-                call_args[name] = orig_args[pos]
+                call_args[name] = args[pos]
                 continue
-            elif name in orig_kwargs:
+            elif name in kwargs:
                 # this arg is provided as an argument already
-                call_args[name] = orig_kwargs[name]
+                call_args[name] = kwargs[name]
                 continue
 
-            if name not in signature.annotations:
+            if name not in get_annotations(self.func):
                 raise TypeError(
                     f"Function {self.func!r} must be strongly typed. "
                     f"The non-provided argument {name!r} is missing a type signature."
                 )
 
-            typ = signature.annotations[name]
-            if isinstance(typ, str):
-                typ = typing.get_type_hints(self.func)[name]
+            typ = resolve_annotation(self.func, name)
 
             if self.func_type == "plain":
                 if attrs.has(typ) or is_dataclass(typ):
@@ -320,6 +577,98 @@ class WithArgparse:
                     )
             args_to_parse[name] = typ
 
+        return call_args, args_to_parse
+
+    def compile(self):
+        """
+        Builds the argument parser for a call without programmatically supplied arguments ahead of time,
+        such that later calls only have to parse their command line.
+        """
+        _, args_to_parse = self._collect_args_to_parse(self.signature, (), {})
+        with self._compile_lock:
+            self._compile(self.signature, args_to_parse)
+
+    def _compile(
+        self, signature: inspect.FullArgSpec, args_to_parse: Mapping[str, Any]
+    ) -> Mapping[type, tuple[str, ...]]:
+        # the parser only depends on which arguments are left to parse, reuse it across calls
+        compile_key = tuple(args_to_parse)
+        if self._compiled_key != compile_key:
+            self.reset()
+            registering_fields = self._setup_arguments(signature, args_to_parse)
+            fields_by_type: dict[type, list[str]] = defaultdict(list)
+            for field_name, field_types in registering_fields.items():
+                for field_type in field_types:
+                    fields_by_type[field_type].append(field_name)
+            self._fields_by_type = {
+                field_type: tuple(field_names)
+                for field_type, field_names in fields_by_type.items()
+            }
+            self._compile_defaults()
+            self._compiled_key = compile_key
+        return self._fields_by_type
+
+    def _compile_defaults(self):
+        self._option_actions = {
+            option: action
+            for action in self.arguments.values()
+            for option in action.option_strings
+        }
+        self._required_dests = tuple(
+            dest for dest, action in self.arguments.items() if action.required
+        )
+        self._mapped_dests = tuple(
+            dest for dest, action in self.arguments.items() if action.type is MappedFile
+        )
+        # argparse also accepts unique prefixes of long options
+        self._ambiguous_options = frozenset(
+            option[:end]
+            for option in ["--help", *self._option_actions]
+            if option.startswith("--")
+            for end in range(3, len(option))
+        ).difference(self._option_actions) | {"--help", "-h"}
+
+        defaults = {"help": False}
+        deferred = []
+        try:
+            for dest, action in self.arguments.items():
+                default = action.default
+                # like argparse, string defaults are converted as if given on the command line,
+                # only pure conversions are done once, e.g. glob patterns are expanded on every call
+                if isinstance(default, str) and action.type is not None:
+                    if action.type in _PURE_TYPES or isinstance(
+                        action.type, _EnumConverter
+                    ):
+                        default = action.type(default)
+                    else:
+                        deferred.append(dest)
+                defaults[dest] = default
+        except Exception as exc:
+            logger.debug(f"Defaults of {self.func!r} are left to argparse: {exc}")
+            self._defaults = None
+            return
+        self._defaults = defaults
+        self._deferred_defaults = tuple(deferred)
+
+        # a single instance is only shared by calls if none of its values can be changed or are converted anew
+        self._template_types = frozenset(
+            typ
+            for typ, field_names in self._fields_by_type.items()
+            if _is_frozen(typ)
+            and all(
+                name not in self.post_parse_type_conversions
+                and name not in deferred
+                and _is_immutable(defaults[name])
+                for name in field_names
+            )
+        )
+
+    def _setup_arguments(
+        self, signature: inspect.FullArgSpec, args_to_parse: Mapping[str, Any]
+    ) -> Mapping[str, set[type]]:
+        registered_args: MutableMapping[str, tuple[Any, ...]] = {}
+        registering_fields: Mapping[str, set[type]] = defaultdict(set)
+
         if self.func_type == "plain":
             positional_defaults = signature.defaults or ()
             non_default_positional_args = len(signature.args) - len(positional_defaults)
@@ -376,18 +725,32 @@ class WithArgparse:
                     if self.func_type == "dataclass"
                     else attrs.fields(typ)
                 )
-                field_hints = typing.get_type_hints(typ)
                 missing_obj = (
                     dataclasses.MISSING
                     if self.func_type == "dataclass"
                     else attrs.NOTHING
                 )
                 for field in fields:
-                    field_required = field.default is missing_obj
-                    field_default = field.default if not field_required else MISSING_ARG
+                    has_factory = (
+                        field.default_factory is not dataclasses.MISSING
+                        if self.func_type == "dataclass"
+                        else isinstance(field.default, attrs.Factory)  # type: ignore[arg-type]
+                    )
+                    field_required = field.default is missing_obj and not has_factory
+                    # fields with a default factory are left out of the constructor when the option is absent,
+                    # such that the factory only runs for values that are not given on the command line
+                    field_default = (
+                        field.default
+                        if not field_required and not has_factory
+                        else MISSING_ARG
+                    )
                     field_type = field.type
-                    if isinstance(field_type, str):
-                        field_type = field_hints.get(field.name)
+                    if isinstance(field_type, (str, typing.ForwardRef)):
+                        # only evaluate the annotations of fields, not of the whole class
+                        try:
+                            field_type = resolve_annotation(typ, field.name)
+                        except KeyError:
+                            field_type = None
                     if field_type is None:
                         raise TypeError(
                             f"Invalid field type {type(field_type)!r} "
@@ -459,17 +822,25 @@ class WithArgparse:
                         field_required,
                         field_help,
                         field_aliases,
+                        # attrs converters run on construction, the value must only be converted once
+                        raw_tokens=getattr(field, "converter", None) is not None,
                     )
 
                     registered_args[field.name] = field_args
                     registering_fields[field.name].add(typ)
 
+        return registering_fields
+
+    def _parse(
+        self, argv: Optional[Sequence[str]] = None, run_hooks: bool = True
+    ) -> tuple[argparse.Namespace, list[str]]:
         try:
-            if _help_called():
+            if _help_called(argv):
                 self._handle_help_call()
-            namespace, remaining = self.argparse.parse_known_args()
-            for hook in _internal_global_state().parse_hooks:
-                hook(namespace, remaining)
+            namespace, remaining = self.argparse.parse_known_args(argv)
+            if run_hooks:
+                for hook in _internal_global_state().parse_hooks:
+                    hook(namespace, remaining)
 
             # todo: use copy of internal state within this object
             if len(remaining) > 0 and not _internal_global_state().partial:
@@ -482,73 +853,219 @@ class WithArgparse:
             self._print_usage(self.argparse, short=False)
             print("error:", err.message, file=sys.stderr)
             sys.exit(2)
+        return namespace, remaining
 
-        args_dict = self._apply_post_parse_conversions(namespace.__dict__, dict())
-
-        if self.func_type in {"attrs", "dataclass"}:
-            registering_types = defaultdict(set)
-            for field_name, field_types in registering_fields.items():
-                for field_type in field_types:
-                    registering_types[field_type].add(field_name)
-
-            for arg, typ in args_to_parse.items():
-                field_kwargs = {}
-                for field_name in registering_types[typ]:
-                    field_value = args_dict.get(field_name)
-                    if field_value is not MISSING_ARG:
-                        field_kwargs[field_name] = field_value
-
-                # instantiate the attrs/dataclass type with its keyword arguments
-                typ_value = typ(**field_kwargs)
-
-                call_args[arg] = typ_value
-        else:
-            for arg, value in args_dict.items():
-                if arg in call_args:
-                    raise ValueError(
-                        f"Illegal state, argument {arg!r} is already registered as a call arg: {call_args!r}"
-                    )
-
-                call_args[arg] = value
-
-        positional_args: tuple[Any, ...] = ()
-        kwonly_args = {}
-        for arg, val in call_args.items():
-            if isinstance(val, MissingArgument):
-                raise TypeError("Invalid state")
+    def _parse_simple(self, argv: Sequence[str]) -> Optional[MutableMapping[str, Any]]:
+        """
+        Parses command lines made up of `--option value`, `--option=value` and flags without argparse,
+        converting only the given values and copying the precomputed defaults of all others.
+        Returns None for anything else, including invalid values, which is left to argparse.
+        """
+        if self._defaults is None:
+            return None
+
+        raw: dict[str, Any] = {}
+        pos = 0
+        while pos < len(argv):
+            option, sep, value = argv[pos].partition("=")
+            action = self._option_actions.get(option)
+            if action is None or action.nargs not in {None, 0}:
+                return None
+            pos += 1
+
+            if action.nargs == 0:
+                if sep:
+                    return None
+                raw[action.dest] = action.const
+                continue
+            if not sep:
+                if pos == len(argv) or argv[pos].startswith("-"):
+                    return None
+                value = argv[pos]
+                pos += 1
+            raw[action.dest] = value
+        return self._convert_simple(raw)
+
+    def _convert_simple(
+        self, raw: Mapping[str, Any]
+    ) -> Optional[MutableMapping[str, Any]]:
+        """
+        Converts the raw values of the given arguments, i.e. tokens, lists of tokens or the constants of flags,
+        and copies the precomputed defaults of all others.
+        Returns None for invalid values or missing required arguments, which are left to argparse.
+        """
+        if self._defaults is None:
+            return None
+        for dest in self._required_dests:
+            if dest not in raw:
+                return None
+
+        values: dict[str, Any] = {}
+        for dest, value in raw.items():
+            action = self.arguments[dest]
+            if action.nargs == 0:
+                values[dest] = value
+                continue
+            tokens = value if isinstance(value, list) else [value]
+            converted = []
+            for token in tokens:
+                try:
+                    item = action.type(token) if callable(action.type) else token
+                except Exception:
+                    return None
+                if action.choices is not None and item not in action.choices:
+                    return None
+                converted.append(item)
+            values[dest] = converted if isinstance(value, list) else converted[0]
+
+        args_dict = dict(self._defaults)
+        for dest in self._deferred_defaults:
+            action = self.arguments[dest]
+            if dest not in values and callable(action.type):
+                try:
+                    args_dict[dest] = action.type(args_dict[dest])
+                except Exception:
+                    return None
+        args_dict.update(values)
+        # like after parsing with argparse, e.g. such that every call receives its own sets
+        return self._apply_post_parse_conversions(args_dict, args_dict)
+
+    def _parse_stream(self, stream: TokenStream) -> MutableMapping[str, Any]:
+        """
+        Parses the arguments from the token stream shared by the partial parses of the process.
+        Only the tokens of this parser's options are looked up and claimed, anything argparse might parse
+        differently is parsed by argparse from the whole stream. The hooks receive a view of the tokens
+        that were not claimed so far.
+        """
+        claimed = stream.claim(self._option_actions, self._ambiguous_options)
+        args_dict = None
+        if claimed is not None:
+            raw, indices = claimed
+            try:
+                args_dict = self._convert_simple(raw)
+            except argparse.ArgumentError as err:
+                self._exit_with_errors([err.message])
+        if args_dict is None:
+            namespace, remaining = self._parse(stream.tokens, run_hooks=False)
+            indices = stream.claimed_by(remaining)
+            try:
+                # the namespace is not used afterwards, convert its values in place
+                args_dict = self._apply_post_parse_conversions(
+                    namespace.__dict__, namespace.__dict__
+                )
+            except argparse.ArgumentError as err:
+                self._exit_with_errors([err.message])
+        stream.consume(indices)
+
+        hooks = _internal_global_state().parse_hooks
+        if hooks:
+            namespace = argparse.Namespace(**args_dict)
+            for hook in list(hooks):
+                hook(namespace, stream.remainder)
+        return args_dict
+
+    def _parse_and_convert(
+        self, argv: Optional[Sequence[str]] = None
+    ) -> tuple[MutableMapping[str, Any], list[str]]:
+        try:
+            args_dict = self._parse_simple(sys.argv[1:] if argv is None else argv)
+        except argparse.ArgumentError as err:
+            # conversions after parsing report invalid tokens, e.g. `ParallelConversion`
+            self._exit_with_errors([err.message])
+        if args_dict is not None:
+            hooks = _internal_global_state().parse_hooks
+            if hooks:
+                namespace = argparse.Namespace(**args_dict)
+                for hook in list(hooks):
+                    hook(namespace, [])
+            return args_dict, []
+
+        namespace, remaining = self._parse(argv)
+        try:
+            # the namespace is not used afterwards, convert its values in place
+            return (
+                self._apply_post_parse_conversions(
+                    namespace.__dict__, namespace.__dict__
+                ),
+                remaining,
+            )
+        except argparse.ArgumentError as err:
+            self._exit_with_errors([err.message])
 
-        for arg in signature.args:
-            positional_args += (call_args.pop(arg),)
-        for arg in signature.kwonlyargs:
-            kwonly_args[arg] = call_args.pop(arg)
+    def _receive_broadcast(self, broadcast: Broadcast) -> MutableMapping[str, Any]:
+        key = broadcast.key(self.func, self._compiled_key, sys.argv[1:])
+        leader, (args_dict, remaining) = broadcast.exchange(
+            key, lambda: self._parse_and_convert(None)
+        )
+        if not leader:
+            # the leader already ran the hooks on its own parse, followers only receive the results
+            namespace = argparse.Namespace(**args_dict)
+            for hook in _internal_global_state().parse_hooks:
+                hook(namespace, remaining)
+        return args_dict
 
-        return self.func(*positional_args, **kwonly_args)
+    def call(
+        self,
+        args: Sequence[Any],
+        kwargs: Mapping[str, Any],
+        argv: Optional[Sequence[str]] = None,
+    ):
+        return self._call_any(args, kwargs, argv)
 
-    def call(self, args: Sequence[Any], kwargs: Mapping[str, Any]):
-        return self._call_any(args, kwargs)
+    def _convert_value(self, dest: str, value: Any) -> Any:
+        """
+        Applies the post parse conversions of a single argument to its parsed value
+        """
+        if value is None or value is MISSING_ARG:
+            return value
+        try:
+            for conversion_func in self.post_parse_type_conversions.get(dest, ()):
+                value = conversion_func(value)
+        except argparse.ArgumentTypeError as err:
+            raise self._conversion_error(dest, err) from None
+        return value
 
     def _apply_post_parse_conversions(
         self, parsed_args: Mapping[str, Any], out: MutableMapping[str, Any] | None
     ) -> MutableMapping[str, Any]:
-        out = out or dict()
-        out.update(parsed_args)
+        if out is None:
+            out = dict(parsed_args)
+        elif out is not parsed_args:
+            out.update(parsed_args)
         for key, conversion_functions in self.post_parse_type_conversions.items():
             initial_value = parsed_args[key]
-            if initial_value is None:
+            if initial_value is None or initial_value is MISSING_ARG:
                 out[key] = initial_value
                 continue
 
             value = initial_value
-            for conversion_func in conversion_functions:
-                value = conversion_func(value)
+            try:
+                for conversion_func in conversion_functions:
+                    value = conversion_func(value)
+            except argparse.ArgumentTypeError as err:
+                raise self._conversion_error(key, err) from None
             out[key] = value
         return out
 
+    def _conversion_error(
+        self, dest: str, err: argparse.ArgumentTypeError
+    ) -> argparse.ArgumentError:
+        # like argparse reports errors of `type` functions, with the option the value belongs to
+        option = "/".join(self.arguments[dest].option_strings) or dest
+        return argparse.ArgumentError(None, f"argument {option}: {err}")
+
     def reset(self):
         self._reset_argparse()
         self.post_parse_type_conversions.clear()
+        self._validators.clear()
+        self._compiled_key = None
+        self._defaults = None
+        self._deferred_defaults = ()
+        self._template_types = frozenset()
+        self._templates.clear()
 
     def _reset_argparse(self):
+        self.arguments = dict()
         self.argparse = ArgumentParser(add_help=False, exit_on_error=False)
         self.argparse.add_argument(
             "--help",
@@ -573,6 +1090,7 @@ class WithArgparse:
         arg_required: bool,
         arg_help: Optional[str],
         arg_aliases: Optional[list[str]],
+        raw_tokens: bool = False,
     ):
         if not arg_aliases:
             arg_aliases = []
@@ -582,6 +1100,7 @@ class WithArgparse:
             arg_type,
             arg_default,
             arg_required,
+            raw_tokens,
         )
         argparse_kwargs: dict[str, Any]
         argparse_kwargs = dict()
@@ -599,15 +1118,24 @@ class WithArgparse:
         if arg_help:
             argparse_kwargs["help"] = arg_help
 
+        if get_origin(arg_type) is Annotated:
+            arg_type = get_args(arg_type)[0]
         if "action" not in argparse_kwargs:
             argparse_kwargs["metavar"] = (
                 arg_type.__name__ if hasattr(arg_type, "__name__") else repr(arg_type)
             )
 
-        self.argparse.add_argument("--" + args.name, *arg_aliases, **argparse_kwargs)
+        self.arguments[args.name] = self.argparse.add_argument(
+            "--" + args.name, *arg_aliases, **argparse_kwargs
+        )
 
     def _dispatch_argparse_key_type(
-        self, arg_name: str, arg_type: type, arg_default: Any, arg_required: bool
+        self,
+        arg_name: str,
+        arg_type: type,
+        arg_default: Any,
+        arg_required: bool,
+        raw_tokens: bool = False,
     ) -> _Argument:
         logger.debug(
             f"Dispatch: {arg_name} ({arg_type}) default={arg_default}, required={arg_required}"
@@ -626,6 +1154,11 @@ class WithArgparse:
                     f"got '{custom_func}' with signature '[{param_names}] -> {sign.return_annotation}'"
                 )
 
+            if get_origin(arg_type) is Annotated and any(
+                isinstance(meta, Parallel) for meta in get_args(arg_type)[1:]
+            ):
+                _warn_parallel_ignored(arg_name, "custom parse function")
+
             only_param = first(sign.parameters.values())
             if only_param.annotation is only_param.empty:
                 warnings.warn(
@@ -648,8 +1181,53 @@ class WithArgparse:
             self._register_post_parse_type_conversion(arg_name, custom_func)
             return inner
 
-        origin_arg_type = get_origin(arg_type)
-        if arg_type == bool:
+        if get_origin(arg_type) in {Union, UnionType}:
+            inner_arg_types = get_args(arg_type)
+            if (
+                len(inner_arg_types) == 2
+                and NoneType in inner_arg_types
+                and arg_default is not None
+            ):
+                warnings.warn(
+                    f"Argument {arg_name} has type {arg_type} but cannot be None, "
+                    f"got {arg_default} for default"
+                )
+
+        spec = compile_type(arg_type)
+        if raw_tokens:
+            if spec.parallel is not None:
+                _warn_parallel_ignored(arg_name, "attrs converter")
+            # the tokens are passed as they are to a converter of the field, which also takes care
+            # of e.g. building a set, choices can only be checked if they are strings themselves
+            spec = attrs.evolve(
+                spec,
+                type=str,
+                choices=spec.choices if spec.type is str else None,
+                conversions=(),
+                parallel=None,
+            )
+        arg_type_func = spec.type
+        conversions = spec.conversions
+        if spec.type in {Path, str} and arg_name in self.allow_glob:
+            arg_type_func = partial(glob_to_paths, func=spec.type)
+            conversions = (flatten,) + conversions
+        if spec.parallel is not None:
+            if not spec.nargs or arg_name in self.allow_glob:
+                raise ValueError(
+                    f"Argument {arg_name} of type {arg_type} is converted in parallel, "
+                    f"which requires a list or set argument without glob patterns"
+                )
+            # argparse keeps the tokens, which are all converted at once after parsing
+            conversions = (
+                ParallelConversion("--" + arg_name, arg_type_func, spec.parallel),
+            ) + conversions
+            arg_type_func = str
+        for conversion in conversions:
+            self._register_post_parse_type_conversion(arg_name, conversion)
+        if spec.validators:
+            self._validators[arg_name] = spec.validators
+
+        if spec.flag:
             if arg_default is not MISSING_ARG and not isinstance(arg_default, bool):
                 raise ValueError(
                     f"Default value for {arg_name} is of type {type(arg_default)}, but should be bool"
@@ -657,146 +1235,28 @@ class WithArgparse:
 
             arg_default = arg_default if arg_default is not None else False
 
-            store_action = "store_true" if not arg_default else "store_false"
+            # the value of a default factory is unknown before it runs, flags of such fields set `True`
+            store_action = (
+                "store_true"
+                if arg_default is MISSING_ARG or not arg_default
+                else "store_false"
+            )
             return _Argument(
                 arg_name,
-                arg_type,
+                arg_type_func,
                 arg_default,
                 arg_required,
                 nargs=False,
                 action=store_action,
             )
-        elif origin_arg_type and origin_arg_type in SEQUENCE_TYPES:
-            inner_arg_type = get_args(arg_type)[0]
-            inner = self._dispatch_argparse_key_type(
-                arg_name, inner_arg_type, arg_default, arg_required
-            )
-
-            if origin_arg_type is not list:
-                self._register_post_parse_type_conversion(arg_name, origin_arg_type)
-
-            return _Argument(
-                inner.name,
-                inner.type,
-                inner.default,
-                inner.required,
-                True,
-            )
-        elif origin_arg_type and origin_arg_type is Literal:
-            literal_values = get_args(arg_type)
-            inner_args = set(map(type, literal_values))
-            if len(set(inner_args)) == 1:
-                inner_arg_type = first(
-                    inner_args,
-                )
-                inner = self._dispatch_argparse_key_type(
-                    arg_name,
-                    inner_arg_type,
-                    arg_default,
-                    arg_required,
-                )
-
-                return _Argument(
-                    inner.name,
-                    inner.type,
-                    inner.default,
-                    inner.required,
-                    False,
-                    literal_values,
-                )
-            else:
-                raise NotImplementedError(
-                    f"Literals with more than one inner type are not supported, "
-                    f"got {inner_args} for {arg_name}"
-                )
-            pass
-        elif origin_arg_type and origin_arg_type in {Union, UnionType}:
-            inner_arg_types = get_args(arg_type)
-            if len(inner_arg_types) == 2 and NoneType in inner_arg_types:
-                non_none_inner_arg_types = set(inner_arg_types) - {NoneType}
-                inner_arg_type = first(non_none_inner_arg_types)
-                if arg_default is not None:
-                    warnings.warn(
-                        f"Argument {arg_name} has type {arg_type} but cannot be None, "
-                        f"got {arg_default} for default"
-                    )
-                if inner_arg_type is type(bool) and arg_default is None:
-                    warnings.warn(
-                        f"Argument {arg_name} has type {arg_type}, but cannot be None,"
-                        f"got {arg_default} for default"
-                    )
-                inner = self._dispatch_argparse_key_type(
-                    arg_name, inner_arg_type, arg_default, arg_required
-                )
-                return inner
-            none_in_inner = NoneType in inner_arg_types
-
-            if none_in_inner:
-                raise NotImplementedError(inner_arg_types)
-            inner_arg_types = tuple(
-                self._dispatch_argparse_key_type(
-                    arg_name, inner_arg_type, arg_default, arg_required
-                )
-                for inner_arg_type in inner_arg_types
-            )
-            if len(inner_arg_types) < 2:
-                raise ValueError()
-
-            inner_types = [inner.type for inner in inner_arg_types]
-
-            def first_working_inner_type(inp):
-                for inner_type in inner_types:
-                    try:
-                        return inner_type(inp)
-                    except Exception:
-                        continue
-                raise ValueError(inp)
-
-            first_inner = inner_arg_types[0]
-            return _Argument(
-                first_inner.name,
-                first_working_inner_type,
-                first_inner.default,
-                first_inner.required,
-                first_inner.nargs,
-                first_inner.choices,
-                first_inner.action,
-            )
-        elif origin_arg_type:
-            inner_arg_types = get_args(arg_type)
-            raise ValueError(
-                "Unsupported origin type "
-                + str(origin_arg_type)
-                + " for type "
-                + str(arg_type)
-                + " "
-                "with inner types " + str(inner_arg_types)
-            )
-        else:
-            orig_arg_name = arg_name
-            if arg_type in {Path, str} and orig_arg_name in self.allow_glob:
-                self._register_post_parse_type_conversion(
-                    orig_arg_name,
-                    flatten,
-                )
-
-                return _Argument(
-                    arg_name,
-                    partial(glob_to_paths, func=arg_type),
-                    arg_default,
-                    arg_required,
-                    False,
-                    None,
-                    None,
-                )
-            return _Argument(
-                arg_name,
-                arg_type,
-                arg_default,
-                arg_required,
-                False,
-                None,
-            )
+        return _Argument(
+            arg_name,
+            arg_type_func,
+            arg_default,
+            arg_required,
+            spec.nargs,
+            spec.choices,
+        )
 
 
 class NoDispatchCustom:
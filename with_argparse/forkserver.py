@@ -0,0 +1,128 @@
+"""
+Fork-server launcher for running a decorated entry point with many command lines.
+
+The parent imports the entry point and compiles its argument parser once, then forks
+a child per command line. Children share the imported modules with the parent
+copy-on-write and only have to parse their own arguments.
+
+    python -m with_argparse.forkserver package.module:main --jobs 8 < sweep.txt
+
+reads one shell-quoted command line per line and exits non-zero if any run failed.
+"""
+
+import argparse
+import gc
+import os
+import shlex
+import sys
+import time
+from typing import Callable, Iterable, Optional, Sequence
+
+from with_argparse.configure_argparse import WithArgparse
+from with_argparse.main import _get_with_argparse, preload
+from with_argparse.utils import call_with_exit_code
+
+
+def launch(
+    func: Callable | WithArgparse,
+    argvs: Iterable[Sequence[str]],
+    jobs: Optional[int] = None,
+) -> list[int]:
+    """
+    Runs a decorated function once per command line, each in a forked child of this process.
+
+    Args:
+        func: A function decorated with `with_argparse`, `with_dataclass` or `with_attrs`
+        argvs: Command lines to run the function with, excluding the program name
+        jobs: Maximum number of concurrently running children, defaults to `os.cpu_count()`
+
+    Returns:
+        The exit codes of the runs, in the order of `argvs`
+
+    """
+    wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+    wa.compile()
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs < 1:
+        raise ValueError(f"At least one job is required, got {jobs}")
+
+    # move everything that exists now out of the reach of the garbage collector,
+    # otherwise collections in the children write to (and thus copy) the shared pages
+    gc.freeze()
+
+    exit_codes: list[int] = []
+    running: dict[int, int] = {}
+    try:
+        for argv in argvs:
+            if len(running) >= jobs:
+                _wait_one(running, exit_codes)
+
+            exit_codes.append(-1)
+            pid = os.fork()
+            if pid == 0:
+                _run_child(wa, argv)
+            running[pid] = len(exit_codes) - 1
+
+        while running:
+            _wait_one(running, exit_codes)
+    finally:
+        gc.unfreeze()
+    return exit_codes
+
+
+def _run_child(wa: WithArgparse, argv: Sequence[str]):
+    # the child must never return into the launch loop of the parent
+    exit_code = 1
+    try:
+        sys.argv = [sys.argv[0], *argv]
+        exit_code = call_with_exit_code(lambda: wa.call((), {}, argv))
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+    finally:
+        os._exit(exit_code & 0xFF)
+
+
+def _wait_one(running: dict[int, int], exit_codes: list[int]):
+    # only waits for the children of the launch, other children of the process,
+    # e.g. subprocesses of the host, are left to whoever started them
+    interval = 0.001
+    while True:
+        for pid in list(running):
+            waited_pid, status = os.waitpid(pid, os.WNOHANG)
+            if waited_pid == pid:
+                exit_codes[running.pop(pid)] = os.waitstatus_to_exitcode(status)
+                return
+        time.sleep(interval)
+        interval = min(interval * 2, 0.01)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m with_argparse.forkserver",
+        description="Run a decorated entry point once per command line read from a file",
+    )
+    parser.add_argument("target", help="entry point of the form 'module:function'")
+    parser.add_argument(
+        "file",
+        nargs="?",
+        type=argparse.FileType("r"),
+        default=sys.stdin,
+        help="file with one shell-quoted command line per line, defaults to stdin",
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with args.file:
+        argvs = [shlex.split(line) for line in args.file if line.strip()]
+    wa = preload(args.target)
+    exit_codes = launch(wa, argvs, jobs=args.jobs)
+
+    failed = [(i, code) for i, code in enumerate(exit_codes) if code != 0]
+    for i, code in failed:
+        print(f"run {i} ({shlex.join(argvs[i])}) exited with {code}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Streaming records through a decorated entry point.
+
+Starting an entry point with `--with-argparse-jsonl SOURCE` reads one JSON object per line from the file
+`SOURCE` (or stdin for `-`), and calls the entry point once per record in the same warm process.
+Records map argument names to JSON values like the schemas of `with_argparse.schema`, and take precedence
+over the remaining command line. Each record is converted through the compiled parser, reusing the values
+of arguments that did not change from the previous record, see `with_argparse.session.ParseSession`.
+
+Results are written to stdout as JSON lines, `{"line": 3, "result": ...}` or `{"line": 3, "error": "..."}`:
+
+    python train.py --epochs 1 --with-argparse-jsonl sweep.jsonl --with-argparse-jobs 8
+
+Records can be run concurrently with `--with-argparse-jobs N`, in threads or, with
+`--with-argparse-executor process`, in forked processes, and results can be written as soon as they are
+available with `--with-argparse-unordered`. At most twice as many records as jobs are read ahead.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import dataclasses
+import enum
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from argparse import Namespace
+from pathlib import PurePath
+from typing import Any, Callable, Iterable, Literal, Optional, Sequence, TextIO
+
+import attrs
+
+from with_argparse.configure_argparse import WithArgparse
+from with_argparse.main import _get_with_argparse
+from with_argparse.session import _ABSENT, ParseSession
+
+
+def _token(action: argparse.Action, value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise argparse.ArgumentError(
+        action, f"expected a string or a number, got {value!r}"
+    )
+
+
+def _record_overrides(wa: WithArgparse, record: Any) -> dict[str, Any]:
+    """
+    Translates a record into raw values by destination, as if its values were given on the command line
+    """
+    if not isinstance(record, dict):
+        raise ValueError(f"Expected a JSON object, got {record!r}")
+
+    overrides: dict[str, Any] = {}
+    for key, value in record.items():
+        action = wa.arguments.get(key)
+        if action is None:
+            raise argparse.ArgumentError(None, f"unrecognized argument: {key!r}")
+        if value is None:
+            # null resets the argument to its default
+            overrides[key] = _ABSENT
+        elif action.nargs == 0:
+            if not isinstance(value, bool):
+                raise argparse.ArgumentError(
+                    action, f"expected true or false, got {value!r}"
+                )
+            overrides[key] = action.const if value == action.const else _ABSENT
+        elif action.nargs is None:
+            overrides[key] = _token(action, value)
+        elif isinstance(value, dict):
+            overrides[key] = [
+                f"{_token(action, k)}={_token(action, v)}" for k, v in value.items()
+            ]
+        elif isinstance(value, list):
+            if not value:
+                raise argparse.ArgumentError(action, "expected at least one value")
+            overrides[key] = [_token(action, item) for item in value]
+        else:
+            overrides[key] = [_token(action, value)]
+    return overrides
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, PurePath):
+        return os.fspath(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if attrs.has(type(value)):
+        return attrs.asdict(value)
+    return repr(value)
+
+
+class _Runner:
+    """
+    Calls the entry point for single lines, with one parse session per thread
+    """
+
+    def __init__(self, wa: WithArgparse, argv: Sequence[str]):
+        self.wa = wa
+        self.tokens = list(argv)
+        self._local = threading.local()
+
+    def __call__(self, line_number: int, line: str) -> tuple[bool, str]:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = ParseSession(self.wa)
+        try:
+            overrides = _record_overrides(self.wa, json.loads(line))
+            result = session._call(self.tokens, overrides)
+            return True, json.dumps(
+                {"line": line_number, "result": result}, default=_to_json
+            )
+        except (Exception, SystemExit) as err:
+            # e.g. the entry point exiting with `sys.exit` only fails its own record
+            return False, json.dumps(
+                {"line": line_number, "error": f"{type(err).__name__}: {err}"}
+            )
+
+
+# the runner of forked worker processes, inherited from the parent
+_process_runner: Optional[_Runner] = None
+
+
+def _run_in_process(line_number: int, line: str) -> tuple[bool, str]:
+    assert _process_runner is not None
+    return _process_runner(line_number, line)
+
+
+def _records(source: TextIO) -> Iterable[tuple[int, str]]:
+    for line_number, line in enumerate(source, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def run_jsonl(
+    func: Callable | WithArgparse,
+    source: str | os.PathLike | TextIO = "-",
+    argv: Sequence[str] = (),
+    output: Optional[TextIO] = None,
+    jobs: int = 1,
+    executor: Literal["thread", "process"] = "thread",
+    ordered: bool = True,
+) -> int:
+    """
+    Calls a decorated function once per JSON record and writes the results as JSON lines.
+    Returns 0 if all records succeeded, and 1 otherwise.
+
+    Args:
+        func: A function decorated with `with_argparse`, `with_dataclass` or `with_attrs`
+        source: A file with one JSON object per line, `-` for stdin
+        argv: Command line the values of each record are added to
+        output: Where results are written to, defaults to stdout
+        jobs: Number of records run concurrently
+        executor: Whether concurrent records run in threads or in forked processes
+        ordered: Whether results are written in the order of the records or as soon as they are available
+
+    """
+    wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+    wa.compile()
+    runner = _Runner(wa, argv)
+    output = sys.stdout if output is None else output
+
+    with contextlib.ExitStack() as stack:
+        lines: TextIO
+        if not isinstance(source, (str, os.PathLike)):
+            lines = source
+        elif os.fspath(source) == "-":
+            lines = sys.stdin
+        else:
+            lines = stack.enter_context(open(source))
+
+        failed = False
+        records = _records(lines)
+        for succeeded, line in _run_all(runner, records, jobs, executor, ordered):
+            failed = failed or not succeeded
+            output.write(line + "\n")
+            output.flush()
+    return 1 if failed else 0
+
+
+def _run_all(
+    runner: _Runner,
+    records: Iterable[tuple[int, str]],
+    jobs: int,
+    executor: Literal["thread", "process"],
+    ordered: bool,
+) -> Iterable[tuple[bool, str]]:
+    if jobs <= 1:
+        for line_number, line in records:
+            yield runner(line_number, line)
+        return
+
+    global _process_runner
+    pool: concurrent.futures.Executor
+    if executor == "process":
+        _process_runner = runner
+        pool = concurrent.futures.ProcessPoolExecutor(
+            jobs, mp_context=multiprocessing.get_context("fork")
+        )
+        run: Callable[[int, str], tuple[bool, str]] = _run_in_process
+    elif executor == "thread":
+        pool = concurrent.futures.ThreadPoolExecutor(jobs)
+        run = runner
+    else:
+        raise ValueError(
+            f"Unknown executor {executor!r}, expected 'thread' or 'process'"
+        )
+
+    # records are read lazily, such that at most this many are in flight
+    limit = 2 * jobs
+    pending: collections.deque[concurrent.futures.Future] = collections.deque()
+    try:
+        with pool:
+            for line_number, line in records:
+                pending.append(pool.submit(run, line_number, line))
+                while len(pending) >= limit:
+                    yield from _drain(
+                        pending, ordered, concurrent.futures.FIRST_COMPLETED
+                    )
+            while pending:
+                yield from _drain(pending, ordered, concurrent.futures.ALL_COMPLETED)
+    finally:
+        _process_runner = None
+
+
+def _drain(
+    pending: "collections.deque[concurrent.futures.Future]",
+    ordered: bool,
+    return_when: str,
+) -> Iterable[tuple[bool, str]]:
+    if ordered:
+        yield pending.popleft().result()
+        return
+    done, _ = concurrent.futures.wait(pending, return_when=return_when)
+    for future in [future for future in pending if future in done]:
+        pending.remove(future)
+        yield future.result()
+
+
+def _jsonl_driver(wa: WithArgparse, driver_args: Namespace, argv: list[str]):
+    exit_code = run_jsonl(
+        wa,
+        driver_args.jsonl,
+        argv,
+        jobs=driver_args.jobs,
+        executor=driver_args.executor,
+        ordered=not driver_args.unordered,
+    )
+    if exit_code:
+        sys.exit(exit_code)
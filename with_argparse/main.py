@@ -1,22 +1,55 @@
 import functools
-from argparse import Namespace
-from typing import Any, Callable, Literal, overload, ParamSpec, TypeVar
+import importlib
+import inspect
+import os
+import sys
+from argparse import ArgumentParser, Namespace
+from typing import (
+    Any,
+    Callable,
+    Literal,
+    Optional,
+    overload,
+    ParamSpec,
+    Sequence,
+    TYPE_CHECKING,
+    TypeVar,
+)
 
 import attrs
 from typing_extensions import Self
 
+from with_argparse.tokens import TokenStream
+
+if TYPE_CHECKING:
+    from with_argparse.cache import ResultCache
+    from with_argparse.configure_argparse import WithArgparse
+
 P = ParamSpec("P")
 T = TypeVar("T")
 
+# command line flags that replace a single call of a decorated entry point by a driver,
+# e.g. `--with-argparse-serve PATH` keeps the process resident and serves calls over a socket
+DRIVER_FLAG_PREFIX = "--with-argparse-"
+_DRIVERS: dict[str, str] = {
+    "serve": "with_argparse.server:_serve_driver",
+    "watch": "with_argparse.watch:_watch_driver",
+    "jsonl": "with_argparse.jsonl:_jsonl_driver",
+}
+
 
 @attrs.define
 class GlobalState:
     disabled: bool = False
     partial: bool = False
 
-    parse_hooks: list[Callable[[Namespace, list[str]], None]] = attrs.field(
+    parse_hooks: list[Callable[[Namespace, Sequence[str]], None]] = attrs.field(
         factory=list
     )
+    # the command line shared by the partial parses of the outermost `partial_argparse`
+    stream: Optional[TokenStream] = None
+    # whether a driver runs the outermost entry point, see `_find_driver`
+    driving: bool = False
 
 
 _global_state = GlobalState()
@@ -47,23 +80,29 @@ class ParseArgs:
 @attrs.define
 class partial_argparse:  # noqa
     state: bool = attrs.field(init=False)
-    remainder: list[str] = attrs.field(init=False, factory=list)
+    stream: Optional[TokenStream] = attrs.field(init=False, default=None)
+    remainder: Sequence[str] = attrs.field(init=False, factory=list)
 
     def __enter__(self) -> Self:
         self.state = _global_state.partial
+        self.stream = _global_state.stream
         _global_state.partial = True
+        if _global_state.stream is None:
+            # tokenized once, nested partial parses share the outermost stream
+            _global_state.stream = TokenStream(sys.argv[1:])
         _global_state.parse_hooks.append(self)
         return self
 
-    def __call__(self, parsed: Namespace, remaining: list[str]):
+    def __call__(self, parsed: Namespace, remaining: Sequence[str]):
         # after hooks have been called, the remaining args are available from the
-        # context manager variable
+        # context manager variable, as a view of the tokens no parse has claimed so far
         self.remainder = remaining
         if self in _global_state.parse_hooks:
             _global_state.parse_hooks.remove(self)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         _global_state.partial = self.state
+        _global_state.stream = self.stream
         if self in _global_state.parse_hooks:
             _global_state.parse_hooks.remove(self)
 
@@ -92,6 +131,7 @@ def with_attrs(
     *,
     parse_args: ParseArgs | None = None,
     strict: Literal[True] = True,
+    cache: "ResultCache | str | os.PathLike | None" = None,
 ) -> Callable[[Callable[P, T]], Callable[[], T]]: ...
 
 
@@ -100,6 +140,7 @@ def with_attrs(
     *,
     parse_args: ParseArgs | None = None,
     strict: bool = False,
+    cache: "ResultCache | str | os.PathLike | None" = None,
 ) -> Callable[[Callable[P, T]], Callable[..., T]]: ...
 
 
@@ -108,8 +149,11 @@ def with_attrs(
     *,
     parse_args: ParseArgs | None = None,
     strict: bool = True,
+    cache: "ResultCache | str | os.PathLike | None" = None,
 ):
-    return _with_argparse(func, parse_args=parse_args, strict=strict, func_type="attrs")
+    return _with_argparse(
+        func, parse_args=parse_args, strict=strict, func_type="attrs", cache=cache
+    )
 
 
 @overload
@@ -121,6 +165,7 @@ def with_dataclass(
     *,
     parse_args: ParseArgs | None = None,
     strict: Literal[True] = True,
+    cache: "ResultCache | str | os.PathLike | None" = None,
 ) -> Callable[[Callable[P, T]], Callable[[], T]]: ...
 
 
@@ -129,6 +174,7 @@ def with_dataclass(
     *,
     parse_args: ParseArgs | None = None,
     strict: bool = False,
+    cache: "ResultCache | str | os.PathLike | None" = None,
 ) -> Callable[[Callable[P, T]], Callable[..., T]]: ...
 
 
@@ -137,9 +183,10 @@ def with_dataclass(
     *,
     parse_args: ParseArgs | None = None,
     strict: bool = True,
+    cache: "ResultCache | str | os.PathLike | None" = None,
 ):
     return _with_argparse(
-        func, parse_args=parse_args, strict=strict, func_type="dataclass"
+        func, parse_args=parse_args, strict=strict, func_type="dataclass", cache=cache
     )
 
 
@@ -152,6 +199,7 @@ def with_argparse(
     *,
     parse_args: ParseArgs | None = None,
     strict: Literal[True] = True,
+    cache: "ResultCache | str | os.PathLike | None" = None,
 ) -> Callable[[Callable[P, T]], Callable[[], T]]: ...
 
 
@@ -160,6 +208,7 @@ def with_argparse(
     *,
     parse_args: ParseArgs | None = None,
     strict: bool = False,
+    cache: "ResultCache | str | os.PathLike | None" = None,
 ) -> Callable[[Callable[P, T]], Callable[..., T]]: ...
 
 
@@ -168,8 +217,11 @@ def with_argparse(
     *,
     parse_args: ParseArgs | None = None,
     strict: bool = True,
+    cache: "ResultCache | str | os.PathLike | None" = None,
 ):
-    return _with_argparse(func, parse_args=parse_args, strict=strict, func_type="infer")
+    return _with_argparse(
+        func, parse_args=parse_args, strict=strict, func_type="infer", cache=cache
+    )
 
 
 def _with_argparse(
@@ -178,27 +230,86 @@ def _with_argparse(
     parse_args: ParseArgs | None = None,
     strict: bool = True,
     func_type: Literal["attrs", "dataclass", "plain", "infer"] = "infer",
+    cache: "ResultCache | str | os.PathLike | None" = None,
 ):
     # decorator-decorator path
 
     def decorator(decorated_func: Callable):
+        # the WithArgparse instance caches its compiled parser across calls,
+        # it is created lazily to allow for forward references in the annotations
+        instance: list["WithArgparse"] = []
+
+        def _instance() -> "WithArgparse":
+            if not instance:
+                from with_argparse.configure_argparse import WithArgparse
+
+                instance.append(
+                    WithArgparse(
+                        decorated_func,
+                        func_type,
+                        strict=strict,
+                        parse_args=parse_args,
+                        cache=cache,
+                    )
+                )
+            return instance[0]
+
+        signature = inspect.getfullargspec(decorated_func)
+        parameters = tuple(signature.args + signature.kwonlyargs)
+        num_positional = len(signature.args)
+
+        def _covers_all_parameters(args: tuple, kwargs: dict) -> bool:
+            # arguments supplied programmatically leave nothing to parse from the command line
+            if signature.varargs is not None or len(args) > num_positional:
+                return False
+            if len(args) + len(kwargs) < len(parameters):
+                return False
+            return all(name in kwargs for name in parameters[len(args) :])
+
+        def _call_directly(args: tuple, kwargs: dict):
+            if cache is None:
+                return decorated_func(*args, **kwargs)
+            wa = _instance()
+            assert wa.cache is not None
+            # keyed like calls that parse the command line, see `WithArgparse._call_parsed`
+            call_args = dict(zip(parameters, args)) | kwargs
+            return wa.cache.call(
+                decorated_func, call_args, lambda: decorated_func(*args, **kwargs)
+            )
+
         @functools.wraps(decorated_func)
         def wrapper(*args, **kwargs):
             if _internal_global_state().disabled:
                 return decorated_func(*args, **kwargs)
 
-            from with_argparse.configure_argparse import WithArgparse
-
             if strict and (len(args) > 0 or len(kwargs) > 0):
                 raise TypeError(
                     "In strict mode, arguments cannot be passed to the decorated dataclass function"
                 )
 
-            wa = WithArgparse(
-                decorated_func, func_type, strict=strict, parse_args=parse_args
-            )
-            return wa.call(args, kwargs)
-
+            if (args or kwargs) and _covers_all_parameters(args, kwargs):
+                return _call_directly(args, kwargs)
+
+            state = _internal_global_state()
+            if not state.partial and not state.driving:
+                # only the outermost entry point is replaced by a driver, not the functions it calls
+                driver = _find_driver(sys.argv[1:])
+                if driver is not None:
+                    return _run_driver(_instance(), *driver)
+
+            return _instance().call(args, kwargs)
+
+        def without_argv(*args, **kwargs):
+            """
+            Calls the decorated function as a library function: `sys.argv` is never parsed,
+            arguments that are not supplied take their default values.
+            """
+            if _covers_all_parameters(args, kwargs):
+                return _call_directly(args, kwargs)
+            return _instance().call(args, kwargs, argv=[])
+
+        wrapper.__with_argparse__ = _instance  # type: ignore[attr-defined]
+        wrapper.without_argv = without_argv  # type: ignore[attr-defined]
         return wrapper
 
     if func is None:
@@ -207,6 +318,84 @@ def _with_argparse(
         return decorator(func)
 
 
+def _get_with_argparse(func: Callable) -> "WithArgparse":
+    instance = getattr(func, "__with_argparse__", None)
+    if instance is None:
+        raise TypeError(
+            f"Function {func!r} is not decorated with any of the with_argparse decorators"
+        )
+    return instance()
+
+
+def preload(target: str) -> "WithArgparse":
+    """
+    Imports a decorated entry point given as `module:function` and compiles its parser.
+    """
+    module_name, sep, func_name = target.partition(":")
+    if not sep or not func_name:
+        raise ValueError(
+            f"Expected a target of the form 'module:function', got {target!r}"
+        )
+
+    func: Any = importlib.import_module(module_name)
+    for attr in func_name.split("."):
+        func = getattr(func, attr)
+
+    wa = _get_with_argparse(func)
+    wa.compile()
+    return wa
+
+
+def _find_driver(
+    argv: Sequence[str],
+) -> Optional[tuple[Callable[..., Any], Namespace, list[str]]]:
+    if not any(arg.startswith(DRIVER_FLAG_PREFIX) for arg in argv):
+        return None
+
+    parser = ArgumentParser(add_help=False, allow_abbrev=False)
+    for name in _DRIVERS:
+        parser.add_argument(DRIVER_FLAG_PREFIX + name, dest=name, default=None)
+    # options of the drivers that run the entry point many times, see `with_argparse.jsonl`
+    parser.add_argument(DRIVER_FLAG_PREFIX + "jobs", dest="jobs", type=int, default=1)
+    parser.add_argument(
+        DRIVER_FLAG_PREFIX + "executor",
+        dest="executor",
+        choices=("thread", "process"),
+        default="thread",
+    )
+    parser.add_argument(
+        DRIVER_FLAG_PREFIX + "unordered", dest="unordered", action="store_true"
+    )
+    driver_args, remaining = parser.parse_known_args(argv)
+
+    active = [name for name in _DRIVERS if getattr(driver_args, name) is not None]
+    if len(active) != 1:
+        raise TypeError(
+            f"Exactly one with_argparse driver can be used at a time, got {active!r}"
+        )
+    module_name, func_name = _DRIVERS[active[0]].split(":")
+    driver_func = getattr(importlib.import_module(module_name), func_name)
+    return driver_func, driver_args, remaining
+
+
+def _run_driver(
+    wa: "WithArgparse",
+    driver_func: Callable[..., Any],
+    driver_args: Namespace,
+    argv: list[str],
+) -> Any:
+    state = _internal_global_state()
+    previous_argv = sys.argv
+    # decorated functions called by the entry point see the command line without the driver flags
+    sys.argv = [sys.argv[0], *argv]
+    state.driving = True
+    try:
+        return driver_func(wa, driver_args, argv)
+    finally:
+        state.driving = False
+        sys.argv = previous_argv
+
+
 @overload
 def script_argparse(func: Callable[P, T], /) -> T: ...
 
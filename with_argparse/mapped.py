@@ -0,0 +1,126 @@
+"""
+Zero-copy file arguments.
+
+A `MappedFile` argument is a read-only memory map of the file named on the command line. The file is
+only mapped on first access, and unmapped when the decorated function returns, such that multi-GB inputs
+are paged in on demand instead of being read into memory. Accessing a closed `MappedFile` maps it again.
+
+    @with_argparse
+    def count_lines(corpus: MappedFile):
+        return corpus.view().tobytes().count(b"\\n")
+
+`memoryview` arguments are read-only views of a file mapped at parse time, which is unmapped once the view
+is garbage collected, and `bytes` arguments hold the contents of a file.
+"""
+
+import logging
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger("with_argparse")
+
+
+class MappedFile:
+    """
+    A read-only memory map of a file, mapped on first access and closed when the decorated function returns
+
+    Args:
+        path: The file to map, which must exist
+
+    """
+
+    __slots__ = ("path", "_map")
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        if not self.path.is_file():
+            # reported as a usage error when parsing the command line
+            raise ValueError(f"{os.fspath(path)!r} is not a file")
+        self._map: Optional[mmap.mmap | bytes] = None
+
+    def _mapped(self) -> mmap.mmap | bytes:
+        if self._map is None:
+            with open(self.path, "rb") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    # empty files cannot be mapped
+                    self._map = b""
+                else:
+                    # the map keeps its own file descriptor
+                    self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    @property
+    def closed(self) -> bool:
+        return self._map is None
+
+    def view(self) -> memoryview:
+        """
+        Returns a read-only view of the contents, views must be released before the file is closed
+        """
+        return memoryview(self._mapped())
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return self.view()
+
+    def __len__(self) -> int:
+        return len(self._mapped())
+
+    def __getitem__(self, index: Any) -> Any:
+        return self._mapped()[index]
+
+    def __fspath__(self) -> str:
+        return os.fspath(self.path)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            try:
+                self._map.close()
+            except BufferError:
+                # views of the map are still referenced, it is unmapped once they are garbage collected
+                logger.debug(f"{self.path} is still referenced by views")
+        self._map = None
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, MappedFile):
+            return self.path == other.path
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def __repr__(self) -> str:
+        return f"MappedFile({os.fspath(self.path)!r})"
+
+
+def map_view(path: str) -> memoryview:
+    return MappedFile(path).view()
+
+
+def read_bytes(path: str) -> bytes:
+    if not os.path.isfile(path):
+        raise ValueError(f"{path!r} is not a file")
+    return Path(path).read_bytes()
+
+
+# argparse reports conversion errors by the name of the type function
+map_view.__name__ = "memoryview"
+read_bytes.__name__ = "bytes"
+
+
+def close_mapped(values: Any):
+    """
+    Closes the mapped files among the given values, e.g. the arguments of a returned function
+    """
+    for value in values:
+        if isinstance(value, MappedFile):
+            value.close()
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            close_mapped(value)
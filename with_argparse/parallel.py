@@ -0,0 +1,141 @@
+"""
+Concurrent conversion of the elements of list arguments.
+
+Element types whose conversion waits on I/O, e.g. resolving references to remote objects, are converted
+one token at a time by default. Declaring `Parallel` in the annotation of a list or set argument converts
+its elements concurrently in a bounded thread pool, or in worker processes for CPU-bound conversions:
+
+    @dataclass
+    class Config:
+        objects: Annotated[list[RemoteObject], Parallel(max_workers=64)]
+
+The order of the elements is preserved, and all tokens that could not be converted are reported in one
+usage error. Only the element type is converted in parallel, custom parse functions and attrs converters
+receive the whole list and are called once. Their conversion of single elements can be moved into a
+registered element type, see `with_argparse.register_type`.
+"""
+
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import pickle
+from functools import partial
+from typing import Any, Callable, Literal, Optional
+
+import attrs
+
+
+@attrs.define(frozen=True)
+class Parallel:
+    """
+    Args:
+        max_workers: Upper bound of elements converted at the same time, defaults to the executor's default
+        executor: Whether elements are converted in threads or in worker processes, started by the
+            forkserver where available
+
+    """
+
+    max_workers: Optional[int] = None
+    executor: Literal["thread", "process"] = "thread"
+
+
+def _convert_token(type_func: Callable[[str], Any], token: str) -> tuple[bool, Any]:
+    try:
+        return True, type_func(token)
+    except (TypeError, ValueError, argparse.ArgumentTypeError):
+        # exceptions might not be picklable, invalid tokens are reported by the caller
+        return False, None
+
+
+def _process_context() -> multiprocessing.context.BaseContext:
+    # forking a process with threads, e.g. of the validators or a server, can deadlock the workers
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()
+
+
+class ParallelConversion:
+    """
+    Converts the tokens of a list argument concurrently, applied after parsing instead of argparse's `type`
+    """
+
+    __slots__ = ("option", "type", "parallel", "__name__")
+
+    def __init__(
+        self, option: str, type_func: Callable[[str], Any], parallel: Parallel
+    ):
+        self.option = option
+        self.type = type_func
+        self.parallel = parallel
+        self.__name__ = getattr(type_func, "__name__", repr(type_func))
+        if parallel.executor == "process":
+            # checked when compiling instead of failing in the pool at the first call
+            try:
+                pickle.dumps(type_func)
+            except Exception as exc:
+                raise ValueError(
+                    f"The elements of {option} cannot be converted in processes, "
+                    f"{self.__name__} cannot be pickled: {exc}"
+                ) from exc
+
+    def __call__(self, tokens: list[Any]) -> list[Any]:
+        # like argparse, only strings are converted, e.g. not the items of default values
+        pending = [
+            index for index, token in enumerate(tokens) if isinstance(token, str)
+        ]
+        convert = partial(_convert_token, self.type)
+        if len(pending) < 2:
+            results = [convert(tokens[index]) for index in pending]
+        else:
+            workers = self._workers(len(pending))
+            with self._executor(workers) as pool:
+                # chunks amortize the round trips to worker processes, `map` keeps the order
+                chunk_size = max(1, len(pending) // (4 * workers))
+                results = list(
+                    pool.map(
+                        convert,
+                        [tokens[index] for index in pending],
+                        chunksize=chunk_size,
+                    )
+                )
+
+        values = list(tokens)
+        invalid = []
+        for index, (ok, value) in zip(pending, results):
+            if ok:
+                values[index] = value
+            else:
+                invalid.append(tokens[index])
+        if invalid:
+            plural = "s" if len(invalid) > 1 else ""
+            raise argparse.ArgumentError(
+                None,
+                f"argument {self.option}: invalid {self.__name__} value{plural}: "
+                + ", ".join(map(repr, invalid)),
+            )
+        return values
+
+    def _workers(self, num_tokens: int) -> int:
+        max_workers = self.parallel.max_workers
+        if max_workers is None:
+            # the defaults of the executors
+            cpu_count = os.cpu_count() or 1
+            if self.parallel.executor == "process":
+                max_workers = cpu_count
+            else:
+                max_workers = min(32, cpu_count + 4)
+        return max(1, min(max_workers, num_tokens))
+
+    def _executor(self, workers: int) -> concurrent.futures.Executor:
+        if self.parallel.executor == "process":
+            return concurrent.futures.ProcessPoolExecutor(
+                workers, mp_context=_process_context()
+            )
+        if self.parallel.executor == "thread":
+            return concurrent.futures.ThreadPoolExecutor(
+                workers, thread_name_prefix="with_argparse-convert"
+            )
+        raise ValueError(
+            f"Unknown executor {self.parallel.executor!r}, expected 'thread' or 'process'"
+        )
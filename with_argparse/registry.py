@@ -0,0 +1,418 @@
+"""
+Registry of how type annotations are parsed from the command line.
+
+Each annotation is analysed once into a `TypeSpec`, which is memoized per annotation object,
+such that e.g. `list[int]` used by hundreds of fields is only inspected once.
+Handlers are looked up by the annotation itself, then by its origin for generics such as `list[int]`,
+then by the base classes of the annotation, and can be added for third party types:
+
+    @register_type(datetime)
+    def _datetime(annotation, compile_type):
+        return TypeSpec(datetime.fromisoformat)
+"""
+
+import argparse
+import collections.abc
+import enum
+import threading
+from types import NoneType, UnionType
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    Dict,
+    get_args,
+    get_origin,
+    Hashable,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
+
+import attrs
+
+from with_argparse.mapped import map_view, MappedFile, read_bytes
+from with_argparse.parallel import Parallel
+from with_argparse.setup import config
+from with_argparse.validators import Validator
+
+SET_TYPES = {set, Set}
+LIST_TYPES = {list, List}
+SEQUENCE_TYPES = SET_TYPES | LIST_TYPES
+
+
+class _Choices(Sequence[Any]):
+    """
+    Choices of an argument, kept in declaration order for help and error messages
+    while membership checks by argparse go through a precomputed hash set.
+    """
+
+    __slots__ = ("values", "lookup")
+
+    def __init__(self, values: Iterable[Any]):
+        self.values = tuple(values)
+        try:
+            self.lookup: Optional[frozenset[Any]] = frozenset(self.values)
+        except TypeError:
+            self.lookup = None
+
+    def __contains__(self, value: object) -> bool:
+        if self.lookup is not None:
+            try:
+                return value in self.lookup
+            except TypeError:
+                return False
+        return value in self.values
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __repr__(self) -> str:
+        return repr(self.values)
+
+
+class _EnumConverter:
+    """
+    Converts command line values to members of an enum by their name, or by their value for e.g. `StrEnum`s
+    """
+
+    __slots__ = ("enum_type", "members", "__name__")
+
+    def __init__(self, enum_type: type[enum.Enum]):
+        self.enum_type = enum_type
+        # argparse reports conversion errors by the name of the type function
+        self.__name__ = enum_type.__name__
+        members: dict[str, enum.Enum] = {}
+        for member in enum_type:
+            members.setdefault(str(member.value), member)
+        for name, member in enum_type.__members__.items():
+            members[name] = member
+        self.members = members
+
+    def __call__(self, value: str) -> enum.Enum:
+        try:
+            return self.members[value]
+        except KeyError:
+            raise ValueError(value) from None
+
+
+class _KeyValue:
+    """
+    Converts a `key=value` token, or a response file `@path` with one `key=value` pair per line,
+    to a list of converted key-value pairs
+    """
+
+    __slots__ = ("key_spec", "value_spec", "__name__")
+
+    def __init__(self, annotation: Any, key_spec: "TypeSpec", value_spec: "TypeSpec"):
+        self.key_spec = key_spec
+        self.value_spec = value_spec
+        # argparse reports conversion errors by the name of the type function
+        self.__name__ = repr(annotation)
+
+    def __call__(self, token: str) -> list[tuple[Any, Any]]:
+        if token.startswith("@"):
+            try:
+                with open(token[1:]) as file:
+                    lines = [line.strip() for line in file]
+            except OSError as err:
+                # reported as a usage error by argparse
+                raise argparse.ArgumentTypeError(
+                    f"cannot read {token[1:]!r}: {err.strerror}"
+                ) from err
+            return [
+                self._pair(line) for line in lines if line and not line.startswith("#")
+            ]
+        return [self._pair(token)]
+
+    def _pair(self, token: str) -> tuple[Any, Any]:
+        key, sep, value = token.partition("=")
+        if not sep:
+            raise ValueError(f"Expected a key=value pair, got {token!r}")
+        return _convert(self.key_spec, key), _convert(self.value_spec, value)
+
+
+def _convert(spec: "TypeSpec", token: str) -> Any:
+    value = spec.type(token)
+    if spec.choices is not None and value not in spec.choices:
+        raise ValueError(f"{value!r} is not one of {spec.choices!r}")
+    for conversion in spec.conversions:
+        value = conversion(value)
+    return value
+
+
+def _build_dict(pairs: list[list[tuple[Any, Any]]]) -> dict[Any, Any]:
+    duplicate_keys = config["duplicate_keys"]
+    out: dict[Any, Any] = {}
+    for token_pairs in pairs:
+        for key, value in token_pairs:
+            if key in out:
+                if duplicate_keys == "first":
+                    continue
+                if duplicate_keys != "last":
+                    raise argparse.ArgumentTypeError(f"duplicate key {key!r}")
+            out[key] = value
+    return out
+
+
+@attrs.define(frozen=True)
+class TypeSpec:
+    """
+    How values of a type annotation are parsed from the command line
+
+    Args:
+        type: Converts a single command line token
+        nargs: Whether the argument receives one or more tokens
+        choices: Values the converted tokens must be one of
+        flag: Whether the argument is a boolean flag without tokens
+        conversions: Applied in order to the parsed value after parsing, e.g. `set` for `set[int]`
+        validators: Checks of the converted values, run after parsing, see `with_argparse.validators`
+        parallel: Whether the elements of a list are converted concurrently, see `with_argparse.parallel`
+
+    """
+
+    type: Callable[[str], Any]
+    nargs: bool = False
+    choices: Optional[Sequence[Any]] = None
+    flag: bool = False
+    conversions: tuple[Callable[[Any], Any], ...] = ()
+    validators: tuple[Validator, ...] = ()
+    parallel: Optional[Parallel] = None
+
+
+TypeHandler = Callable[[Any, Callable[[Any], TypeSpec]], TypeSpec]
+
+_handlers: dict[Any, TypeHandler] = {}
+_compiled: dict[Any, TypeSpec] = {}
+_lock = threading.Lock()
+
+
+def register_type(key: Any) -> Callable[[TypeHandler], TypeHandler]:
+    """
+    Registers a handler for an annotation, the origin of generic annotations (e.g. `dict` for `dict[str, int]`)
+    or a base class. Handlers receive the annotation and a function to compile inner annotations with.
+    """
+
+    def decorator(handler: TypeHandler) -> TypeHandler:
+        with _lock:
+            _handlers[key] = handler
+            _compiled.clear()
+        return handler
+
+    return decorator
+
+
+def _find_handler(annotation: Any) -> Optional[TypeHandler]:
+    try:
+        handler = _handlers.get(annotation)
+    except TypeError:
+        handler = None
+    if handler is not None:
+        return handler
+
+    origin = get_origin(annotation)
+    if origin is not None:
+        return _handlers.get(origin)
+
+    if isinstance(annotation, type):
+        for base in annotation.__mro__[1:]:
+            if base in _handlers:
+                return _handlers[base]
+    return None
+
+
+def _memo_key(annotation: Any) -> Hashable:
+    # generic aliases compare their arguments like annotations do, e.g. `Union[int, str] == Union[str, int]`
+    # and `Literal[1] == Literal[True]`, while the order and types of the arguments change the compiled spec
+    origin = get_origin(annotation)
+    if origin is None:
+        return type(annotation), annotation
+    return origin, tuple(_memo_key(arg) for arg in get_args(annotation))
+
+
+def compile_type(annotation: Any) -> TypeSpec:
+    try:
+        key = _memo_key(annotation)
+        return _compiled[key]
+    except KeyError:
+        hashable = True
+    except TypeError:
+        hashable = False
+
+    handler = _find_handler(annotation)
+    if handler is not None:
+        spec = handler(annotation, compile_type)
+    elif get_origin(annotation) is not None:
+        raise ValueError(
+            "Unsupported origin type "
+            + str(get_origin(annotation))
+            + " for type "
+            + str(annotation)
+            + " "
+            "with inner types " + str(get_args(annotation))
+        )
+    else:
+        spec = TypeSpec(annotation)
+
+    if hashable:
+        _compiled[key] = spec
+    return spec
+
+
+@register_type(bool)
+def _bool(annotation: Any, compile_type: Callable[[Any], TypeSpec]) -> TypeSpec:
+    return TypeSpec(bool, flag=True)
+
+
+@register_type(enum.Enum)
+def _enum(annotation: Any, compile_type: Callable[[Any], TypeSpec]) -> TypeSpec:
+    return TypeSpec(_EnumConverter(annotation), choices=_Choices(annotation))
+
+
+def _sequence(annotation: Any, compile_type: Callable[[Any], TypeSpec]) -> TypeSpec:
+    origin = get_origin(annotation)
+    if origin is None:
+        # bare `list` or `set` annotations without an element type
+        return TypeSpec(annotation)
+    inner = compile_type(get_args(annotation)[0])
+    conversions = inner.conversions
+    if origin is not list:
+        conversions += (origin,)
+    return TypeSpec(
+        inner.type,
+        True,
+        inner.choices,
+        conversions=conversions,
+        validators=inner.validators,
+        parallel=inner.parallel,
+    )
+
+
+for _sequence_type in SEQUENCE_TYPES:
+    register_type(_sequence_type)(_sequence)
+
+
+@register_type(Literal)
+def _literal(annotation: Any, compile_type: Callable[[Any], TypeSpec]) -> TypeSpec:
+    literal_values = get_args(annotation)
+    inner_args = set(map(type, literal_values))
+    if len(inner_args) != 1:
+        raise NotImplementedError(
+            f"Literals with more than one inner type are not supported, "
+            f"got {inner_args} for {annotation}"
+        )
+    inner = compile_type(next(iter(inner_args)))
+    return TypeSpec(
+        inner.type, False, _Choices(literal_values), conversions=inner.conversions
+    )
+
+
+class _FirstWorking:
+    """
+    Converts a command line value with the first of the inner types of a union that accepts it
+    """
+
+    __slots__ = ("inner_types", "__name__")
+
+    def __init__(self, annotation: Any, inner_types: tuple[Callable[[str], Any], ...]):
+        self.inner_types = inner_types
+        # argparse reports conversion errors by the name of the type function
+        self.__name__ = repr(annotation)
+
+    def __call__(self, value: str) -> Any:
+        for inner_type in self.inner_types:
+            try:
+                return inner_type(value)
+            except Exception:
+                continue
+        raise ValueError(value)
+
+
+def _union(annotation: Any, compile_type: Callable[[Any], TypeSpec]) -> TypeSpec:
+    inner_arg_types = get_args(annotation)
+    if len(inner_arg_types) == 2 and NoneType in inner_arg_types:
+        (inner_arg_type,) = set(inner_arg_types) - {NoneType}
+        return compile_type(inner_arg_type)
+
+    if NoneType in inner_arg_types:
+        raise NotImplementedError(inner_arg_types)
+    inner_specs = tuple(
+        compile_type(inner_arg_type) for inner_arg_type in inner_arg_types
+    )
+    if len(inner_specs) < 2:
+        raise ValueError()
+
+    first_inner = inner_specs[0]
+    return TypeSpec(
+        _FirstWorking(annotation, tuple(inner.type for inner in inner_specs)),
+        first_inner.nargs,
+        first_inner.choices,
+        first_inner.flag,
+        first_inner.conversions,
+    )
+
+
+def _mapping(annotation: Any, compile_type: Callable[[Any], TypeSpec]) -> TypeSpec:
+    # bare `dict` annotations map strings to strings
+    key_type, value_type = get_args(annotation) or (str, str)
+    key_spec, value_spec = compile_type(key_type), compile_type(value_type)
+    for inner_spec in (key_spec, value_spec):
+        if inner_spec.nargs or inner_spec.flag:
+            raise NotImplementedError(
+                f"Keys and values of {annotation} must be single values, got {inner_spec.type}"
+            )
+    return TypeSpec(
+        _KeyValue(annotation, key_spec, value_spec), True, conversions=(_build_dict,)
+    )
+
+
+for _mapping_type in (dict, Dict, collections.abc.Mapping):
+    register_type(_mapping_type)(_mapping)
+
+register_type(Union)(_union)
+register_type(UnionType)(_union)
+
+
+@register_type(Annotated)
+def _annotated(annotation: Any, compile_type: Callable[[Any], TypeSpec]) -> TypeSpec:
+    # other metadata is left to type checkers and libraries
+    inner = compile_type(annotation.__origin__)
+    validators = tuple(
+        item for item in annotation.__metadata__ if isinstance(item, Validator)
+    )
+    parallel = next(
+        (item for item in annotation.__metadata__ if isinstance(item, Parallel)),
+        inner.parallel,
+    )
+    if parallel is not None and inner.choices is not None:
+        raise NotImplementedError(
+            f"Choices are checked while parsing, they cannot be converted in parallel, got {annotation}"
+        )
+    return attrs.evolve(
+        inner, validators=inner.validators + validators, parallel=parallel
+    )
+
+
+@register_type(MappedFile)
+def _mapped_file(annotation: Any, compile_type: Callable[[Any], TypeSpec]) -> TypeSpec:
+    return TypeSpec(MappedFile)
+
+
+@register_type(memoryview)
+def _memoryview(annotation: Any, compile_type: Callable[[Any], TypeSpec]) -> TypeSpec:
+    return TypeSpec(map_view)
+
+
+@register_type(bytes)
+def _bytes(annotation: Any, compile_type: Callable[[Any], TypeSpec]) -> TypeSpec:
+    return TypeSpec(read_bytes)
@@ -0,0 +1,206 @@
+"""
+JSON Schemas for the arguments of decorated entry points.
+
+A schema describes records mapping argument names to JSON values, such that job configurations can be
+validated with any JSON Schema validator, without importing the modules of the entry points:
+
+    python -m with_argparse.schema package.train:main package.evaluate:main -o schemas.json
+
+The schemas follow the same rules as the parser: `Literal` choices and enum member names become `enum`s,
+`Optional` arguments may be null, `list` and `set` arguments are non-empty arrays and `dict` arguments are
+objects. Types the parser converts from single tokens, e.g. paths or registered types, are strings.
+"""
+
+import argparse
+import collections.abc
+import dataclasses
+import enum
+import inspect
+import json
+import os
+import sys
+import typing
+from pathlib import PurePath
+from types import NoneType, UnionType
+from typing import Any, Callable, Literal, Optional, Sequence, Union
+
+import attrs
+
+from with_argparse.configure_argparse import MISSING_ARG, WithArgparse
+from with_argparse.main import _get_with_argparse, preload
+from with_argparse.registry import SEQUENCE_TYPES
+from with_argparse.typing_utils import resolve_annotation
+
+JSON_SCHEMA_DIALECT = "https://json-schema.org/draft/2020-12/schema"
+
+_SCALARS: dict[Any, dict[str, Any]] = {
+    bool: {"type": "boolean"},
+    int: {"type": "integer"},
+    float: {"type": "number"},
+    str: {"type": "string"},
+}
+
+
+def _enum_names(enum_type: type[enum.Enum]) -> list[str]:
+    # members are parsed by their name, or by their value for e.g. `StrEnum`s
+    names = list(enum_type.__members__)
+    for member in enum_type:
+        if str(member.value) not in names:
+            names.append(str(member.value))
+    return names
+
+
+def type_schema(annotation: Any) -> dict[str, Any]:
+    """
+    Returns the JSON Schema of the values of a type annotation
+    """
+    if isinstance(annotation, (str, typing.ForwardRef)):
+        raise TypeError(
+            f"Cannot derive a schema for unresolved annotation {annotation!r}"
+        )
+    if annotation in _SCALARS:
+        return dict(_SCALARS[annotation])
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return {"enum": _enum_names(annotation)}
+    if isinstance(annotation, type) and issubclass(annotation, PurePath):
+        return {"type": "string"}
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Annotated:
+        return type_schema(annotation.__origin__)
+    if origin is Literal:
+        return {"enum": list(args)}
+    if origin in {Union, UnionType}:
+        schemas = [
+            {"type": "null"} if arg is NoneType else type_schema(arg) for arg in args
+        ]
+        return {"anyOf": schemas}
+    if annotation in SEQUENCE_TYPES or origin in SEQUENCE_TYPES:
+        items = type_schema(args[0]) if args else {"type": "string"}
+        return {"type": "array", "items": items, "minItems": 1}
+    if annotation in {dict, typing.Dict, collections.abc.Mapping} or origin in {
+        dict,
+        collections.abc.Mapping,
+    }:
+        value_type = args[1] if args else str
+        return {"type": "object", "additionalProperties": type_schema(value_type)}
+    # e.g. registered types, which are converted from a single token
+    return {"type": "string"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, PurePath):
+        return os.fspath(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(_json_default(item) for item in value)
+    if isinstance(value, (list, tuple)):
+        return [_json_default(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _json_default(item) for key, item in value.items()}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(value)
+
+
+def _field_annotations(wa: WithArgparse) -> dict[str, tuple[Any, dict[str, Any]]]:
+    """
+    Maps the destinations of a decorated function to their annotation and field metadata
+    """
+    _, args_to_parse = wa._collect_args_to_parse(wa.signature, (), {})
+    if wa.func_type == "plain":
+        return {name: (typ, {}) for name, typ in args_to_parse.items()}
+
+    annotations: dict[str, tuple[Any, dict[str, Any]]] = {}
+    for typ in args_to_parse.values():
+        fields = (
+            attrs.fields(typ) if wa.func_type == "attrs" else dataclasses.fields(typ)
+        )
+        for field in fields:
+            field_type = field.type
+            if isinstance(field_type, (str, typing.ForwardRef)):
+                field_type = resolve_annotation(typ, field.name)
+            annotations.setdefault(field.name, (field_type, dict(field.metadata or {})))
+    return annotations
+
+
+def json_schema(func: Callable | WithArgparse) -> dict[str, Any]:
+    """
+    Returns a JSON Schema for records of the arguments of a decorated function, keyed by argument name.
+
+    Args:
+        func: A function decorated with `with_argparse`, `with_dataclass` or `with_attrs`
+
+    """
+    wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+    wa.compile()
+    annotations = _field_annotations(wa)
+
+    properties = {}
+    required = []
+    for dest, action in wa.arguments.items():
+        annotation, metadata = annotations[dest]
+        if dest in wa.allow_custom:
+            # custom parse functions receive values of the type of their only parameter
+            parameter = next(
+                iter(inspect.signature(wa.allow_custom[dest]).parameters.values())
+            )
+            if parameter.annotation is not parameter.empty:
+                annotation = parameter.annotation
+            else:
+                annotation = str
+        schema = type_schema(annotation)
+        if dest in wa.allow_glob:
+            schema = {"anyOf": [schema, {"type": "array", "items": {"type": "string"}}]}
+        if action.help is not None and action.help is not argparse.SUPPRESS:
+            schema["description"] = action.help
+        if "aliases" in metadata:
+            schema["x-aliases"] = list(metadata["aliases"])
+        if action.required:
+            required.append(dest)
+        elif action.default is not MISSING_ARG:
+            try:
+                schema["default"] = _json_default(action.default)
+            except TypeError:
+                pass
+        properties[dest] = schema
+
+    schema = {
+        "$schema": JSON_SCHEMA_DIALECT,
+        "title": wa.func.__qualname__,
+        "type": "object",
+        "properties": properties,
+        "required": required,
+        "additionalProperties": False,
+    }
+    if wa.func.__doc__:
+        schema["description"] = inspect.cleandoc(wa.func.__doc__)
+    return schema
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m with_argparse.schema",
+        description="Dump the JSON Schemas of decorated entry points, keyed by entry point",
+    )
+    parser.add_argument(
+        "targets", nargs="+", help="entry points of the form 'module:function'"
+    )
+    parser.add_argument("--output", "-o", default=None, help="defaults to stdout")
+    parser.add_argument("--indent", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    schemas = {target: json_schema(preload(target)) for target in args.targets}
+    encoded = json.dumps(schemas, indent=args.indent) + "\n"
+    if args.output is None:
+        sys.stdout.write(encoded)
+    else:
+        with open(args.output, "w") as file:
+            file.write(encoded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import dataclasses
+import enum
+import inspect
+import os
+from pathlib import PurePath
+from typing import Any, Callable, Mapping, Optional, Sequence
+from weakref import WeakKeyDictionary
+
+import attrs
+
+from with_argparse.configure_argparse import MISSING_ARG, WithArgparse
+from with_argparse.main import _get_with_argparse
+
+
+@attrs.define(frozen=True)
+class _FieldPlan:
+    dest: str
+    # name of the function parameter holding the value
+    source: str
+    # name of the field on the dataclass/attrs instance, None for plain functions
+    attribute: Optional[str]
+    option: str
+    nargs: Optional[int | str]
+    const: Any
+    required: bool
+    default: Any
+    # default factory of the field, only invoked when serializing a value of this field
+    factory: Optional[Callable[[], Any]]
+    choices: Optional[frozenset[Any]]
+
+
+def _format_value(plan: _FieldPlan, value: Any) -> str:
+    if plan.choices is not None and value not in plan.choices:
+        raise ValueError(
+            f"Value {value!r} for {plan.dest!r} is not one of the choices {plan.choices!r}"
+        )
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, PurePath):
+        return os.fspath(value)
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _format_pair(plan: _FieldPlan, key: Any, value: Any) -> str:
+    key = _format_value(plan, key)
+    if "=" in key:
+        raise ValueError(
+            f"Keys of {plan.dest!r} containing '=' cannot be passed on the command line, got {key!r}"
+        )
+    return key + "=" + _format_value(plan, value)
+
+
+def _field_factory(field: Any) -> Optional[Callable[[], Any]]:
+    if isinstance(field, dataclasses.Field):
+        if field.default_factory is dataclasses.MISSING:
+            return None
+        return field.default_factory
+    if isinstance(field.default, attrs.Factory):  # type: ignore[arg-type]
+        if field.default.takes_self:
+            # the default depends on the other fields of the instance, always emit the value
+            return None
+        return field.default.factory
+    return None
+
+
+class ArgvSerializer:
+    """
+    Turns the arguments of a decorated function back into a command line that parses into equal arguments.
+    The serializer is derived from the same parser the function uses and only emits non-default values.
+    """
+
+    plans: tuple[_FieldPlan, ...]
+    parameters: tuple[str, ...]
+
+    def __init__(self, wa: WithArgparse):
+        signature = inspect.getfullargspec(wa.func)
+        self.parameters = tuple(signature.args + signature.kwonlyargs)
+
+        wa.compile()
+        _, args_to_parse = wa._collect_args_to_parse(signature, (), {})
+        sources: dict[str, tuple[str, Optional[str]]]
+        factories: dict[str, Callable[[], Any]] = {}
+        if wa.func_type == "plain":
+            sources = {name: (name, None) for name in args_to_parse}
+        else:
+            sources = {}
+            for name, typ in args_to_parse.items():
+                fields = (
+                    attrs.fields(typ)
+                    if wa.func_type == "attrs"
+                    else dataclasses.fields(typ)
+                )
+                for field in fields:
+                    sources.setdefault(field.name, (name, field.name))
+                    factory = _field_factory(field)
+                    if factory is not None:
+                        factories.setdefault(field.name, factory)
+
+        plans = []
+        for dest, action in wa.arguments.items():
+            if dest in wa.allow_custom:
+                raise TypeError(
+                    f"Argument {dest!r} uses a custom parse function, which cannot be inverted"
+                )
+            source, attribute = sources[dest]
+            plans.append(
+                _FieldPlan(
+                    dest,
+                    source,
+                    attribute,
+                    action.option_strings[0],
+                    action.nargs,
+                    action.const,
+                    action.required,
+                    action.default,
+                    factories.get(dest),
+                    (frozenset(action.choices) if action.choices is not None else None),
+                )
+            )
+        self.plans = tuple(plans)
+
+    def to_argv(self, args: Sequence[Any], kwargs: Mapping[str, Any]) -> list[str]:
+        if len(args) > len(self.parameters):
+            raise TypeError(
+                f"Received {len(args)} positional arguments, expected at most {len(self.parameters)}"
+            )
+        bound = dict(zip(self.parameters, args))
+        bound.update(kwargs)
+
+        argv: list[str] = []
+        for plan in self.plans:
+            if plan.source not in bound:
+                if plan.required:
+                    raise TypeError(
+                        f"Missing value for required argument {plan.source!r}"
+                    )
+                continue
+
+            value = bound[plan.source]
+            if plan.attribute is not None:
+                value = getattr(value, plan.attribute)
+            if plan.default is not MISSING_ARG and value == plan.default:
+                continue
+            if plan.factory is not None and value == plan.factory():
+                continue
+
+            if plan.nargs == 0:
+                # store_true and store_false flags are only emitted to flip their default
+                if value is not plan.const:
+                    raise ValueError(
+                        f"Flag {plan.option} can only be set to {plan.const!r}, got {value!r}"
+                    )
+                argv.append(plan.option)
+            elif plan.nargs == "+":
+                if isinstance(value, (str, bytes)) or len(value) == 0:
+                    raise ValueError(
+                        f"Argument {plan.dest!r} expects a non-empty collection, got {value!r}"
+                    )
+                if isinstance(value, (set, frozenset)):
+                    value = sorted(value, key=str)
+                elif isinstance(value, Mapping):
+                    value = [
+                        _format_pair(plan, key, elem) for key, elem in value.items()
+                    ]
+                values = [_format_value(plan, elem) for elem in value]
+                if any(elem.startswith("-") for elem in values):
+                    raise ValueError(
+                        f"Elements of {plan.dest!r} starting with '-' cannot be passed on the command line"
+                    )
+                argv.append(plan.option)
+                argv.extend(values)
+            elif value is None:
+                raise ValueError(
+                    f"Argument {plan.dest!r} cannot be set to None on the command line"
+                )
+            else:
+                # `--option=value` keeps values starting with '-' from being read as options
+                argv.append(plan.option + "=" + _format_value(plan, value))
+        return argv
+
+
+_serializers: "WeakKeyDictionary[WithArgparse, ArgvSerializer]" = WeakKeyDictionary()
+
+
+def to_argv(func: Callable | WithArgparse, *args: Any, **kwargs: Any) -> list[str]:
+    """
+    Serializes the arguments of a call to a decorated function into a minimal command line,
+    such that calling the function with this command line passes equal arguments to it.
+
+        >>> to_argv(train, TrainConfig(lr=0.1))
+        ['--lr=0.1']
+
+    Args:
+        func: A function decorated with `with_argparse`, `with_dataclass` or `with_attrs`
+        args: Positional arguments of the call, e.g. dataclass or attrs instances
+        kwargs: Keyword arguments of the call
+
+    """
+    wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+    serializer = _serializers.get(wa)
+    if serializer is None:
+        serializer = _serializers[wa] = ArgvSerializer(wa)
+    return serializer.to_argv(args, kwargs)
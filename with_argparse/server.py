@@ -0,0 +1,121 @@
+"""
+Resident server mode for decorated entry points.
+
+The server imports the application once, compiles the argument parser and then
+forks a child per request, such that each invocation starts from the same warm state
+and cannot leak environment, working directory or global state into later requests.
+Requests are sent by `with_argparse.client` over a local unix socket.
+"""
+
+import json
+import logging
+import os
+import socket
+import sys
+from argparse import Namespace
+from typing import Callable, Optional
+
+from with_argparse.client import _EXIT_CODE, _HEADER, _recv_exact
+from with_argparse.configure_argparse import WithArgparse
+from with_argparse.main import _get_with_argparse
+from with_argparse.utils import call_with_exit_code
+
+logger = logging.getLogger("with_argparse")
+
+_STDIO_FDS = (0, 1, 2)
+
+
+def serve(
+    func: Callable | WithArgparse,
+    socket_path: str | os.PathLike,
+    max_requests: Optional[int] = None,
+) -> None:
+    """
+    Serves calls to a decorated function on a unix socket until interrupted.
+
+    Args:
+        func: A function decorated with `with_argparse`, `with_dataclass` or `with_attrs`
+        socket_path: Path of the unix socket to listen on, an existing file is replaced
+        max_requests: Stop serving after this many requests, serves forever if None
+
+    """
+    wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+    wa.compile()
+
+    socket_path = os.fspath(socket_path)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    served = 0
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(socket_path)
+        server.listen()
+        logger.debug(f"Serving {wa.func!r} on {socket_path}")
+        try:
+            while max_requests is None or served < max_requests:
+                conn, _ = server.accept()
+                with conn:
+                    _handle(wa, server, conn)
+                served += 1
+                _reap_children()
+        finally:
+            os.unlink(socket_path)
+
+
+def _handle(wa: WithArgparse, server: socket.socket, conn: socket.socket):
+    header, fds, _, _ = socket.recv_fds(conn, _HEADER.size, len(_STDIO_FDS))
+    try:
+        if len(header) != _HEADER.size or len(fds) != len(_STDIO_FDS):
+            raise ConnectionError("Received a malformed request header")
+        (size,) = _HEADER.unpack(header)
+        request = json.loads(_recv_exact(conn, size))
+
+        if os.fork() == 0:
+            # the child must never return into the accept loop of the server
+            exit_code = 1
+            try:
+                server.close()
+                exit_code = _run_request(wa, request, fds)
+                conn.sendall(_EXIT_CODE.pack(exit_code))
+            finally:
+                os._exit(exit_code & 0xFF)
+    except (ConnectionError, ValueError) as err:
+        logger.warning(f"Dropping request: {err}")
+    finally:
+        for fd in fds:
+            os.close(fd)
+
+
+def _run_request(wa: WithArgparse, request: dict, fds: list[int]) -> int:
+    for fd, target in zip(fds, _STDIO_FDS):
+        os.dup2(fd, target)
+
+    os.environ.clear()
+    os.environ.update(request["env"])
+    argv = request["argv"]
+    sys.argv = list(argv)
+
+    def call():
+        os.chdir(request["cwd"])
+        wa.call((), {}, argv[1:])
+
+    exit_code = call_with_exit_code(call)
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+    return exit_code
+
+
+def _reap_children():
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0] != 0:
+            pass
+    except ChildProcessError:
+        pass
+
+
+def _serve_driver(wa: WithArgparse, driver_args: Namespace, argv: list[str]):
+    if argv:
+        raise TypeError(
+            f"Serving an entry point does not accept further arguments, got {argv!r}"
+        )
+    serve(wa, driver_args.serve)
@@ -0,0 +1,213 @@
+"""
+Incremental parsing for notebooks and interactive sessions.
+
+A `ParseSession` parses command lines given as a string or a list of tokens, without touching `sys.argv`,
+and keeps the raw tokens and converted values of every argument of the previous command line.
+When the command line is edited, only arguments whose raw tokens changed are converted again,
+such that e.g. glob expansions and custom conversions of unchanged arguments are reused.
+"""
+
+import argparse
+import shlex
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence
+
+from with_argparse.configure_argparse import WithArgparse
+from with_argparse.main import _get_with_argparse
+
+
+class _Absent:
+    __slots__ = ()
+
+
+_ABSENT = _Absent()
+
+
+class ParseSession:
+    """
+    Repeatedly parses command lines for a decorated function, converting only what changed.
+
+        >>> session = ParseSession(train)
+        >>> session.call("--lr 0.1 --data 'shards/*.bin'")
+        >>> session.call("--lr 0.2 --data 'shards/*.bin'")  # only converts --lr
+
+    Invalid command lines raise `argparse.ArgumentError` instead of exiting the process.
+
+    Args:
+        func: A function decorated with `with_argparse`, `with_dataclass` or `with_attrs`,
+            or its `WithArgparse` instance
+
+    """
+
+    wa: WithArgparse
+    # destinations converted by the last parse, all other values were reused
+    converted: frozenset[str]
+
+    def __init__(self, func: Callable | WithArgparse):
+        self.wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+        self.converted = frozenset()
+        self._arguments: Optional[Mapping[str, argparse.Action]] = None
+        self._parser: Optional[argparse.ArgumentParser] = None
+        self._raw: dict[str, Any] = {}
+        self._values: dict[str, Any] = {}
+
+    def parse(self, command_line: str | Sequence[str] = ()) -> dict[str, Any]:
+        """
+        Parses a command line into the converted values of all arguments, by their destination
+
+        Args:
+            command_line: A shell-like string split with `shlex`, or a list of tokens
+
+        """
+        _, args_to_parse = self.wa._collect_args_to_parse(self.wa.signature, (), {})
+        with self.wa._compile_lock:
+            self.wa._compile(self.wa.signature, args_to_parse)
+            return dict(self._parse(_tokens(command_line)))
+
+    def call(self, command_line: str | Sequence[str] = ()) -> Any:
+        """
+        Calls the decorated function with the arguments parsed from a command line
+
+        Args:
+            command_line: A shell-like string split with `shlex`, or a list of tokens
+
+        """
+        return self._call(_tokens(command_line))
+
+    def _call(self, tokens: list[str], overrides: Optional[Mapping[str, Any]] = None):
+        call_args, args_to_parse = self.wa._collect_args_to_parse(
+            self.wa.signature, (), {}
+        )
+        with self.wa._compile_lock:
+            fields_by_type = self.wa._compile(self.wa.signature, args_to_parse)
+            args_dict = self._parse(tokens, overrides)
+        errors = self.wa._validate(args_dict)
+        if errors:
+            raise argparse.ArgumentError(None, "; ".join(errors))
+        return self.wa._call_parsed(
+            call_args,
+            args_to_parse,
+            fields_by_type,
+            dict(args_dict),
+            defaults_only=not tokens and not overrides,
+        )
+
+    def split(self, command_line: str | Sequence[str] = ()) -> dict[str, Any]:
+        """
+        Splits a command line into the raw tokens of each argument it contains, by their destination,
+        a single token or a list of tokens for collections and the stored constant for flags.
+
+        Args:
+            command_line: A shell-like string split with `shlex`, or a list of tokens
+
+        """
+        _, args_to_parse = self.wa._collect_args_to_parse(self.wa.signature, (), {})
+        with self.wa._compile_lock:
+            self.wa._compile(self.wa.signature, args_to_parse)
+            raw_values = self._split(_tokens(command_line))
+        return {dest: raw for dest, raw in raw_values.items() if raw is not _ABSENT}
+
+    def invalidate(self, *dests: str):
+        """
+        Drops the converted values of the given destinations, or of all arguments if none are given,
+        such that they are converted again by the next parse, e.g. after files matched by a glob changed.
+        """
+        if not dests:
+            self._raw.clear()
+            return
+        for dest in dests:
+            self._raw.pop(dest, None)
+
+    def _split(self, tokens: list[str]) -> dict[str, Any]:
+        if self._arguments is not self.wa.arguments:
+            # the parser was compiled again, e.g. for programmatically supplied arguments
+            self._arguments = self.wa.arguments
+            self._parser = _raw_parser(self.wa.arguments.values())
+            self._raw.clear()
+            self._values.clear()
+        assert self._parser is not None
+
+        namespace, remaining = self._parser.parse_known_args(tokens)
+        if remaining:
+            raise argparse.ArgumentError(
+                None, f"unrecognized arguments: {' '.join(remaining)}"
+            )
+        return namespace.__dict__
+
+    def _parse(
+        self, tokens: list[str], overrides: Optional[Mapping[str, Any]] = None
+    ) -> Mapping[str, Any]:
+        raw_values = self._split(tokens)
+        if overrides:
+            # raw values by destination, e.g. of a record, take precedence over the command line
+            raw_values.update(overrides)
+        converted = set()
+        for dest, action in self.wa.arguments.items():
+            raw = raw_values[dest]
+            if dest in self._raw and self._raw[dest] == raw:
+                continue
+            self._values[dest] = self._convert(action, raw)
+            self._raw[dest] = raw
+            converted.add(dest)
+        self.converted = frozenset(converted)
+        return self._values
+
+    def _convert(self, action: argparse.Action, raw: Any) -> Any:
+        if raw is _ABSENT:
+            if action.required:
+                raise argparse.ArgumentError(action, "the argument is required")
+            return self._default(action)
+
+        if action.nargs == 0:
+            value = raw
+        elif isinstance(raw, list):
+            value = [_convert_token(action, token) for token in raw]
+        else:
+            value = _convert_token(action, raw)
+        return self.wa._convert_value(action.dest, value)
+
+    def _default(self, action: argparse.Action) -> Any:
+        if (
+            self.wa._defaults is not None
+            and action.dest not in self.wa._deferred_defaults
+        ):
+            return self.wa._convert_value(action.dest, self.wa._defaults[action.dest])
+        default = action.default
+        if isinstance(default, str) and callable(action.type):
+            default = _convert_token(action, default)
+        return self.wa._convert_value(action.dest, default)
+
+
+def _tokens(command_line: str | Sequence[str]) -> list[str]:
+    if isinstance(command_line, str):
+        return shlex.split(command_line)
+    return list(command_line)
+
+
+def _raw_parser(actions: Iterable[argparse.Action]) -> argparse.ArgumentParser:
+    # mirrors the option strings and arity of the compiled parser, but keeps the raw tokens
+    parser = argparse.ArgumentParser(add_help=False, exit_on_error=False)
+    for action in actions:
+        kwargs: dict[str, Any] = {"dest": action.dest, "default": _ABSENT}
+        if action.nargs == 0:
+            kwargs["action"] = "store_const"
+            kwargs["const"] = action.const
+        elif action.nargs is not None:
+            kwargs["nargs"] = action.nargs
+        parser.add_argument(*action.option_strings, **kwargs)
+    return parser
+
+
+def _convert_token(action: argparse.Action, token: str) -> Any:
+    if not callable(action.type):
+        value: Any = token
+    else:
+        try:
+            value = action.type(token)
+        except (TypeError, ValueError, argparse.ArgumentTypeError):
+            type_name = getattr(action.type, "__name__", repr(action.type))
+            raise argparse.ArgumentError(
+                action, f"invalid {type_name} value: {token!r}"
+            ) from None
+    if action.choices is not None and value not in action.choices:
+        raise argparse.ArgumentError(action, f"invalid choice: {value!r}")
+    return value
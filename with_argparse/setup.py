@@ -1,4 +1,6 @@
-config = {
+from typing import Any
+
+config: dict[str, Any] = {
     #
     # whether the argparse functionality is disabled at all!
     #   enabled by default
@@ -7,4 +9,8 @@ config = {
     # add a help flag aka -h to the argparse object?
     #   enabled by default
     "add_help": True,
+    #
+    # how repeated keys of dict arguments are handled: "error", "first" or "last"
+    #   an error by default
+    "duplicate_keys": "error",
 }
@@ -0,0 +1,260 @@
+"""
+Launcher stubs that validate the command line before importing a heavy entry point.
+
+A stub is a generated module that only uses the standard library. It parses and validates the command line
+and serves `--help` with the same options, types and choices as the compiled parser of the entry point,
+and only then imports the entry point and hands over the values it already converted:
+
+    python -m with_argparse.stub package.module:main -o train.py
+    python train.py --lr 0.1
+
+Values of types the standard library cannot convert (e.g. enums, globs or registered types) are validated
+as far as possible by the stub and converted after the import. Stubs record a hash of the parser they were
+generated from, outdated stubs still work but the command line is parsed again after the import.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional, Sequence
+
+from with_argparse.configure_argparse import WithArgparse
+from with_argparse.main import _get_with_argparse, preload
+from with_argparse.registry import _EnumConverter
+from with_argparse.session import _ABSENT, ParseSession
+
+logger = logging.getLogger("with_argparse")
+
+# types the stub converts to exactly the values the entry point parses
+_EXACT_TYPES: Mapping[Any, str] = {int: "int", float: "float", str: "str", Path: "path"}
+
+_STUB_TEMPLATE = '''\
+"""
+Launcher stub for {target}, generated by with_argparse.stub.
+
+Validates the command line with the standard library only before importing the entry point.
+Regenerate it when the arguments of the entry point change.
+"""
+
+import argparse
+import importlib
+import json
+import pathlib
+import sys
+
+TARGET = {target!r}
+SPEC_HASH = {spec_hash!r}
+SPEC = json.loads({spec_json!r})
+
+
+def _tokens(name, allowed):
+    allowed = frozenset(allowed)
+
+    def convert(token):
+        if token not in allowed:
+            raise ValueError(token)
+        return token
+
+    # argparse reports conversion errors by the name of the type function
+    convert.__name__ = name
+    return convert
+
+
+def parse(argv):
+    parser = argparse.ArgumentParser(add_help=False, exit_on_error=False)
+    parser.add_argument(
+        "--help",
+        "-h",
+        action="store_true",
+        default=False,
+        required=False,
+        help="show this help message and exit",
+    )
+    types = {{"int": int, "float": float, "str": str, "path": pathlib.Path}}
+    for arg in SPEC["arguments"]:
+        kwargs = {{"dest": arg["dest"], "default": argparse.SUPPRESS}}
+        kwargs["required"] = arg["required"]
+        if arg["help"] is not None:
+            kwargs["help"] = arg["help"]
+        if arg["nargs"] == 0:
+            kwargs["action"] = "store_const"
+            kwargs["const"] = arg["const"]
+        else:
+            if arg["tokens"] is not None:
+                kwargs["type"] = _tokens(arg["type"], arg["tokens"])
+            else:
+                kwargs["type"] = types[arg["type"]]
+            kwargs["metavar"] = arg["metavar"]
+            if arg["nargs"] is not None:
+                kwargs["nargs"] = arg["nargs"]
+            if arg["choices"] is not None:
+                kwargs["choices"] = arg["choices"]
+        parser.add_argument(*arg["options"], **kwargs)
+
+    help_parser = argparse.ArgumentParser(add_help=False)
+    help_parser.add_argument("-h", "--help", action="store_true", default=False)
+    if help_parser.parse_known_args(argv)[0].help and SPEC["help"] != "silent":
+        parser.print_help()
+        if SPEC["help"] == "print-and-exit":
+            sys.exit(2)
+
+    try:
+        namespace, remaining = parser.parse_known_args(argv)
+        if remaining:
+            remaining_str = " ".join(map(repr, remaining))
+            raise argparse.ArgumentError(
+                None, f"failed to parse the following args: {{remaining_str}}"
+            )
+    except argparse.ArgumentError as err:
+        parser.print_help()
+        print("error:", err.message, file=sys.stderr)
+        sys.exit(2)
+    values = vars(namespace)
+    values.pop("help")
+    return values
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    values = parse(argv)
+
+    module_name, _, func_name = TARGET.partition(":")
+    func = importlib.import_module(module_name)
+    for attr in func_name.split("."):
+        func = getattr(func, attr)
+
+    from with_argparse.stub import handoff
+
+    return handoff(func, values, argv, SPEC_HASH)
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+def _stub_spec(wa: WithArgparse) -> dict[str, Any]:
+    arguments = []
+    for dest, action in wa.arguments.items():
+        arg: dict[str, Any] = {
+            "dest": dest,
+            "options": list(action.option_strings),
+            "required": action.required,
+            "help": action.help,
+            "nargs": action.nargs,
+            "const": action.const if action.nargs == 0 else None,
+            "metavar": action.metavar,
+            "type": "str",
+            "tokens": None,
+            "choices": None,
+            "exact": action.nargs == 0,
+        }
+        choices = list(action.choices) if action.choices is not None else None
+        exact_choices = choices is None or all(
+            isinstance(choice, (str, int, float)) and not isinstance(choice, bool)
+            for choice in choices
+        )
+        if action.nargs != 0 and action.type in _EXACT_TYPES and exact_choices:
+            arg.update(type=_EXACT_TYPES[action.type], choices=choices, exact=True)
+        elif isinstance(action.type, _EnumConverter):
+            # validated by the stub, converted to enum members after the import
+            arg.update(type=action.type.__name__, tokens=sorted(action.type.members))
+        arguments.append(arg)
+    return {"help": wa.parse_args.help_strategy, "arguments": arguments}
+
+
+def _spec_hash(spec: Mapping[str, Any]) -> str:
+    encoded = json.dumps(spec, sort_keys=True)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+def stub_source(func: Callable | WithArgparse, target: str) -> str:
+    """
+    Generates the source of a launcher stub for a decorated function.
+
+    Args:
+        func: A function decorated with `with_argparse`, `with_dataclass` or `with_attrs`
+        target: How the stub imports the function, of the form `module:function`
+
+    """
+    wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+    wa.compile()
+    spec = _stub_spec(wa)
+    return _STUB_TEMPLATE.format(
+        target=target, spec_hash=_spec_hash(spec), spec_json=json.dumps(spec)
+    )
+
+
+def handoff(
+    func: Callable | WithArgparse,
+    values: Mapping[str, Any],
+    argv: Sequence[str],
+    spec_hash: str,
+):
+    """
+    Calls a decorated function with the values parsed by its launcher stub,
+    converting only those the stub could not convert with the standard library.
+
+    Args:
+        func: A function decorated with `with_argparse`, `with_dataclass` or `with_attrs`
+        values: Values parsed by the stub by their destination, absent arguments are missing
+        argv: The command line parsed by the stub, parsed again if the stub is outdated
+        spec_hash: Hash of the parser the stub was generated from
+
+    """
+    wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+    call_args, args_to_parse = wa._collect_args_to_parse(wa.signature, (), {})
+    with wa._compile_lock:
+        fields_by_type = wa._compile(wa.signature, args_to_parse)
+        spec = _stub_spec(wa)
+        if _spec_hash(spec) != spec_hash:
+            logger.warning(
+                f"The launcher stub of {wa.func.__qualname__} is outdated, regenerate it"
+            )
+            args_dict = None
+        else:
+            exact = {arg["dest"] for arg in spec["arguments"] if arg["exact"]}
+            session = ParseSession(wa)
+            args_dict = {"help": False}
+            for dest, action in wa.arguments.items():
+                try:
+                    if dest in exact and dest in values:
+                        args_dict[dest] = wa._convert_value(dest, values[dest])
+                    else:
+                        args_dict[dest] = session._convert(
+                            action, values.get(dest, _ABSENT)
+                        )
+                except argparse.ArgumentError as err:
+                    wa._exit_with_errors([err.message])
+
+    if args_dict is None:
+        return wa.call((), {}, argv)
+    wa._exit_if_invalid(args_dict)
+    return wa._call_parsed(
+        call_args, args_to_parse, fields_by_type, args_dict, defaults_only=not argv
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m with_argparse.stub",
+        description="Generate a launcher stub that validates the command line before importing an entry point",
+    )
+    parser.add_argument("target", help="entry point of the form 'module:function'")
+    parser.add_argument("--output", "-o", default=None, help="defaults to stdout")
+    args = parser.parse_args(argv)
+
+    source = stub_source(preload(args.target), args.target)
+    if args.output is None:
+        sys.stdout.write(source)
+    else:
+        with open(args.output, "w") as file:
+            file.write(source)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
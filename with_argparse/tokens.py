@@ -0,0 +1,180 @@
+"""
+Command line tokens shared by the partial parses of a process.
+
+Within `partial_argparse`, several decorated functions parse the same command line, e.g. a launcher and
+then library components. The command line is tokenized once into a `TokenStream`, and each parse claims
+the tokens of its own options by looking them up in an index of the option tokens. Tokens that no parse
+claimed are exposed as a `TokenView` of the stream, and config instances built by one parse are reused
+by later parses of the same type.
+"""
+
+import re
+from typing import Any, Iterator, Mapping, Optional, overload, Sequence
+
+# like argparse, tokens such as `-1` or `-.5` are values rather than options
+_NEGATIVE_NUMBER = re.compile(r"^-\d+$|^-\d*\.\d+$")
+
+
+class TokenView(Sequence[str]):
+    """
+    The tokens of a stream that were not claimed by any parse so far, without copying them
+    """
+
+    __slots__ = ("_stream",)
+
+    def __init__(self, stream: "TokenStream"):
+        self._stream = stream
+
+    def __len__(self) -> int:
+        return self._stream._unclaimed
+
+    def __iter__(self) -> Iterator[str]:
+        consumed = self._stream.consumed
+        for index, token in enumerate(self._stream.tokens):
+            if not consumed[index]:
+                yield token
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if 0 <= index < len(self):
+            for position, token in enumerate(self):
+                if position == index:
+                    return token
+        raise IndexError("token index out of range")
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (TokenView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"TokenView({list(self)!r})"
+
+
+class TokenStream:
+    """
+    A command line tokenized once, with a bitmap of the tokens claimed by the parses of the process
+
+    Args:
+        tokens: The command line, e.g. ``sys.argv[1:]``
+
+    """
+
+    __slots__ = (
+        "tokens",
+        "consumed",
+        "instances",
+        "_unclaimed",
+        "_positions",
+        "_attached",
+        "_separator",
+    )
+
+    def __init__(self, tokens: Sequence[str]):
+        self.tokens = tuple(tokens)
+        self.consumed = bytearray(len(self.tokens))
+        # config instances by their type, built by earlier parses of this stream
+        self.instances: dict[type, Any] = {}
+        self._unclaimed = len(self.tokens)
+        # positions of the option tokens by option name, without values given as `--option=value`
+        self._positions: dict[str, list[int]] = {}
+        # short options with attached values or combined short flags, e.g. `-x5` or `-vq`
+        self._attached: set[str] = set()
+        self._separator = False
+        for index, token in enumerate(self.tokens):
+            if token == "--":
+                self._separator = True
+                break
+            if not token.startswith("-") or _NEGATIVE_NUMBER.match(token):
+                continue
+            name = token.partition("=")[0]
+            self._positions.setdefault(name, []).append(index)
+            if not token.startswith("--") and len(name) > 2:
+                self._attached.add(name[:2])
+
+    @property
+    def remainder(self) -> TokenView:
+        return TokenView(self)
+
+    def claim(
+        self,
+        option_actions: Mapping[str, Any],
+        ambiguous_options: frozenset[str],
+    ) -> Optional[tuple[dict[str, Any], list[int]]]:
+        """
+        Looks up the tokens of the given options, and returns the raw values by destination together with the
+        positions of their tokens. Values of flags are their constants, values of `nargs="+"` options lists.
+        Returns None for anything argparse might parse differently, e.g. abbreviated options.
+
+        Args:
+            option_actions: argparse actions by their option strings
+            ambiguous_options: Options that are left to argparse when given, e.g. abbreviations and `--help`
+
+        """
+        if self._separator:
+            return None
+        for option in ambiguous_options:
+            if option in self._positions:
+                return None
+
+        raw: dict[str, Any] = {}
+        claimed: list[int] = []
+        for option, action in option_actions.items():
+            if option in self._attached:
+                return None
+            for index in self._positions.get(option, ()):
+                _, sep, value = self.tokens[index].partition("=")
+                claimed.append(index)
+                if action.nargs == 0:
+                    if sep:
+                        return None
+                    raw[action.dest] = action.const
+                elif sep:
+                    if action.nargs is not None:
+                        return None
+                    raw[action.dest] = value
+                else:
+                    limit = index + 2 if action.nargs is None else len(self.tokens)
+                    end = index + 1
+                    while end < min(limit, len(self.tokens)):
+                        if self.tokens[end].startswith("-"):
+                            if _NEGATIVE_NUMBER.match(self.tokens[end]):
+                                return None
+                            break
+                        end += 1
+                    if end == index + 1:
+                        return None
+                    claimed.extend(range(index + 1, end))
+                    values = list(self.tokens[index + 1 : end])
+                    raw[action.dest] = values if action.nargs is not None else values[0]
+        return raw, claimed
+
+    def claimed_by(self, remaining: Sequence[str]) -> list[int]:
+        """
+        Returns the positions of the tokens a parse of the whole stream claimed, given the tokens it left
+        """
+        claimed = []
+        pos = 0
+        for index, token in enumerate(self.tokens):
+            if pos < len(remaining) and remaining[pos] == token:
+                pos += 1
+            else:
+                claimed.append(index)
+        return claimed
+
+    def consume(self, indices: Sequence[int]):
+        for index in indices:
+            if not self.consumed[index]:
+                self.consumed[index] = 1
+                self._unclaimed -= 1
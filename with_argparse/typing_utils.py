@@ -1,6 +1,87 @@
+import inspect
+import sys
+import typing
 from dataclasses import Field
-from typing import Any, ClassVar, Protocol
+from typing import Any, ClassVar, Mapping, MutableMapping, Optional, Protocol
+from weakref import WeakKeyDictionary
+
+if sys.version_info >= (3, 14):
+    import annotationlib
+else:
+    annotationlib = None
 
 
 class DataclassInstance(Protocol):
     __dataclass_fields__: ClassVar[dict[str, Field[Any]]]
+
+
+# annotations as written and resolved annotations, per function or class
+_annotations: "WeakKeyDictionary[Any, Mapping[str, Any]]" = WeakKeyDictionary()
+_resolved: "WeakKeyDictionary[Any, MutableMapping[str, Any]]" = WeakKeyDictionary()
+
+
+def _cached(cache: WeakKeyDictionary, obj: Any, factory) -> Any:
+    try:
+        return cache[obj]
+    except KeyError:
+        value = cache[obj] = factory()
+        return value
+    except TypeError:
+        # not weak referenceable, e.g. builtins
+        return factory()
+
+
+def get_annotations(obj: Any) -> Mapping[str, Any]:
+    """
+    Returns the annotations of a function or class without evaluating postponed (string) annotations.
+    On Python 3.14+, annotations referring to names that are not defined (yet) are returned as forward references.
+    """
+
+    def factory():
+        if annotationlib is not None:
+            return annotationlib.get_annotations(
+                obj, format=annotationlib.Format.FORWARDREF
+            )
+        return inspect.get_annotations(obj)
+
+    return _cached(_annotations, obj, factory)
+
+
+def _namespaces(owner: Any) -> tuple[dict[str, Any], Optional[Mapping[str, Any]]]:
+    if isinstance(owner, type):
+        module = sys.modules.get(owner.__module__)
+        return getattr(module, "__dict__", {}), dict(vars(owner))
+    return getattr(inspect.unwrap(owner), "__globals__", {}), None
+
+
+def _evaluate(owner: Any, annotation: Any) -> Any:
+    if isinstance(annotation, typing.ForwardRef):
+        if annotationlib is not None:
+            return typing.evaluate_forward_ref(annotation, owner=owner)
+        annotation = annotation.__forward_arg__
+    if not isinstance(annotation, str):
+        return annotation
+    globalns, localns = _namespaces(owner)
+    return eval(annotation, globalns, localns)
+
+
+def resolve_annotation(obj: Any, name: str) -> Any:
+    """
+    Resolves a single annotation of a function or class (including annotations inherited from base classes).
+    Only the requested annotation is evaluated, and the result is cached per object.
+
+    Raises:
+        KeyError: If `obj` has no annotation for `name`
+
+    """
+    resolved = _cached(_resolved, obj, dict)
+    if name in resolved:
+        return resolved[name]
+
+    owners = obj.__mro__ if isinstance(obj, type) else (obj,)
+    for owner in owners:
+        annotations = get_annotations(owner)
+        if name in annotations:
+            value = resolved[name] = _evaluate(owner, annotations[name])
+            return value
+    raise KeyError(name)
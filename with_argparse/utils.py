@@ -1,3 +1,5 @@
+import sys
+import traceback
 from glob import glob
 from typing import Any, Callable, TypeVar
 
@@ -11,3 +13,24 @@ T = TypeVar("T")
 
 def glob_to_paths(inp: str, func: Callable[[str], T]) -> list[T]:
     return list(map(func, glob(inp)))
+
+
+def call_with_exit_code(func: Callable[[], Any]) -> int:
+    """
+    Runs `func` like the interpreter would run a script and returns its exit code,
+    translating `sys.exit` (including the usage errors raised by argparse) into the code it carries.
+    `KeyboardInterrupt` is not a failed run and propagates to the caller.
+    """
+    try:
+        func()
+    except SystemExit as exc:
+        if exc.code is None:
+            return 0
+        if isinstance(exc.code, int):
+            return exc.code
+        print(exc.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
@@ -0,0 +1,114 @@
+"""
+Checks of parsed values, declared with `Annotated`.
+
+    @dataclass
+    class Config:
+        inputs: Annotated[list[Path], Exists(), Readable()]
+        vocab: Annotated[Path, IsFile(), MaxSize(2**30)]
+
+Validators run after parsing, before the decorated function is called. Collections are checked
+element by element, including the expansions of glob patterns. Checks run concurrently in a thread pool,
+such that thousands of `stat` calls on network storage overlap. All failures are reported together.
+"""
+
+import abc
+import concurrent.futures
+import os
+import threading
+from typing import Any, Optional, Sequence
+
+import attrs
+
+_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+@attrs.define(frozen=True)
+class Validator(abc.ABC):
+    """
+    Base class of checks of parsed values, `check` raises a `ValueError` or `OSError` describing a failure
+    """
+
+    @abc.abstractmethod
+    def check(self, value: Any) -> None: ...
+
+
+@attrs.define(frozen=True)
+class Exists(Validator):
+    def check(self, value: Any) -> None:
+        if not os.path.exists(value):
+            raise ValueError(f"{os.fspath(value)!r} does not exist")
+
+
+@attrs.define(frozen=True)
+class IsFile(Validator):
+    def check(self, value: Any) -> None:
+        if not os.path.isfile(value):
+            raise ValueError(f"{os.fspath(value)!r} is not a file")
+
+
+@attrs.define(frozen=True)
+class IsDir(Validator):
+    def check(self, value: Any) -> None:
+        if not os.path.isdir(value):
+            raise ValueError(f"{os.fspath(value)!r} is not a directory")
+
+
+@attrs.define(frozen=True)
+class Readable(Validator):
+    def check(self, value: Any) -> None:
+        if not os.access(value, os.R_OK):
+            raise ValueError(f"{os.fspath(value)!r} is not readable")
+
+
+@attrs.define(frozen=True)
+class MaxSize(Validator):
+    """
+    Args:
+        max_bytes: Largest allowed size of a file
+
+    """
+
+    max_bytes: int
+
+    def check(self, value: Any) -> None:
+        size = os.stat(value).st_size
+        if size > self.max_bytes:
+            raise ValueError(
+                f"{os.fspath(value)!r} has {size} bytes, more than {self.max_bytes}"
+            )
+
+
+def _executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # checks mostly wait for the file system, more threads than cores are useful
+            _pool = concurrent.futures.ThreadPoolExecutor(
+                min(32, (os.cpu_count() or 1) + 4),
+                thread_name_prefix="with_argparse-validate",
+            )
+        return _pool
+
+
+def _run_check(check: tuple[str, Sequence[Validator], Any]) -> Optional[str]:
+    option, validators, value = check
+    try:
+        # e.g. a missing file is only reported once, not also by later size checks
+        for validator in validators:
+            validator.check(value)
+    except (ValueError, OSError) as err:
+        return f"argument {option}: {err}"
+    return None
+
+
+def run_checks(checks: Sequence[tuple[str, Sequence[Validator], Any]]) -> list[str]:
+    """
+    Runs the validators of values of options concurrently, each value's in order until the first failure.
+    Returns the messages of all failed checks in order.
+    """
+    if len(checks) <= 1:
+        results = list(map(_run_check, checks))
+    else:
+        results = list(_executor().map(_run_check, checks))
+    return [message for message in results if message is not None]
@@ -0,0 +1,212 @@
+"""
+Structurally shared configurations for large sweeps.
+
+A sweep of an entry point often consists of thousands of configurations that differ from a base command line
+in one or two options. `parse_variants` parses the base once and turns every override into a `ConfigVariant`,
+an overlay that only holds the fields that differ from the base config and reads all others from a single
+shared base instance. Equal values of changed fields are converted once and shared by all variants as well,
+such that e.g. large lists and glob expansions exist once in memory. Variants are materialized into
+real instances on demand:
+
+    for variant in parse_variants(train, ["--lr 0.1", "--lr 0.2 --layers 4"], base="--data 'shards/*.bin'"):
+        schedule(variant["config"].lr)
+        ...
+        train.without_argv(variant["config"].materialize())
+"""
+
+import argparse
+import types
+from typing import Any, Callable, Hashable, Iterable, Iterator, Mapping, Sequence
+
+import attrs
+
+from with_argparse.configure_argparse import MISSING_ARG, WithArgparse
+from with_argparse.main import _get_with_argparse
+from with_argparse.session import _tokens, ParseSession
+
+
+class _Base:
+    """
+    The parsed base config of variants, shared by all of them
+    """
+
+    __slots__ = ("type", "fields", "kwargs", "instance", "converted_fields")
+
+    def __init__(
+        self,
+        typ: type,
+        fields: tuple[str, ...],
+        kwargs: Mapping[str, Any],
+        converted_fields: frozenset[str],
+    ):
+        self.type = typ
+        self.fields = fields
+        # keyword arguments the base instance was built from, as in `WithArgparse._call_parsed`
+        self.kwargs = kwargs
+        self.instance = typ(**kwargs)
+        # fields with attrs converters, whose arguments are converted by the instance itself
+        self.converted_fields = converted_fields
+
+
+class ConfigVariant:
+    """
+    A read-only overlay of a parsed config, holding only the fields that differ from its base.
+    Fields are read like attributes of the config, `materialize` builds an instance of the config type.
+    Other attributes, e.g. properties and methods, are read from an instance built on first access.
+    """
+
+    __slots__ = ("_base", "_changes", "_instance")
+
+    def __init__(self, base: _Base, changes: Mapping[str, Any]):
+        self._base = base
+        self._changes = changes
+        self._instance: Any = None
+
+    @property
+    def base(self) -> Any:
+        return self._base.instance
+
+    @property
+    def changes(self) -> Mapping[str, Any]:
+        return types.MappingProxyType(self._changes)
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for names that are not slots or methods of the overlay
+        if name in ConfigVariant.__slots__:
+            # e.g. copies, whose slots are not set yet
+            raise AttributeError(name)
+        base = self._base
+        if name in base.fields:
+            if name not in self._changes:
+                return getattr(base.instance, name)
+            if name not in base.converted_fields:
+                return self._changes[name]
+        # derived from the changed values, e.g. properties or the results of attrs converters
+        return getattr(self._materialized(), name)
+
+    def _materialized(self) -> Any:
+        if not self._changes:
+            return self._base.instance
+        if self._instance is None:
+            self._instance = self.materialize()
+        return self._instance
+
+    def replace(self, **changes: Any) -> "ConfigVariant":
+        """
+        Returns a variant with further changed fields, sharing the base of this variant
+        """
+        for name in changes:
+            if name not in self._base.fields:
+                raise TypeError(
+                    f"{self._base.type.__name__} has no parsed field {name!r}"
+                )
+        return ConfigVariant(self._base, {**self._changes, **changes})
+
+    def materialize(self) -> Any:
+        """
+        Builds an instance of the config type, from the values of the base and the changed fields
+        """
+        return self._base.type(**{**self._base.kwargs, **self._changes})
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ConfigVariant):
+            return self._base.type is other._base.type and {
+                **self._base.kwargs,
+                **self._changes,
+            } == {**other._base.kwargs, **other._changes}
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        changes = ", ".join(
+            f"{name}={value!r}" for name, value in self._changes.items()
+        )
+        return f"ConfigVariant({self._base.type.__name__}, {changes})"
+
+
+def _hashable(raw: Any) -> Hashable:
+    return tuple(raw) if isinstance(raw, list) else raw
+
+
+def parse_variants(
+    func: Callable | WithArgparse,
+    overrides: Iterable[str | Sequence[str]],
+    base: str | Sequence[str] = (),
+) -> Iterator[dict[str, ConfigVariant]]:
+    """
+    Parses a base command line once and yields the configs of each override as variants of the base configs,
+    by parameter name. Only options that differ from the base are converted, equal values only once.
+    Invalid command lines raise `argparse.ArgumentError`.
+
+    Args:
+        func: A function decorated with `with_dataclass` or `with_attrs`, or its `WithArgparse` instance
+        overrides: Command lines appended to the base, a shell-like string or a list of tokens each
+        base: The command line shared by all variants
+
+    """
+    wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+    if wa.func_type == "plain":
+        raise TypeError(
+            f"Variants require dataclass or attrs configs, {wa.func!r} has plain arguments"
+        )
+    _, args_to_parse = wa._collect_args_to_parse(wa.signature, (), {})
+    session = ParseSession(wa)
+    base_tokens = _tokens(base)
+    with wa._compile_lock:
+        fields_by_type = wa._compile(wa.signature, args_to_parse)
+        base_raw = dict(session._split(base_tokens))
+        base_values = dict(session._parse(base_tokens))
+    errors = wa._validate(base_values)
+    if errors:
+        raise argparse.ArgumentError(None, "; ".join(errors))
+
+    bases: dict[str, _Base] = {}
+    for arg, typ in args_to_parse.items():
+        bases[arg] = _Base(
+            typ,
+            fields_by_type[typ],
+            {
+                name: base_values[name]
+                for name in fields_by_type[typ]
+                if base_values.get(name, MISSING_ARG) is not MISSING_ARG
+            },
+            frozenset(
+                name for name in fields_by_type[typ] if _has_converter(typ, name)
+            ),
+        )
+    unchanged = {arg: ConfigVariant(bases[arg], {}) for arg in bases}
+
+    # converted values of changed arguments by their raw tokens, shared by all variants
+    converted: dict[tuple[str, Hashable], Any] = {}
+    for override in overrides:
+        with wa._compile_lock:
+            raw_values = session._split(base_tokens + _tokens(override))
+        changed: dict[str, Any] = {}
+        for dest, raw in raw_values.items():
+            if dest not in wa.arguments or raw == base_raw[dest]:
+                continue
+            key = (dest, _hashable(raw))
+            if key not in converted:
+                converted[key] = session._convert(wa.arguments[dest], raw)
+            changed[dest] = converted[key]
+        errors = wa._validate(changed)
+        if errors:
+            raise argparse.ArgumentError(None, "; ".join(errors))
+
+        variants = {}
+        for arg, typ in args_to_parse.items():
+            changes = {
+                name: changed[name] for name in fields_by_type[typ] if name in changed
+            }
+            variants[arg] = (
+                ConfigVariant(bases[arg], changes) if changes else unchanged[arg]
+            )
+        yield variants
+
+
+def _has_converter(typ: type, name: str) -> bool:
+    if not attrs.has(typ):
+        return False
+    field = attrs.fields_dict(typ).get(name)
+    return field is not None and field.converter is not None
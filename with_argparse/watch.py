@@ -0,0 +1,239 @@
+"""
+Watch mode for decorated entry points.
+
+The entry point is run once and then again in the same warm process whenever one of the files it
+refers to changes. Every command line token naming an existing file is watched, as are the directories
+of glob patterns of `allow_glob` arguments and any additional paths. After a change, only the arguments
+referring to the changed files are converted again, see `with_argparse.session.ParseSession`.
+Changes are detected with inotify on Linux, and by polling modification times elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from argparse import ArgumentError, Namespace
+from glob import glob
+from typing import Callable, Iterable, Optional, Protocol, Sequence
+
+from with_argparse.configure_argparse import WithArgparse
+from with_argparse.main import _get_with_argparse
+from with_argparse.session import ParseSession
+from with_argparse.utils import call_with_exit_code
+
+logger = logging.getLogger("with_argparse")
+
+# editors often save files in several steps, changes arriving within this many seconds cause a single run
+_SETTLE_TIME = 0.05
+_GLOB_CHARS = "*?["
+
+
+class _Watcher(Protocol):
+    def wait(self, timeout: Optional[float] = None) -> set[str]: ...
+
+    def close(self) -> None: ...
+
+
+class _PollingWatcher:
+    def __init__(self, paths: Iterable[str], interval: float):
+        self.interval = interval
+        self.snapshot = {path: self._stat(path) for path in paths}
+
+    @staticmethod
+    def _stat(path: str) -> Optional[tuple[int, int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def wait(self, timeout: Optional[float] = None) -> set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, previous in self.snapshot.items():
+                current = self._stat(path)
+                if current != previous:
+                    self.snapshot[path] = current
+                    changed.add(path)
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(self.interval)
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyWatcher:
+    _EVENT = struct.Struct("iIII")
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200
+
+    def __init__(self, paths: Iterable[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self.paths = set(paths)
+        # files are watched through their directory, such that files replaced by a rename are noticed
+        directories = {
+            path if os.path.isdir(path) else os.path.dirname(path)
+            for path in self.paths
+        }
+        self.directories: dict[int, str] = {}
+        try:
+            for directory in directories:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), self._MASK)
+                if wd < 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, os.strerror(errno), directory)
+                self.directories[wd] = directory
+        except BaseException:
+            os.close(self.fd)
+            raise
+
+    def wait(self, timeout: Optional[float] = None) -> set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if not readable:
+                return set()
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            changed = self._changed_paths(data)
+            if changed:
+                return changed
+
+    def _changed_paths(self, data: bytes) -> set[str]:
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, _, _, size = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = os.fsdecode(data[offset : offset + size].rstrip(b"\0"))
+            offset += size
+
+            directory = self.directories.get(wd)
+            if directory is None:
+                continue
+            if directory in self.paths:
+                changed.add(directory)
+            if name and os.path.join(directory, name) in self.paths:
+                changed.add(os.path.join(directory, name))
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _make_watcher(paths: Iterable[str], poll_interval: float) -> _Watcher:
+    paths = list(paths)
+    if sys.platform.startswith("linux"):
+        try:
+            return _InotifyWatcher(paths)
+        except (OSError, AttributeError) as err:
+            logger.debug(f"Falling back to polling for changes: {err}")
+    return _PollingWatcher(paths, poll_interval)
+
+
+def _watched_paths(
+    wa: WithArgparse, session: ParseSession, argv: Sequence[str]
+) -> dict[str, set[str]]:
+    """
+    Maps the absolute paths referred to by a command line to the destinations of the arguments referring to them
+    """
+    watched: dict[str, set[str]] = {}
+    for dest, raw in session.split(argv).items():
+        tokens = raw if isinstance(raw, list) else [raw]
+        for token in tokens:
+            if not isinstance(token, str):
+                continue
+            if dest in wa.allow_glob and any(char in token for char in _GLOB_CHARS):
+                # files matching the pattern may be added to or removed from its directory
+                first_wildcard = min(
+                    token.index(char) for char in _GLOB_CHARS if char in token
+                )
+                directory = os.path.dirname(token[:first_wildcard]) or os.curdir
+                paths = [directory] + glob(token)
+            else:
+                paths = [token]
+            for path in paths:
+                if os.path.exists(path):
+                    watched.setdefault(os.path.abspath(path), set()).add(dest)
+    return watched
+
+
+def watch(
+    func: Callable | WithArgparse,
+    argv: Optional[Sequence[str]] = None,
+    paths: Iterable[str | os.PathLike] = (),
+    poll_interval: float = 0.5,
+    max_runs: Optional[int] = None,
+) -> None:
+    """
+    Runs a decorated function and runs it again whenever a file it refers to changes, until interrupted.
+
+    Args:
+        func: A function decorated with `with_argparse`, `with_dataclass` or `with_attrs`
+        argv: Command line to run the function with, defaults to ``sys.argv[1:]``
+        paths: Additional files or directories to watch, a change converts all arguments again
+        poll_interval: Seconds between checks for changes if inotify is not available
+        max_runs: Stop after this many runs, runs until interrupted if None
+
+    """
+    wa = func if isinstance(func, WithArgparse) else _get_with_argparse(func)
+    argv = list(sys.argv[1:] if argv is None else argv)
+    extra_paths = {os.path.abspath(path) for path in paths}
+    session = ParseSession(wa)
+
+    runs = 0
+    while True:
+        try:
+            watched = _watched_paths(wa, session, argv)
+        except ArgumentError as err:
+            raise SystemExit(f"error: {err}") from None
+        for path in extra_paths:
+            watched.setdefault(path, set())
+
+        watcher = _make_watcher(watched, poll_interval)
+        try:
+            exit_code = call_with_exit_code(lambda: session.call(argv))
+            runs += 1
+            logger.info(
+                f"Run {runs} of {wa.func.__qualname__} exited with {exit_code}, "
+                f"watching {len(watched)} paths for changes"
+            )
+            if max_runs is not None and runs >= max_runs:
+                return
+
+            changed = watcher.wait()
+            while True:
+                more = watcher.wait(_SETTLE_TIME)
+                if not more:
+                    break
+                changed |= more
+        finally:
+            watcher.close()
+
+        dests = set().union(*(watched[path] for path in changed))
+        logger.info(f"Changed: {', '.join(sorted(changed))}")
+        if changed & extra_paths:
+            session.invalidate()
+        else:
+            session.invalidate(*dests)
+
+
+def _watch_driver(wa: WithArgparse, driver_args: Namespace, argv: list[str]):
+    paths = [path for path in driver_args.watch.split(os.pathsep) if path]
+    watch(wa, argv, paths)